@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:12
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def fill_cohorte(apps, schema_editor):
+    Animal = apps.get_model("animals", "Animal")
+    Animal.objects.update(
+        cohorte=ExtractYear("fecha_de_nacimiento") * 12 + ExtractMonth("fecha_de_nacimiento") - 1
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0003_animal_codigo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='animal',
+            name='cohorte',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Mes de nacimiento como año * 12 + mes - 1; se calcula al guardar.', verbose_name='Cohorte de nacimiento'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_cohorte, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,15 @@
+from datetime import date
+
 from django.db import models
 
 from batches.models import Batch
 
 
+def cohort_key(fecha: date) -> int:
+    """Mes de nacimiento como entero (año * 12 + mes - 1), la clave de cohorte del animal."""
+    return fecha.year * 12 + fecha.month - 1
+
+
 class Animal(models.Model):
     SEXO_CHOICES = [
         ("M", "Macho"),
@@ -40,13 +47,40 @@ class Animal(models.Model):
     fecha_de_nacimiento = models.DateField(
         verbose_name="Fecha de nacimiento"
     )
+    cohorte = models.PositiveIntegerField(
+        verbose_name="Cohorte de nacimiento",
+        editable=False,
+        db_index=True,
+        help_text="Mes de nacimiento como año * 12 + mes - 1; se calcula al guardar.",
+    )
 
-    def __str__(self) -> str:
-        if self.codigo:
-            return f"{self.codigo} - {self.especie}"
-        return f"{self.especie}"
+    # Campos cuyo valor guardado conservan `_loaded_values` para las señales
+    TRACKED_FIELDS = ("batch_id", "fecha_de_nacimiento")
 
     class Meta:
         verbose_name = "Animal"
         verbose_name_plural = "Animales"
         ordering = ["-fecha_de_nacimiento"]
+
+    def __str__(self) -> str:
+        if self.codigo:
+            return f"{self.codigo} - {self.especie}"
+        return f"{self.especie}"
+
+    def save(self, *args, **kwargs):
+        self.cohorte = cohort_key(self.fecha_de_nacimiento)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "fecha_de_nacimiento" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "cohorte"}
+        super().save(*args, **kwargs)
+        # Las señales post_save ya vieron los valores anteriores; estos son los nuevos
+        self._loaded_values = self._tracked_values()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_values()
+        return instance
+
+    def _tracked_values(self) -> dict:
+        return {name: self.__dict__.get(name) for name in self.TRACKED_FIELDS}
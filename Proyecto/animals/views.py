@@ -9,6 +9,7 @@ from django.views import View
 from django.views.generic import CreateView, ListView, UpdateView
 
 from batches.models import Batch
+from core.exports import CsvExportMixin
 
 from .forms import AnimalForm
 from .models import Animal
@@ -19,6 +20,7 @@ class AnimalListView(LoginRequiredMixin, ListView):
     template_name = "animals/animal_list.html"
     context_object_name = "animals"
     paginate_by = 12
+    query_budget = 5
 
     def get_queryset(self):
         user_batches = Batch.objects.by_user(self.request.user)
@@ -66,6 +68,18 @@ class AnimalListView(LoginRequiredMixin, ListView):
         return context
 
 
+class AnimalExportView(CsvExportMixin, AnimalListView):
+    export_filename = "animales"
+    export_fields = [
+        ("Código", "codigo"),
+        ("Lote", "batch__nombre"),
+        ("Especie", "especie"),
+        ("Raza", "raza"),
+        ("Sexo", "sexo"),
+        ("Fecha de nacimiento", "fecha_de_nacimiento"),
+    ]
+
+
 class AnimalCreateView(LoginRequiredMixin, CreateView):
     model = Animal
     form_class = AnimalForm
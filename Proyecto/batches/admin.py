@@ -1,13 +1,36 @@
 from django.apps import apps
 from django.contrib import admin
 from django.contrib.admin.sites import AlreadyRegistered
+from django.utils.translation import gettext_lazy as _
 from unfold.admin import ModelAdmin
 
+from .models import PendingImageDeletion
+from .tasks import drain_images
+
 
 class AutoModelAdmin(ModelAdmin):
     pass
 
 
+@admin.register(PendingImageDeletion)
+class PendingImageDeletionAdmin(ModelAdmin):
+    list_display = ("name", "attempts", "last_error", "created_at")
+    search_fields = ("name", "last_error")
+    readonly_fields = ("name", "attempts", "last_error", "created_at")
+    actions = ["rearm"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description=_("Reintentar borrado"))
+    def rearm(self, request, queryset):
+        updated = queryset.update(attempts=0, last_error="")
+        drain_images.enqueue(unique=True)
+        self.message_user(
+            request, _("%(count)s imágenes encoladas de nuevo.") % {"count": updated}
+        )
+
+
 for model in apps.get_app_config("batches").get_models():
     try:
         admin.site.register(model, AutoModelAdmin)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClientMetrics:
+    """Contadores del cliente HTTP compartido (por proceso)."""
+
+    requests: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+    errors: int = 0
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "errors": self.errors,
+        }
+
+
+class SupabaseClientHolder:
+    """Cliente de Supabase único por proceso, creado en el primer uso.
+
+    Comparte un `httpx.Client` con keep-alive entre todas las llamadas al storage
+    y se descarta en el hijo tras un `fork()` (gunicorn con `preload_app`), de modo
+    que ningún worker herede sockets abiertos por el proceso maestro.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport | None = None) -> None:
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._client: Client | None = None
+        self._http: httpx.Client | None = None
+        self._pid = os.getpid()
+        self._seen_streams: weakref.WeakSet = weakref.WeakSet()
+        self._metrics_lock = threading.Lock()
+        self.metrics = ClientMetrics()
+
+    def get(self) -> Client:
+        if self._pid != os.getpid():
+            self._after_fork()
+
+        client = self._client
+        if client is not None:
+            return client
+
+        with self._lock:
+            if self._client is None:
+                self._client = self._build()
+            return self._client
+
+    def reset(self) -> None:
+        """Cierra el pool de conexiones y fuerza a crear el cliente de nuevo."""
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+            self._http = None
+            self._client = None
+
+    def _after_fork(self) -> None:
+        # Los sockets pertenecen al padre: se abandonan sin cerrarlos
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._http = None
+        self._client = None
+        self._seen_streams = weakref.WeakSet()
+        self._pid = os.getpid()
+        self.metrics = ClientMetrics()
+
+    def _build(self) -> Client:
+        from supabase import ClientOptions, create_client
+
+        self._http = self._build_http_client()
+        client = create_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_KEY,
+            options=ClientOptions(httpx_client=self._http),
+        )
+        logger.info("Supabase client initialized")
+        return client
+
+    def _build_http_client(self) -> httpx.Client:
+        import httpx
+
+        timeout = getattr(settings, "SUPABASE_HTTP_TIMEOUT", 20.0)
+        limits = httpx.Limits(
+            max_connections=getattr(settings, "SUPABASE_HTTP_MAX_CONNECTIONS", 10),
+            max_keepalive_connections=getattr(settings, "SUPABASE_HTTP_MAX_KEEPALIVE", 5),
+            keepalive_expiry=getattr(settings, "SUPABASE_HTTP_KEEPALIVE_EXPIRY", 60.0),
+        )
+        return httpx.Client(
+            timeout=httpx.Timeout(
+                timeout,
+                connect=getattr(settings, "SUPABASE_HTTP_CONNECT_TIMEOUT", 5.0),
+            ),
+            limits=limits,
+            follow_redirects=True,
+            transport=self._transport,
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+
+    def _on_request(self, request: httpx.Request) -> None:
+        with self._metrics_lock:
+            self.metrics.requests += 1
+
+    def _on_response(self, response: httpx.Response) -> None:
+        stream: Any = response.extensions.get("network_stream")
+        with self._metrics_lock:
+            if response.is_error:
+                self.metrics.errors += 1
+            if stream is None:
+                return
+            if stream in self._seen_streams:
+                self.metrics.reused_connections += 1
+            else:
+                self._seen_streams.add(stream)
+                self.metrics.new_connections += 1
+
+
+supabase_clients = SupabaseClientHolder()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=supabase_clients._after_fork)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import logging
+
+from django.db.models import F
+
+from .models import Batch, PendingImageDeletion
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+def drain_image_deletions(
+    chunk_size: int = DEFAULT_CHUNK_SIZE, max_attempts: int = DEFAULT_MAX_ATTEMPTS
+) -> int:
+    """Vacía la cola de borrado en lotes usando un solo `remove([...])` por lote.
+
+    Retorna la cantidad de archivos borrados. Un lote fallido queda en la cola con
+    el error registrado y se reintenta en la siguiente ejecución. Las filas que
+    agotan ``max_attempts`` se registran en el log y quedan en la cola hasta que
+    se rearmen desde el admin.
+    """
+    storage = Batch._meta.get_field("imagen").storage
+    deleted = 0
+
+    while True:
+        pending = list(
+            PendingImageDeletion.objects.filter(attempts__lt=max_attempts)
+            .order_by("created_at")
+            .values_list("id", "name")[:chunk_size]
+        )
+        if not pending:
+            return deleted
+
+        ids = [pk for pk, _ in pending]
+        names = [name for _, name in pending]
+        try:
+            if hasattr(storage, "delete_many"):
+                storage.delete_many(names)
+            else:
+                for name in names:
+                    storage.delete(name)
+        except Exception as e:
+            logger.error(f"Error deleting {len(names)} images: {e}")
+            PendingImageDeletion.objects.filter(id__in=ids).update(
+                attempts=F("attempts") + 1,
+                last_error=str(e),
+            )
+            exhausted = list(
+                PendingImageDeletion.objects.filter(
+                    id__in=ids, attempts__gte=max_attempts
+                ).values_list("name", flat=True)
+            )
+            if exhausted:
+                logger.error(
+                    "%s imágenes agotaron %s intentos de borrado y requieren revisión: %s",
+                    len(exhausted),
+                    max_attempts,
+                    ", ".join(exhausted),
+                )
+            return deleted
+
+        PendingImageDeletion.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from batches.deletions import DEFAULT_CHUNK_SIZE, drain_image_deletions
+
+
+class Command(BaseCommand):
+    help = "Borra del storage remoto las imágenes encoladas por los signals de lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--max-attempts", type=int, default=5)
+
+    def handle(self, *args, **options):
+        deleted = drain_image_deletions(
+            chunk_size=options["chunk_size"],
+            max_attempts=options["max_attempts"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{deleted} imágenes borradas."))
@@ -1,15 +1,21 @@
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from batches.storage import SupabaseStorage
 
+_batch_storage: SupabaseStorage | None = None
+
 
 def get_batch_storage():
-    """Retorna SupabaseStorage si está habilitado."""
-    if getattr(settings, 'USE_SUPABASE_STORAGE', False):
-        return SupabaseStorage()
-    return None
+    """Retorna la instancia compartida de SupabaseStorage si está habilitado."""
+    global _batch_storage
+    if not getattr(settings, 'USE_SUPABASE_STORAGE', False):
+        return default_storage
+    if _batch_storage is None:
+        _batch_storage = SupabaseStorage()
+    return _batch_storage
 
 class BatchManager(models.Manager):
     def active_batches(self):
@@ -72,5 +78,43 @@ class Batch(models.Model):
     def __str__(self) -> str:
         return f"{self.nombre}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nombre de la imagen tal como se cargó, para detectar reemplazos sin otra consulta
+        if "imagen" in field_names:
+            instance._loaded_imagen_name = values[field_names.index("imagen")] or ""
+        return instance
+
     def animal_count(self) -> int:
         return self.animal_set.count()
+
+
+class PendingImageDeletion(models.Model):
+    """Cola persistente de imágenes por borrar del storage remoto."""
+
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("Ruta del archivo")
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_("Intentos")
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_("Último error")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Fecha de creación")
+    )
+
+    class Meta:
+        verbose_name = _("Imagen pendiente de borrar")
+        verbose_name_plural = _("Imágenes pendientes de borrar")
+        ordering = ["created_at"]
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,104 @@
+"""Borrado de un lote con toda su historia sin pasar por el collector de Django.
+
+``Batch.delete()`` carga en memoria cada animal, pesaje, producción y costo del
+lote para resolver la cascada en Python y disparar las señales fila a fila; con
+años de registros diarios eso agota el tiempo y la memoria. `purge_batch`
+borra por conjuntos, de las hojas hacia el lote (`PURGE_STEPS`), con
+``DELETE ... WHERE id IN (...)`` de a ``BATCH_PURGE_CHUNK_SIZE`` filas: cada
+bloque es una transacción corta que no retiene bloqueos ni crece el WAL de
+golpe, y una purga interrumpida se retoma donde quedó.
+
+Las señales por fila no hacen falta: el reparto de costos y las curvas solo
+importan para el lote que desaparece, y el caché del dashboard ya no lo
+alcanza porque sus llaves dependen de los lotes visibles. El lote mismo sí se
+borra con ``delete()``, ya sin dependientes, para que su imagen se encole.
+
+La vista oculta el lote (``is_active=False``) y encola `batches.tasks.purge`.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Iterator
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Model, Q, QuerySet
+
+from animals.models import Animal
+from costs.models import Cost, CostAllocation, RecurringCost
+from tracking.models import GrowthFit, Peso, PesoAnomaly, Produccion
+
+from .models import Batch
+
+logger = logging.getLogger(__name__)
+
+# (paso, modelo, filtro por id de lote) en orden de dependencias
+PURGE_STEPS: list[tuple[str, type[Model], Callable[[int], Q]]] = [
+    ("anomalias", PesoAnomaly, lambda pk: Q(peso__animal__batch_id=pk)),
+    ("pesos", Peso, lambda pk: Q(animal__batch_id=pk)),
+    ("producciones", Produccion, lambda pk: Q(animal__batch_id=pk)),
+    ("curvas", GrowthFit, lambda pk: Q(animal__batch_id=pk)),
+    ("asignaciones", CostAllocation, lambda pk: Q(batch_id=pk) | Q(animal__batch_id=pk)),
+    ("costos", Cost, lambda pk: Q(batch_id=pk)),
+    ("costos_recurrentes", RecurringCost, lambda pk: Q(batch_id=pk)),
+    ("animales", Animal, lambda pk: Q(batch_id=pk)),
+]
+
+
+def get_chunk_size() -> int:
+    return int(getattr(settings, "BATCH_PURGE_CHUNK_SIZE", 5000))
+
+
+def delete_in_chunks(queryset: QuerySet, chunk_size: int) -> Iterator[int]:
+    """Borra ``queryset`` de a ``chunk_size`` filas sin cargar instancias ni enviar señales."""
+    model = queryset.model
+    while True:
+        ids = list(queryset.order_by().values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        with transaction.atomic():
+            # _raw_delete es el DELETE por conjunto que el collector usa cuando no hay cascada
+            deleted = model._base_manager.filter(pk__in=ids)._raw_delete(queryset.db)
+        yield deleted
+
+
+def detach_references(batch_id: int) -> None:
+    """Pone en NULL las llaves SET_NULL que desde otros lotes apuntan a este."""
+    Cost.objects.filter(animal__batch_id=batch_id).update(animal=None)
+    Cost.objects.filter(recurring__batch_id=batch_id).update(recurring=None)
+    RecurringCost.objects.filter(animal__batch_id=batch_id).update(animal=None)
+
+
+def purge_batch(
+    batch_id: int,
+    chunk_size: int | None = None,
+    progress: Callable[..., None] | None = None,
+) -> dict[str, int]:
+    """Borra un lote desactivado y todo lo que depende de él; retorna las filas por paso.
+
+    ``progress(paso=..., borradas=..., total=...)`` se llama después de cada bloque.
+    """
+    batch = Batch.objects.filter(pk=batch_id).first()
+    if batch is None:
+        return {}
+    if batch.is_active:
+        raise ValueError(f"El lote {batch_id} está activo; desactívalo antes de purgarlo.")
+
+    chunk_size = chunk_size or get_chunk_size()
+    steps = [(name, model._base_manager.filter(q(batch_id))) for name, model, q in PURGE_STEPS]
+    total = sum(queryset.count() for _, queryset in steps)
+    done = 0
+    deleted = {}
+    for name, queryset in steps:
+        if name == "animales":
+            detach_references(batch_id)
+        deleted[name] = 0
+        for count in delete_in_chunks(queryset, chunk_size):
+            deleted[name] += count
+            done += count
+            if progress is not None:
+                progress(paso=name, borradas=done, total=total)
+
+    batch.delete()
+    logger.info(f"Batch {batch_id} purged: {done} rows")
+    return deleted
@@ -1,42 +1,50 @@
 import logging
 
-from django.db.models.signals import post_delete, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Batch
+from .models import Batch, PendingImageDeletion
+from .tasks import drain_images
 
 logger = logging.getLogger(__name__)
 
 
-@receiver(pre_save, sender=Batch)
-def delete_old_image_on_update(sender, instance: Batch, **kwargs):
-    """Elimina la imagen antigua cuando se actualiza a una nueva."""
-    if not instance.pk:
-        return
+def queue_image_deletion(name: str) -> None:
+    """Encola el borrado remoto de una imagen cuando la transacción confirma.
 
-    try:
-        old_instance = Batch.objects.get(pk=instance.pk)
-    except Batch.DoesNotExist:
+    El worker lo ejecuta con `batches.tasks.drain_images`; basta una tarea
+    pendiente para drenar todas las imágenes encoladas.
+    """
+    if not name:
         return
 
-    if not old_instance.imagen:
-        return
+    def enqueue():
+        PendingImageDeletion.objects.get_or_create(name=name)
+        drain_images.enqueue(unique=True)
+        logger.info(f"Image {name} queued for deletion")
+
+    transaction.on_commit(enqueue)
+
+
+@receiver(post_save, sender=Batch)
+def delete_old_image_on_update(sender, instance: Batch, created=False, raw=False, **kwargs):
+    """Encola la imagen antigua cuando se reemplaza o se quita.
 
-    # Si no hay imagen nueva o es diferente a la anterior, borrar la vieja
-    if not instance.imagen or old_instance.imagen.name != instance.imagen.name:
-        try:
-            old_instance.imagen.delete(save=False)
-            logger.info(f"Old image {old_instance.imagen.name} deleted")
-        except Exception as e:
-            logger.error(f"Error deleting old image: {e}")
+    Va en post_save: si subir la imagen nueva o el UPDATE fallan, la antigua
+    sigue referenciada y no se borra. Después actualiza la imagen de
+    referencia para guardados sucesivos de la misma instancia.
+    """
+    new_name = instance.imagen.name if instance.imagen else ""
+    # Solo instancias cargadas desde la BD conocen su imagen original
+    old_name = getattr(instance, "_loaded_imagen_name", None)
+    instance._loaded_imagen_name = new_name
+    if not raw and not created and old_name and old_name != new_name:
+        queue_image_deletion(old_name)
 
 
 @receiver(post_delete, sender=Batch)
 def delete_image_on_delete(sender, instance: Batch, **kwargs):
-    """Elimina la imagen del storage cuando se borra el lote."""
+    """Encola la imagen del lote borrado."""
     if instance.imagen:
-        try:
-            instance.imagen.delete(save=False)
-            logger.info(f"Image {instance.imagen.name} deleted with batch")
-        except Exception as e:
-            logger.error(f"Error deleting image: {e}")
+        queue_image_deletion(instance.imagen.name)
@@ -1,13 +1,13 @@
 import io
 import logging
-import os
 import uuid
 
 from django.conf import settings
 from django.core.files.base import File
 from django.core.files.storage import Storage
-from PIL import Image
-from supabase import Client, create_client
+
+from batches.clients import supabase_clients
+from core.timing import span
 
 logger = logging.getLogger(__name__)
 
@@ -16,30 +16,27 @@ class SupabaseStorage(Storage):
     FOLDER = "lotes"
 
     def __init__(self):
-        self.client: Client | None = None
         self.bucket_name = getattr(settings, 'SUPABASE_BUCKET', 'batches')
-        self._initialize_client()
 
-    def _initialize_client(self):
+    @property
+    def client(self):
+        """Cliente compartido del proceso; se crea en la primera operación remota."""
         if not getattr(settings, 'USE_SUPABASE_STORAGE', False):
-            return
+            return None
 
         try:
-            self.client = create_client(
-                settings.SUPABASE_URL,
-                settings.SUPABASE_KEY
-            )
-            # Solo log en el proceso del reloader (evita duplicado)
-            if os.environ.get('RUN_MAIN') == 'true':
-                logger.info("Supabase storage client initialized successfully")
+            return supabase_clients.get()
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
-            self.client = None
+            return None
 
     def _compress_to_webp(
         self, content: File, max_size: int = 1200, quality: int = 80
     ) -> tuple[bytes, str]:
         """Comprime la imagen a formato WebP."""
+        # PIL se importa solo al subir imágenes para no cargarlo en el arranque
+        from PIL import Image
+
         try:
             content.seek(0)
             image = Image.open(content)
@@ -66,7 +63,8 @@ class SupabaseStorage(Storage):
         return f"{uuid.uuid4().hex}.webp"
 
     def _save(self, name: str, content: File) -> str:
-        if not self.client:
+        client = self.client
+        if not client:
             raise ValueError("Supabase client not initialized")
 
         try:
@@ -74,11 +72,12 @@ class SupabaseStorage(Storage):
             file_path = f"{self.FOLDER}/{file_name}"
             file_bytes, content_type = self._compress_to_webp(content)
 
-            self.client.storage.from_(self.bucket_name).upload(
-                path=file_path,
-                file=file_bytes,
-                file_options={"content-type": content_type}
-            )
+            with span("storage"):
+                client.storage.from_(self.bucket_name).upload(
+                    path=file_path,
+                    file=file_bytes,
+                    file_options={"content-type": content_type}
+                )
 
             logger.info(f"File {file_path} uploaded to Supabase successfully")
             return file_path
@@ -94,7 +93,8 @@ class SupabaseStorage(Storage):
         return f"{settings.SUPABASE_URL}/storage/v1/object/public/{self.bucket_name}/{clean_name}"
 
     def exists(self, name: str) -> bool:
-        if not self.client or not name:
+        client = self.client if name else None
+        if not client:
             return False
 
         try:
@@ -103,22 +103,37 @@ class SupabaseStorage(Storage):
             folder = parts[0] if len(parts) > 1 else ""
             file_name = parts[-1]
 
-            response = self.client.storage.from_(self.bucket_name).list(path=folder)
+            with span("storage"):
+                response = client.storage.from_(self.bucket_name).list(path=folder)
             return any(f.get("name") == file_name for f in response)
         except Exception as e:
             logger.error(f"Error checking file existence: {e}")
             return False
 
     def delete(self, name: str):
-        if not name or not self.client:
+        client = self.client if name else None
+        if not client:
             return
 
         try:
-            self.client.storage.from_(self.bucket_name).remove([name])
+            with span("storage"):
+                client.storage.from_(self.bucket_name).remove([name])
             logger.info(f"File {name} deleted from Supabase")
         except Exception as e:
             logger.error(f"Error deleting from Supabase: {e}")
 
+    def delete_many(self, names: list[str]) -> None:
+        """Borra varias rutas en una sola llamada; propaga errores para reintentar."""
+        if not names:
+            return
+        client = self.client
+        if not client:
+            raise ValueError("Supabase client not initialized")
+
+        with span("storage"):
+            client.storage.from_(self.bucket_name).remove(list(names))
+        logger.info(f"{len(names)} files deleted from Supabase")
+
     def listdir(self, path: str):
         return [], []
 
@@ -0,0 +1,16 @@
+from jobs.queue import set_progress, task
+
+from .deletions import drain_image_deletions
+from .purge import purge_batch
+
+
+@task(queue="images")
+def drain_images() -> int:
+    """Borra del storage remoto las imágenes encoladas; retorna cuántas borró."""
+    return drain_image_deletions()
+
+
+@task(timeout=3600)
+def purge(batch_id: int) -> dict[str, int]:
+    """Borra un lote desactivado con toda su historia (ver `batches.purge`)."""
+    return purge_batch(batch_id, progress=set_progress)
@@ -1,13 +1,31 @@
+import threading
+from datetime import date
+from decimal import Decimal
 from io import BytesIO
+from unittest import mock
 
+import httpx
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from PIL import Image
 
+from animals.models import Animal
+from core.seeding import HerdSeeder, SeedConfig
+from costs.models import Cost
+from jobs.models import Job
+from jobs.queue import Worker
+from tracking.models import Peso
+
+from .clients import SupabaseClientHolder
+from .deletions import drain_image_deletions
 from .forms import BatchForm
-from .models import Batch
+from .models import Batch, PendingImageDeletion, get_batch_storage
+from .purge import purge_batch
 
 User = get_user_model()
 
@@ -278,8 +296,41 @@ class BatchViewTests(TestCase):
         response = self.client.post(reverse("batches:delete", args=[self.batch.pk]))
 
         self.assertEqual(response.status_code, 302)
+        self.assertNotIn(self.batch, Batch.objects.by_user(self.user))
+        job = Job.objects.get(task="batches.tasks.purge")
+        self.assertEqual(job.kwargs, {"batch_id": self.batch.pk})
+
+        Worker(interval=0).run_once()
         self.assertFalse(Batch.objects.filter(pk=self.batch.pk).exists())
 
+    def test_deleted_batch_hidden_before_purge_runs(self):
+        animal = Animal.objects.create(
+            batch=self.batch, especie="bovino", sexo="M", fecha_de_nacimiento=date(2023, 5, 1)
+        )
+        Peso.objects.create(animal=animal, fecha=timezone.now(), peso=Decimal("250"))
+        Cost.objects.create(
+            batch=self.batch,
+            tipo=Cost.CostType.FEED,
+            concepto="Heno",
+            monto=Decimal("100"),
+            fecha=date(2024, 1, 10),
+        )
+        self.client.force_login(self.user)
+        self.client.post(reverse("batches:delete", args=[self.batch.pk]))
+
+        # El worker todavía no corre: las filas siguen en la base pero no se muestran.
+        self.assertTrue(Peso.objects.filter(animal=animal).exists())
+        response = self.client.get(reverse("costs:list"))
+        self.assertEqual(list(response.context["costs"]), [])
+        response = self.client.get(reverse("tracking:peso-list"))
+        self.assertEqual(list(response.context["pesos"]), [])
+        response = self.client.get(reverse("dashboard:lotes"))
+        self.assertEqual(response.context["kpis"]["total_animales"], 0)
+        response = self.client.get(reverse("dashboard:tracking"))
+        self.assertEqual(list(response.context["animales_disponibles"]), [])
+        response = self.client.get(reverse("dashboard:costos"))
+        self.assertEqual(response.context["kpis"]["total_registros"], 0)
+
     def test_batch_delete_prevents_other_user_access(self):
         self.client.force_login(self.other_user)
         response = self.client.post(reverse("batches:delete", args=[self.batch.pk]))
@@ -322,3 +373,202 @@ class BatchSignalTests(TestCase):
 
         batch.refresh_from_db()
         self.assertEqual(batch.nombre, "Lote Actualizado")
+
+
+class BatchImageDeletionQueueTests(TestCase):
+    """Tests de la cola diferida de borrado de imágenes (sin llamar a Supabase)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123"
+        )
+        self.batch = Batch.objects.create(
+            nombre="Lote Imagen",
+            usuario=self.user,
+            imagen="lotes/vieja.webp"
+        )
+
+    def test_replacing_image_queues_old_one_on_commit(self):
+        batch = Batch.objects.get(pk=self.batch.pk)
+        batch.imagen = "lotes/nueva.webp"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                batch.save()
+
+        self.assertEqual(
+            list(PendingImageDeletion.objects.values_list("name", flat=True)),
+            ["lotes/vieja.webp"]
+        )
+
+    def test_failed_upload_keeps_the_old_image(self):
+        batch = Batch.objects.get(pk=self.batch.pk)
+        batch.imagen = SimpleUploadedFile("nueva.webp", b"imagen", content_type="image/webp")
+
+        with mock.patch.object(batch.imagen.storage, "save", side_effect=OSError("timeout")):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with self.assertRaises(OSError):
+                    batch.save()
+
+        self.assertEqual(callbacks, [])
+
+    def test_unchanged_image_is_not_queued(self):
+        batch = Batch.objects.get(pk=self.batch.pk)
+        batch.nombre = "Lote Renombrado"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            batch.save()
+
+        self.assertFalse(PendingImageDeletion.objects.exists())
+
+    def test_rolled_back_update_does_not_queue(self):
+        batch = Batch.objects.get(pk=self.batch.pk)
+        batch.imagen = None
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            batch.save()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(PendingImageDeletion.objects.exists())
+
+    def test_deleting_batch_queues_image(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batch.delete()
+
+        self.assertTrue(PendingImageDeletion.objects.filter(name="lotes/vieja.webp").exists())
+        self.assertEqual(Job.objects.filter(task="batches.tasks.drain_images").count(), 1)
+
+    def test_drain_removes_in_chunks(self):
+        for i in range(5):
+            PendingImageDeletion.objects.create(name=f"lotes/{i}.webp")
+        storage = Batch._meta.get_field("imagen").storage
+
+        with mock.patch.object(storage, "delete_many", create=True) as delete_many:
+            deleted = drain_image_deletions(chunk_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(delete_many.call_count, 3)
+        self.assertFalse(PendingImageDeletion.objects.exists())
+
+    def test_drain_keeps_failed_chunk_for_retry(self):
+        PendingImageDeletion.objects.create(name="lotes/error.webp")
+        storage = Batch._meta.get_field("imagen").storage
+
+        with mock.patch.object(
+            storage, "delete_many", create=True, side_effect=RuntimeError("timeout")
+        ):
+            deleted = drain_image_deletions()
+
+        pending = PendingImageDeletion.objects.get()
+        self.assertEqual(deleted, 0)
+        self.assertEqual(pending.attempts, 1)
+        self.assertEqual(pending.last_error, "timeout")
+
+    def test_exhausted_rows_are_logged_and_rearmed_from_admin(self):
+        PendingImageDeletion.objects.create(name="lotes/error.webp", attempts=4)
+        storage = Batch._meta.get_field("imagen").storage
+
+        with mock.patch.object(
+            storage, "delete_many", create=True, side_effect=RuntimeError("timeout")
+        ):
+            with self.assertLogs("batches.deletions", "ERROR") as logs:
+                drain_image_deletions(max_attempts=5)
+            self.assertIn("lotes/error.webp", logs.output[-1])
+            # Agotada: la siguiente corrida ya no la toca
+            self.assertEqual(drain_image_deletions(max_attempts=5), 0)
+        self.assertEqual(PendingImageDeletion.objects.get().attempts, 5)
+
+        admin_user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_login(admin_user)
+        response = self.client.post(
+            reverse("admin:batches_pendingimagedeletion_changelist"),
+            {
+                "action": "rearm",
+                "_selected_action": list(
+                    PendingImageDeletion.objects.values_list("pk", flat=True)
+                ),
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        pending = PendingImageDeletion.objects.get()
+        self.assertEqual((pending.attempts, pending.last_error), (0, ""))
+        self.assertEqual(Job.objects.filter(task="batches.tasks.drain_images").count(), 1)
+
+
+@override_settings(SUPABASE_URL="http://localhost", SUPABASE_KEY="test-key")
+class SupabaseClientHolderTests(TestCase):
+    def setUp(self):
+        self.holder = SupabaseClientHolder(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[]))
+        )
+
+    def tearDown(self):
+        self.holder.reset()
+
+    def test_client_is_created_lazily_once(self):
+        self.assertIsNone(self.holder._client)
+
+        first = self.holder.get()
+
+        self.assertIs(self.holder.get(), first)
+
+    def test_concurrent_get_returns_single_client(self):
+        clients = []
+        threads = [
+            threading.Thread(target=lambda: clients.append(self.holder.get()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+    def test_client_is_rebuilt_after_fork(self):
+        parent_client = self.holder.get()
+        self.holder._pid = -1
+
+        self.assertIsNot(self.holder.get(), parent_client)
+
+    def test_requests_are_counted(self):
+        self.holder.get().storage.from_("batches").remove(["lotes/a.webp"])
+
+        self.assertEqual(self.holder.metrics.requests, 1)
+        self.assertEqual(self.holder.metrics.errors, 0)
+
+    def test_batch_storage_is_shared(self):
+        self.assertIs(get_batch_storage(), get_batch_storage())
+
+
+class BatchPurgeTests(TestCase):
+    def setUp(self):
+        HerdSeeder(SeedConfig(users=1, batches_per_user=2, animals_per_batch=3, years=0.2)).run()
+        self.batch, self.other = Batch.objects.order_by("pk")[:2]
+        self.batch.is_active = False
+        self.batch.save()
+
+    def test_purge_deletes_history_in_chunks_without_loading_rows(self):
+        other_pesos = Peso.objects.filter(animal__batch=self.other).count()
+        steps = []
+
+        with CaptureQueriesContext(connection) as captured:
+            deleted = purge_batch(
+                self.batch.pk, chunk_size=40, progress=lambda **step: steps.append(step)
+            )
+
+        self.assertFalse(Batch.objects.filter(pk=self.batch.pk).exists())
+        self.assertFalse(Animal.objects.filter(batch_id=self.batch.pk).exists())
+        self.assertGreater(deleted["pesos"], 40)
+        self.assertEqual(steps[-1]["borradas"], steps[-1]["total"])
+        self.assertEqual(steps[-1]["total"], sum(deleted.values()))
+        self.assertEqual(Peso.objects.filter(animal__batch=self.other).count(), other_pesos)
+        self.assertFalse(any('"tracking_peso"."peso"' in query["sql"] for query in captured))
+
+    def test_active_batches_are_not_purged(self):
+        with self.assertRaises(ValueError):
+            purge_batch(self.other.pk)
+        self.assertEqual(purge_batch(0), {})
@@ -9,6 +9,7 @@ from django.views.generic import CreateView, ListView, UpdateView
 
 from .forms import BatchForm
 from .models import Batch
+from .tasks import purge
 
 
 class BatchListView(LoginRequiredMixin, ListView):
@@ -16,6 +17,7 @@ class BatchListView(LoginRequiredMixin, ListView):
     template_name = "batches/batch_list.html"
     context_object_name = "batches"
     paginate_by = 10
+    query_budget = 4
 
     def get_queryset(self):
         queryset = Batch.objects.by_user(self.request.user)
@@ -71,9 +73,12 @@ class BatchUpdateView(LoginRequiredMixin, UpdateView):
 
 
 class BatchDeleteView(LoginRequiredMixin, View):
+    """Oculta el lote al instante y deja su borrado (con toda la historia) al worker."""
+
     def post(self, request, pk):
         batch = get_object_or_404(Batch, pk=pk, usuario=request.user)
-        nombre_batch = batch.nombre
-        batch.delete()
-        messages.success(request, _('Lote "{}" eliminado exitosamente.').format(nombre_batch))
+        batch.is_active = False
+        batch.save(update_fields=["is_active", "updated_at"])
+        purge.enqueue(batch_id=batch.pk, unique=True)
+        messages.success(request, _('Lote "{}" eliminado exitosamente.').format(batch.nombre))
         return redirect("batches:list")
@@ -69,17 +69,22 @@ INSTALLED_APPS = [
     "tracking",
     "costs",
     "dashboard",
+    "core",
+    "jobs",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.RequestProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.budgets.QueryBudgetMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -105,32 +110,140 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Perfiles offline (config.settings_benchmark) corren sin Supabase ni DATABASE_URL
+OFFLINE_PROFILE = os.getenv("DJANGO_OFFLINE_PROFILE", "False").lower() == "true"
+
 # === Supabase obligatoria ===
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "batches")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
+if not OFFLINE_PROFILE and (not SUPABASE_URL or not SUPABASE_KEY):
     raise ImproperlyConfigured("Faltan SUPABASE_URL o SUPABASE_KEY en .env")
 
-USE_SUPABASE_STORAGE = True
+USE_SUPABASE_STORAGE = not OFFLINE_PROFILE
 DEFAULT_FILE_STORAGE = "batches.storage.SupabaseStorage"
 
+# Pool HTTP compartido del cliente de Supabase (segundos)
+SUPABASE_HTTP_TIMEOUT = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "20"))
+SUPABASE_HTTP_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_HTTP_CONNECT_TIMEOUT", "5"))
+SUPABASE_HTTP_MAX_CONNECTIONS = int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "10"))
+SUPABASE_HTTP_MAX_KEEPALIVE = int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", "5"))
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_HTTP_KEEPALIVE_EXPIRY", "60"))
+
 # Base de datos: solo Supabase (Postgres)
 DATABASE_URL = os.getenv("DATABASE_URL", "")
-if not DATABASE_URL:
+if not OFFLINE_PROFILE and not DATABASE_URL:
     raise ImproperlyConfigured("Falta DATABASE_URL para Supabase en .env")
 
-db_cfg = dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=True)
+if DATABASE_URL:
+    db_cfg = dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=True)
 
-# Forzar cierre de conexiones para tests
-db_cfg["OPTIONS"] = db_cfg.get("OPTIONS", {})
-db_cfg["CONN_HEALTH_CHECKS"] = True
+    # Forzar cierre de conexiones para tests
+    db_cfg["OPTIONS"] = db_cfg.get("OPTIONS", {})
+    db_cfg["CONN_HEALTH_CHECKS"] = True
+    # Con PgBouncer en modo transacción los cursores del servidor de .iterator() fallan
+    db_cfg["DISABLE_SERVER_SIDE_CURSORS"] = (
+        os.getenv("DATABASE_DISABLE_SERVER_SIDE_CURSORS", "False").lower() == "true"
+    )
+else:
+    db_cfg = {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "db.sqlite3"}
 
 DATABASES = {"default": db_cfg}
 
+# Caché compartida entre procesos web y worker: las invalidaciones del dashboard
+# (dashboard.analytics) deben verse en todos. La tabla se crea en el release.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": os.getenv("CACHE_TABLE", "django_cache"),
+    }
+}
+
+# Server-Timing y log por request: fracción muestreada (0 desactiva el middleware)
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "1.0"))
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "True").lower() == "true"
+
+# Perfil cProfile bajo demanda (?_profile=1) para usuarios staff
+REQUEST_PROFILER_ENABLED = os.getenv("REQUEST_PROFILER_ENABLED", "True").lower() == "true"
+REQUEST_PROFILER_KEEP = int(os.getenv("REQUEST_PROFILER_KEEP", "50"))
+
+# Reparto de costos generales del lote: equal, days o weight
+COST_ALLOCATION_DRIVER = os.getenv("COST_ALLOCATION_DRIVER", "equal")
+COST_ALLOCATION_WINDOW_DAYS = int(os.getenv("COST_ALLOCATION_WINDOW_DAYS", "30"))
+
+# Pestaña de rentabilidad: precios de referencia y vigencia de la caché (segundos)
+DASHBOARD_PRICE_PER_KG = float(os.getenv("DASHBOARD_PRICE_PER_KG", "9000"))
+DASHBOARD_PRICE_PER_LITER = float(os.getenv("DASHBOARD_PRICE_PER_LITER", "1800"))
+DASHBOARD_MILK_TIPO = os.getenv("DASHBOARD_MILK_TIPO", "Leche")
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "600"))
+
+# Puntos por serie temporal cuando el cliente no envía el ancho de la gráfica (LTTB)
+DASHBOARD_CHART_POINTS = int(os.getenv("DASHBOARD_CHART_POINTS", "400"))
+
+# Pestaña de cohortes: edad máxima en meses de la matriz cohorte × edad
+DASHBOARD_COHORT_MAX_AGE = int(os.getenv("DASHBOARD_COHORT_MAX_AGE", "36"))
+
+# Exportaciones CSV: filas por bloque leído del cursor y escrito en la respuesta
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+# Instantáneas Parquet (core.snapshots): filas por row group y por bloque del cursor
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "50000"))
+
+# Cola de tareas en segundo plano (jobs.queue), atendida por `manage.py worker`
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))
+JOBS_DEFAULT_TIMEOUT = int(os.getenv("JOBS_DEFAULT_TIMEOUT", "300"))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+JOBS_RETRY_BACKOFF = float(os.getenv("JOBS_RETRY_BACKOFF", "10"))
+JOBS_MAX_BACKOFF = float(os.getenv("JOBS_MAX_BACKOFF", "3600"))
+JOBS_RETENTION_DAYS = int(os.getenv("JOBS_RETENTION_DAYS", "7"))
+
+# Purga de lotes eliminados (batches.purge): filas por DELETE
+BATCH_PURGE_CHUNK_SIZE = int(os.getenv("BATCH_PURGE_CHUNK_SIZE", "5000"))
+
+# Tareas periódicas (jobs.scheduler) que dispara el worker; cron en TIME_ZONE.
+# misfire: "skip" omite los disparos perdidos mientras no había worker, "once" los ejecuta una vez.
+JOBS_SCHEDULER_ENABLED = os.getenv("JOBS_SCHEDULER_ENABLED", "True").lower() == "true"
+JOBS_SCHEDULER_INTERVAL = float(os.getenv("JOBS_SCHEDULER_INTERVAL", "30"))
+JOBS_SCHEDULE_GRACE = int(os.getenv("JOBS_SCHEDULE_GRACE", "300"))
+JOBS_SCHEDULE = {
+    "costos-recurrentes": {
+        "task": "costs.tasks.materialize_recurring",
+        "cron": "15 0 * * *",
+        "misfire": "once",
+    },
+    "curvas-crecimiento": {
+        "task": "tracking.tasks.refresh_growth_fits",
+        "cron": "30 2 * * *",
+    },
+    "imagenes-pendientes": {
+        "task": "batches.tasks.drain_images",
+        "cron": "0 * * * *",
+    },
+}
+
+# Peso de venta por defecto para la proyección de crecimiento (kg)
+SALE_WEIGHT_KG = float(os.getenv("SALE_WEIGHT_KG", "450"))
+
+# Pesajes anómalos: umbral de desviación robusta (MAD), pesajes previos de la
+# ventana y si el dashboard de seguimiento los excluye de sus agregados
+WEIGHT_ANOMALY_THRESHOLD = float(os.getenv("WEIGHT_ANOMALY_THRESHOLD", "3.5"))
+WEIGHT_ANOMALY_WINDOW = int(os.getenv("WEIGHT_ANOMALY_WINDOW", "8"))
+DASHBOARD_EXCLUDE_ANOMALIES = os.getenv("DASHBOARD_EXCLUDE_ANOMALIES", "True").lower() == "true"
+
+# Presupuestos de consultas por vista: en producción solo se registran los excesos
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "False").lower() == "true"
+
+# Muestreo de consultas lentas: umbral en ms (0 lo desactiva), EXPLAIN en segundo
+# plano solo en PostgreSQL y tope de huellas distintas guardadas
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "300"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "500"))
+
 # Test configuration
 if "test" in sys.argv:
+    QUERY_BUDGET_ENFORCE = True
+    SLOW_QUERY_THRESHOLD_MS = 0
     DATABASES["default"]["CONN_MAX_AGE"] = 0
     DATABASES["default"]["TEST"] = {
         "NAME": "test_postgres",
@@ -189,6 +302,9 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 TAILWIND_APP_NAME = "theme"
 NPM_BIN_PATH = r"C:\Program Files\nodejs\npm.cmd"
 
+# Objetivo de time-to-first-byte tras escalar el dyno desde 0 (profile_startup --check)
+COLD_START_TTFB_TARGET_MS = float(os.getenv("COLD_START_TTFB_TARGET_MS", "3000"))
+
 LOGIN_URL = "accounts:login"
 LOGIN_REDIRECT_URL = "dashboard:home"
 LOGOUT_REDIRECT_URL = "accounts:login"
@@ -278,6 +394,11 @@ LOGGING = {
         "level": "INFO",
     },
     "loggers": {
+        "core.requests": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "batches": {
             "handlers": ["console"],
             "level": "INFO",
@@ -286,6 +407,9 @@ LOGGING = {
     },
 }
 
+if "test" in sys.argv:
+    LOGGING["loggers"]["core.requests"]["level"] = "WARNING"
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
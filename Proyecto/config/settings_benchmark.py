@@ -0,0 +1,48 @@
+"""
+Perfil offline para medir rendimiento sin Supabase.
+
+Usa Postgres local o SQLite (BENCHMARK_DATABASE_URL) y storage en disco:
+
+    DJANGO_SETTINGS_MODULE=config.settings_benchmark python manage.py migrate
+    DJANGO_SETTINGS_MODULE=config.settings_benchmark python manage.py createcachetable
+    DJANGO_SETTINGS_MODULE=config.settings_benchmark python manage.py seed_herd --users 20
+"""
+
+import os
+
+os.environ["DJANGO_OFFLINE_PROFILE"] = "True"
+
+import dj_database_url  # noqa: E402
+
+from .settings import *  # noqa: E402,F403
+from .settings import BASE_DIR  # noqa: E402
+
+DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+
+DATABASES = {
+    "default": dj_database_url.parse(
+        os.getenv("BENCHMARK_DATABASE_URL", f"sqlite:///{BASE_DIR / 'benchmark.sqlite3'}"),
+        conn_max_age=600,
+    )
+}
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+MEDIA_ROOT = BASE_DIR / "benchmark_media"
+
+ALLOWED_HOSTS = ["localhost", "127.0.0.1", "testserver"]
+
+# Sin HTTPS local: las redirecciones falsearían las mediciones
+SECURE_SSL_REDIRECT = False
+SESSION_COOKIE_SECURE = False
+CSRF_COOKIE_SECURE = False
+SECURE_HSTS_SECONDS = 0
+
+# Hash rápido: el seeding crea muchos usuarios y el login no es lo que se mide
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# SQLite no crea la restricción única con nulls_distinct=False de ExportWatermark;
+# en PostgreSQL (producción) sí existe.
+SILENCED_SYSTEM_CHECKS = ["models.W047"]
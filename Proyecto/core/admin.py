@@ -0,0 +1,158 @@
+import tempfile
+
+from django.apps import apps
+from django.contrib import admin, messages
+from django.contrib.admin.sites import AlreadyRegistered
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.http import urlencode
+from django.utils.translation import gettext_lazy as _
+from unfold.admin import ModelAdmin
+
+from .models import ExportWatermark, ProfileReport, SlowQuery
+from .snapshots import DATASETS, export_dataset
+
+
+class AutoModelAdmin(ModelAdmin):
+    pass
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(ModelAdmin):
+    list_display = ("__str__", "count", "total_ms", "avg_ms", "max_ms", "last_seen")
+    search_fields = ("fingerprint",)
+    readonly_fields = [field.name for field in SlowQuery._meta.fields] + ["avg_ms"]
+    ordering = ("-total_ms",)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ProfileReport)
+class ProfileReportAdmin(ModelAdmin):
+    list_display = (
+        "__str__",
+        "view_name",
+        "status_code",
+        "query_count",
+        "sql_ms",
+        "usuario",
+        "created_at",
+        "downloads",
+    )
+    list_filter = ("view_name",)
+    exclude = ("stats",)
+    readonly_fields = [
+        field.name for field in ProfileReport._meta.fields if field.name != "stats"
+    ] + ["downloads"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<int:pk>/download/<str:kind>/",
+                self.admin_site.admin_view(self.download_view),
+                name="core_profilereport_download",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    @admin.display(description=_("Descargas"))
+    def downloads(self, obj):
+        return format_html(
+            '<a href="{}">{}</a> · <a href="{}">{}</a>',
+            reverse("admin:core_profilereport_download", args=[obj.pk, "txt"]),
+            _("Reporte"),
+            reverse("admin:core_profilereport_download", args=[obj.pk, "prof"]),
+            _("pstats"),
+        )
+
+    def download_view(self, request, pk, kind):
+        report = get_object_or_404(ProfileReport, pk=pk)
+        if not self.has_view_permission(request, report):
+            return HttpResponse(status=403)
+        if kind == "prof":
+            response = HttpResponse(bytes(report.stats), content_type="application/octet-stream")
+        else:
+            kind = "txt"
+            response = HttpResponse(report.report, content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="profile-{report.pk}.{kind}"'
+        return response
+
+
+@admin.register(ExportWatermark)
+class ExportWatermarkAdmin(ModelAdmin):
+    list_display = ("dataset", "usuario", "filas", "ultimo_id", "exportado", "downloads")
+    list_filter = ("dataset",)
+    readonly_fields = [field.name for field in ExportWatermark._meta.fields] + ["downloads"]
+    actions = ["export_incremental"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                "download/<str:dataset>/",
+                self.admin_site.admin_view(self.download_view),
+                name="core_exportwatermark_download",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    @admin.display(description=_("Descargas"))
+    def downloads(self, obj):
+        url = reverse("admin:core_exportwatermark_download", args=[obj.dataset])
+        params = {"usuario": obj.usuario_id} if obj.usuario_id else {}
+        return format_html('<a href="{}?{}">{}</a>', url, urlencode(params), _("Completa"))
+
+    def parquet_response(self, request, dataset: str, user, **options):
+        output = tempfile.TemporaryFile()
+        try:
+            export_dataset(DATASETS[dataset], output, user=user, **options)
+        except ImproperlyConfigured as exc:
+            output.close()
+            self.message_user(request, str(exc), messages.ERROR)
+            return redirect("admin:core_exportwatermark_changelist")
+        output.seek(0)
+        scope = f"-{user.pk}" if user else ""
+        filename = f"{dataset}{scope}-{timezone.localdate():%Y%m%d}.parquet"
+        return FileResponse(output, as_attachment=True, filename=filename)
+
+    def download_view(self, request, dataset):
+        """Parquet completo de ``dataset`` (``?usuario=<id>``) sin mover la marca de agua."""
+        if dataset not in DATASETS:
+            raise Http404
+        if request.method != "GET":
+            return HttpResponseNotAllowed(["GET"])
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        user = None
+        if request.GET.get("usuario"):
+            user = get_object_or_404(get_user_model(), pk=request.GET["usuario"])
+        return self.parquet_response(request, dataset, user, record=False)
+
+    @admin.action(description=_("Exportar incremental (Parquet)"), permissions=["change"])
+    def export_incremental(self, request, queryset):
+        """Filas nuevas desde la marca de agua seleccionada; la avanza (POST del admin)."""
+        if queryset.count() != 1:
+            self.message_user(request, _("Selecciona una sola marca de agua."), messages.WARNING)
+            return None
+        mark = queryset.select_related("usuario").get()
+        if mark.dataset not in DATASETS:
+            self.message_user(request, _("Conjunto desconocido."), messages.ERROR)
+            return None
+        return self.parquet_response(request, mark.dataset, mark.usuario, incremental=True)
+
+for model in apps.get_app_config("core").get_models():
+    try:
+        admin.site.register(model, AutoModelAdmin)
+    except AlreadyRegistered:
+        continue
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+
+    def ready(self):
+        from .slow_queries import install_sampler
+
+        connection_created.connect(install_sampler, dispatch_uid="core.slow_query_sampler")
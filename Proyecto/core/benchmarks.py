@@ -0,0 +1,344 @@
+"""Benchmark de latencia y consultas SQL por vista sobre datos sintéticos.
+
+Cada caso se ejecuta con el `Client` de pruebas contra un hato generado por
+`HerdSeeder` en varios tamaños; se registran p50/p95 de latencia, número de
+consultas y tiempo SQL total, y se comparan contra un baseline versionado.
+"""
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from animals.models import Animal
+from batches.models import Batch
+from costs.models import Cost
+from tracking.models import Peso, Produccion
+
+from .seeding import BENCH_USERNAME_PREFIX, HerdSeeder, SeedConfig
+
+User = get_user_model()
+
+BASELINE_PATH = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+SIZES = {
+    "small": SeedConfig(users=2, batches_per_user=2, animals_per_batch=10, years=0.5),
+    "medium": SeedConfig(users=3, batches_per_user=4, animals_per_batch=25, years=1),
+    "large": SeedConfig(users=5, batches_per_user=5, animals_per_batch=50, years=2),
+}
+
+# Vistas que solo aceptan POST o están fuera del alcance de la app
+EXCLUDED_URL_NAMES = {
+    "accounts:logout",
+    "batches:delete",
+    "animals:delete",
+    "costs:delete",
+}
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    url_name: str
+    params: dict[str, str] = field(default_factory=dict)
+    args: Callable[[Any], list[Any]] | None = None
+
+    def url(self, user) -> str:
+        args = self.args(user) if self.args else []
+        return reverse(self.url_name, args=args)
+
+
+def _first_batch(user) -> Batch:
+    return Batch.objects.by_user(user).order_by("pk").first()
+
+
+def _first_animal(user) -> Animal:
+    return Animal.objects.filter(batch__usuario=user).order_by("pk").first()
+
+
+def _pk_of(queryset_for_user: Callable[[Any], Any]) -> Callable[[Any], list[int]]:
+    return lambda user: [queryset_for_user(user).order_by("pk").values_list("pk", flat=True)[0]]
+
+
+def _batch_filter(user) -> dict[str, str]:
+    return {"batch": str(_first_batch(user).pk)}
+
+
+def _last_days(days: int) -> dict[str, str]:
+    end = timezone.localdate()
+    return {"start": (end - timedelta(days=days)).isoformat(), "end": end.isoformat()}
+
+
+def build_cases(user) -> list[BenchmarkCase]:
+    """Casos típicos por URL: sin filtros y con los filtros más comunes."""
+    batch = _batch_filter(user)
+    animal = {"animal": str(_first_animal(user).pk)}
+    last_quarter = _last_days(90)
+    return [
+        BenchmarkCase("login", "accounts:login"),
+        BenchmarkCase("signup", "accounts:signup"),
+        BenchmarkCase("dashboard", "dashboard:home"),
+        BenchmarkCase("dashboard_lotes", "dashboard:lotes"),
+        BenchmarkCase("dashboard_lotes_lote", "dashboard:lotes", {"lote": batch["batch"]}),
+        BenchmarkCase("dashboard_tracking", "dashboard:tracking"),
+        BenchmarkCase("dashboard_tracking_lote", "dashboard:tracking", {"lote": batch["batch"]}),
+        BenchmarkCase("dashboard_tracking_periodo", "dashboard:tracking", last_quarter),
+        BenchmarkCase("dashboard_costos", "dashboard:costos"),
+        BenchmarkCase("dashboard_costos_periodo", "dashboard:costos", last_quarter),
+        BenchmarkCase("dashboard_rentabilidad", "dashboard:rentabilidad"),
+        BenchmarkCase(
+            "dashboard_rentabilidad_lote", "dashboard:rentabilidad", {"lote": batch["batch"]}
+        ),
+        BenchmarkCase("dashboard_cohortes", "dashboard:cohortes"),
+        BenchmarkCase(
+            "dashboard_cohortes_trimestre",
+            "dashboard:cohortes",
+            {"granularidad": "trimestre", "metrica": "costo"},
+        ),
+        BenchmarkCase("batch_list", "batches:list"),
+        BenchmarkCase("batch_list_search", "batches:list", {"search": "a", "order": "nombre"}),
+        BenchmarkCase("batch_create", "batches:create"),
+        BenchmarkCase("batch_update", "batches:update", args=_pk_of(Batch.objects.by_user)),
+        BenchmarkCase("animal_list", "animals:list"),
+        BenchmarkCase("animal_list_batch", "animals:list", {**batch, "sex": "F"}),
+        BenchmarkCase("animal_export", "animals:export"),
+        BenchmarkCase("animal_add", "animals:add"),
+        BenchmarkCase(
+            "animal_edit",
+            "animals:edit",
+            args=_pk_of(lambda u: Animal.objects.filter(batch__usuario=u)),
+        ),
+        BenchmarkCase("peso_list", "tracking:peso-list"),
+        BenchmarkCase("peso_list_batch", "tracking:peso-list", batch),
+        BenchmarkCase("peso_list_animal", "tracking:peso-list", {**batch, **animal}),
+        BenchmarkCase("peso_list_periodo", "tracking:peso-list", last_quarter),
+        BenchmarkCase("peso_export", "tracking:peso-export"),
+        BenchmarkCase("peso_create", "tracking:peso-create"),
+        BenchmarkCase(
+            "peso_update",
+            "tracking:peso-update",
+            args=_pk_of(lambda u: Peso.objects.filter(animal__batch__usuario=u)),
+        ),
+        BenchmarkCase(
+            "peso_delete",
+            "tracking:peso-delete",
+            args=_pk_of(lambda u: Peso.objects.filter(animal__batch__usuario=u)),
+        ),
+        BenchmarkCase("growth_forecast", "tracking:forecast", {"batch": batch["batch"]}),
+        BenchmarkCase("produccion_list", "tracking:produccion-list"),
+        BenchmarkCase(
+            "produccion_list_tipo", "tracking:produccion-list", {**batch, "tipo": "Leche"}
+        ),
+        BenchmarkCase(
+            "produccion_export", "tracking:produccion-export", {**batch, "tipo": "Leche"}
+        ),
+        BenchmarkCase("produccion_create", "tracking:produccion-create"),
+        BenchmarkCase(
+            "produccion_update",
+            "tracking:produccion-update",
+            args=_pk_of(lambda u: Produccion.objects.filter(animal__batch__usuario=u)),
+        ),
+        BenchmarkCase(
+            "produccion_delete",
+            "tracking:produccion-delete",
+            args=_pk_of(lambda u: Produccion.objects.filter(animal__batch__usuario=u)),
+        ),
+        BenchmarkCase("cost_list", "costs:list"),
+        BenchmarkCase("cost_list_tipo", "costs:list", {**batch, "tipo": Cost.CostType.FEED}),
+        BenchmarkCase("cost_list_periodo", "costs:list", {**last_quarter, "search": "a"}),
+        BenchmarkCase("cost_export", "costs:export"),
+        BenchmarkCase("cost_add", "costs:add"),
+        BenchmarkCase("cost_edit", "costs:edit", args=_pk_of(Cost.objects.for_user)),
+    ]
+
+
+def iter_url_names(resolver: URLResolver | None = None, namespace: str = "") -> list[str]:
+    """Nombres completos de todas las URLs de la app (sin el admin)."""
+    resolver = resolver or get_resolver()
+    names = []
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name == "admin":
+                continue
+            child_namespace = pattern.namespace or namespace
+            names.extend(iter_url_names(pattern, child_namespace))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.append(f"{namespace}:{pattern.name}" if namespace else pattern.name)
+    return names
+
+
+def uncovered_url_names(cases: list[BenchmarkCase]) -> set[str]:
+    covered = {case.url_name for case in cases}
+    return set(iter_url_names()) - covered - EXCLUDED_URL_NAMES
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class SqlTimer:
+    """Suma con ``perf_counter`` el tiempo de cada consulta.
+
+    ``captured_queries`` guarda la duración con resolución de milisegundos, así
+    que en SQLite casi todas las consultas quedaban en 0.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def measure_case(client: Client, url: str, params: dict[str, str], repeat: int) -> dict[str, Any]:
+    client.get(url, params)  # calentamiento: plantillas y caches del proceso
+    durations, sql_times = [], []
+    queries = status = 0
+    for _ in range(repeat):
+        timer = SqlTimer()
+        with CaptureQueriesContext(connection) as captured, connection.execute_wrapper(timer):
+            start = time.perf_counter()
+            response = client.get(url, params)
+            if response.streaming:  # las exportaciones consultan mientras se envían
+                b"".join(response.streaming_content)
+            durations.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+        queries = len(captured.captured_queries)
+        sql_times.append(timer.seconds * 1000)
+    return {
+        "status": status,
+        "p50_ms": round(percentile(durations, 50), 2),
+        "p95_ms": round(percentile(durations, 95), 2),
+        "queries": queries,
+        "sql_ms": round(percentile(sql_times, 50), 3),
+    }
+
+
+def run_size(size: str, repeat: int, log: Callable[[str], None] = print) -> dict[str, Any]:
+    config = SIZES[size]
+    HerdSeeder.clear()
+    counts = HerdSeeder(config).run()
+    user = User.objects.filter(username__startswith=BENCH_USERNAME_PREFIX).order_by("pk").first()
+
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for case in build_cases(user):
+        results[case.name] = measure_case(client, case.url(user), case.params, repeat)
+        log(f"[{size}] {case.name}: {results[case.name]}")
+    return {"rows": counts, "cases": results}
+
+
+def run_benchmarks(sizes: list[str], repeat: int, log: Callable[[str], None] = print) -> dict:
+    return {
+        "meta": {
+            "database": settings.DATABASES["default"]["ENGINE"],
+            "repeat": repeat,
+            "created_at": timezone.now().isoformat(timespec="seconds"),
+        },
+        "sizes": {size: run_size(size, repeat, log) for size in sizes},
+    }
+
+
+def measure_middleware_overhead(
+    user, middleware: str, url_name: str = "costs:list", rounds: int = 200
+) -> dict[str, float]:
+    """Compara la mediana de latencia de una vista caliente con y sin un middleware.
+
+    Las dos variantes se alternan request a request (cambiando el orden en cada
+    ronda) y el sobrecosto se estima con la mediana de las diferencias por par,
+    que filtra la deriva del equipo.
+    """
+    without = [path for path in settings.MIDDLEWARE if path != middleware]
+    url = reverse(url_name)
+
+    enabled = Client()
+    enabled.force_login(user)
+    enabled.get(url)
+    with override_settings(MIDDLEWARE=without):
+        disabled = Client()
+        disabled.force_login(user)
+        disabled.get(url)  # la cadena de middleware queda fija en el primer request
+
+    samples: dict[str, list[float]] = {"enabled": [], "disabled": []}
+    pair = (("disabled", disabled), ("enabled", enabled))
+    for round_index in range(rounds):
+        # Alterna también el orden dentro del par para no favorecer a ninguno
+        for key, client in pair if round_index % 2 else pair[::-1]:
+            start = time.perf_counter()
+            client.get(url)
+            samples[key].append((time.perf_counter() - start) * 1000)
+
+    disabled_ms = percentile(samples["disabled"], 50)
+    paired_delta = percentile(
+        [on - off for on, off in zip(samples["enabled"], samples["disabled"], strict=True)], 50
+    )
+    return {
+        "enabled_ms": round(percentile(samples["enabled"], 50), 3),
+        "disabled_ms": round(disabled_ms, 3),
+        "overhead_pct": round(paired_delta / disabled_ms * 100, 2),
+    }
+
+
+def compare_results(
+    current: dict, baseline: dict, tolerance: float, min_delta_ms: float = 2.0
+) -> list[str]:
+    """Lista de regresiones frente al baseline.
+
+    La latencia se compara con tolerancia relativa (y un mínimo absoluto para no
+    marcar ruido en vistas de pocos ms); el número de consultas es determinista y
+    cualquier aumento cuenta como regresión.
+    """
+    regressions = []
+    for size, size_result in current.get("sizes", {}).items():
+        baseline_cases = baseline.get("sizes", {}).get(size, {}).get("cases", {})
+        for name, result in size_result["cases"].items():
+            reference = baseline_cases.get(name)
+            if not reference:
+                continue
+            if result["queries"] > reference["queries"]:
+                regressions.append(
+                    f"[{size}] {name}: {result['queries']} consultas "
+                    f"(baseline {reference['queries']})"
+                )
+            for metric in ("p95_ms", "sql_ms"):
+                limit = max(reference[metric] * (1 + tolerance), reference[metric] + min_delta_ms)
+                if result[metric] > limit:
+                    regressions.append(
+                        f"[{size}] {name}: {metric} {result[metric]:.1f} "
+                        f"(baseline {reference[metric]:.1f}, límite {limit:.1f})"
+                    )
+    return regressions
+
+
+def load_results(path: Path) -> dict:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def write_results(results: dict, path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+        handle.write("\n")
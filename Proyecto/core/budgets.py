@@ -0,0 +1,154 @@
+"""Presupuestos declarativos de consultas SQL por vista.
+
+Una vista declara cuántas consultas puede ejecutar por request, ya sea con el
+atributo de clase ``query_budget`` o con el decorador :func:`query_budget`::
+
+    class CostListView(CostQuerysetMixin, ListView):
+        query_budget = 6
+
+    @query_budget(3)
+    def health(request): ...
+
+`QueryBudgetMiddleware` cuenta las consultas del request completo (incluido el
+render de la plantilla). Con ``QUERY_BUDGET_ENFORCE`` (activo en los tests) un
+exceso lanza :class:`QueryBudgetExceeded`; en producción solo se registra una
+advertencia con las huellas SQL repetidas y el lugar del código que las originó.
+Las lecturas y escrituras de la caché en base de datos (``DatabaseCache``) y
+los savepoints no cuentan: dependen del estado de la caché y no de la vista.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import traceback
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+THIS_FILE = str(Path(__file__).resolve())
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_SAVEPOINT = re.compile(r"^\s*(?:RELEASE |ROLLBACK TO )?SAVEPOINT\b", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql: str) -> str:
+    """Normaliza una consulta quitando literales para agrupar las repetidas."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def caller_site() -> str:
+    """Primer frame del proyecto (fuera de librerías y de este módulo)."""
+    for frame in reversed(traceback.extract_stack()):
+        filename = str(Path(frame.filename).resolve())
+        if filename == THIS_FILE or not filename.startswith(PROJECT_DIR):
+            continue
+        if "site-packages" in filename:
+            continue
+        return f"{Path(filename).relative_to(PROJECT_DIR)}:{frame.lineno} in {frame.name}"
+    return "?"
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declara el máximo de consultas de una vista función o de una clase de vista."""
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+def get_view_budget(view_func: Callable) -> int | None:
+    budget = getattr(view_func, "query_budget", None)
+    if budget is None:
+        budget = getattr(getattr(view_func, "view_class", None), "query_budget", None)
+    return budget
+
+
+def cache_tables() -> tuple[str, ...]:
+    """Tablas de las cachés ``DatabaseCache`` configuradas."""
+    return tuple(
+        config["LOCATION"]
+        for config in settings.CACHES.values()
+        if config["BACKEND"] == "django.core.cache.backends.db.DatabaseCache"
+    )
+
+
+class QueryRecorder:
+    """Execute wrapper que cuenta consultas y guarda el origen de las excedentes."""
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+        self.count = 0
+        self.statements: list[str] = []
+        self.sites: Counter[str] = Counter()
+        self.ignored = cache_tables()
+
+    def __call__(self, execute, sql, params, many, context):
+        if _SAVEPOINT.match(sql) or any(table in sql for table in self.ignored):
+            return execute(sql, params, many, context)
+        self.count += 1
+        self.statements.append(sql)
+        if self.count > self.budget:
+            self.sites[caller_site()] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def exceeded(self) -> bool:
+        return self.count > self.budget
+
+    def report(self, label: str) -> str:
+        repeated = Counter(fingerprint(sql) for sql in self.statements).most_common(5)
+        lines = [f"{label}: {self.count} consultas (presupuesto {self.budget})"]
+        lines += [f"  {times}x {sql[:200]}" for sql, times in repeated]
+        lines += [
+            f"  excedente desde {site} ({times}x)" for site, times in self.sites.most_common(5)
+        ]
+        return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            recorder: QueryRecorder | None = getattr(request, "_query_recorder", None)
+            if recorder is not None and recorder in connection.execute_wrappers:
+                connection.execute_wrappers.remove(recorder)
+
+        if recorder is not None and recorder.exceeded:
+            message = recorder.report(f"{request.method} {request.path}")
+            if getattr(settings, "QUERY_BUDGET_ENFORCE", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs) -> Any:
+        budget = get_view_budget(view_func)
+        if budget is None:
+            return None
+        # Se instala aquí y se retira en __call__ para incluir el render de la plantilla
+        request._query_recorder = QueryRecorder(budget)
+        connection.execute_wrappers.append(request._query_recorder)
+        return None
@@ -0,0 +1,46 @@
+"""Factories de datos sintéticos para benchmarks y pruebas de carga."""
+from __future__ import annotations
+
+import factory
+from django.contrib.auth import get_user_model
+from factory.django import DjangoModelFactory
+
+from animals.models import Animal, cohort_key
+from batches.models import Batch
+
+ESPECIES = {
+    "Bovino": ["Holstein", "Angus", "Brahman", "Normando", "Gyr"],
+    "Ovino": ["Merino", "Dorper", "Santa Inés"],
+    "Caprino": ["Saanen", "Boer", "Alpina"],
+}
+
+
+class UserFactory(DjangoModelFactory):
+    class Meta:
+        model = get_user_model()
+
+    username = factory.Sequence(lambda n: f"bench-{n}@example.com")
+    email = factory.SelfAttribute("username")
+
+
+class BatchFactory(DjangoModelFactory):
+    class Meta:
+        model = Batch
+
+    usuario = factory.SubFactory(UserFactory)
+    nombre = factory.Faker("city", locale="es_CO")
+    direccion = factory.Faker("street_address", locale="es_CO")
+
+
+class AnimalFactory(DjangoModelFactory):
+    class Meta:
+        model = Animal
+
+    batch = factory.SubFactory(BatchFactory)
+    codigo = factory.Sequence(lambda n: f"BEN-{n:07d}")
+    especie = factory.Faker("random_element", elements=list(ESPECIES))
+    raza = factory.LazyAttribute(lambda o: factory.random.randgen.choice(ESPECIES[o.especie]))
+    sexo = factory.Faker("random_element", elements=["M", "F"])
+    fecha_de_nacimiento = factory.Faker("date_between", start_date="-6y", end_date="-1y")
+    # bulk_create no pasa por Animal.save
+    cohorte = factory.LazyAttribute(lambda o: cohort_key(o.fecha_de_nacimiento))
@@ -0,0 +1,63 @@
+"""Resumen de listados filtrados en una sola consulta agregada.
+
+`SummaryListMixin` calcula total, agregados numéricos y fecha máxima del
+queryset filtrado con un único ``aggregate`` y le pasa el total al paginador,
+que así no repite el ``COUNT(*)``. El registro más reciente sale de la primera
+fila de la página 1 cuando la vista ordena por fecha descendente::
+
+    class CostListView(SummaryListMixin, ListView):
+        summary_aggregates = {"sum": Sum("monto")}
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.paginator import Paginator
+from django.db.models import Aggregate, Count, Max, QuerySet
+
+
+class CountedPaginator(Paginator):
+    """Paginador que recibe el total ya calculado."""
+
+    def __init__(self, *args, count: int | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if count is not None:
+            self.count = count  # Paginator.count es un cached_property
+
+
+def summarize(
+    queryset: QuerySet, aggregates: dict[str, Aggregate], date_field: str = "fecha"
+) -> dict[str, Any]:
+    return queryset.order_by().select_related(None).aggregate(
+        total=Count("pk"), last_date=Max(date_field), **aggregates
+    )
+
+
+class SummaryListMixin:
+    summary_aggregates: dict[str, Aggregate] = {}
+    summary_date_field = "fecha"
+
+    def get_summary(self) -> dict[str, Any]:
+        if not hasattr(self, "_summary"):
+            self._summary = summarize(
+                self.object_list, self.summary_aggregates, self.summary_date_field
+            )
+        return self._summary
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return CountedPaginator(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count=self.get_summary()["total"],
+            **kwargs,
+        )
+
+    def get_latest(self, context: dict[str, Any]):
+        """Registro más reciente; requiere que el queryset ordene por fecha descendente."""
+        page = context.get("page_obj")
+        if page is None or page.number == 1:
+            rows = context["object_list"]
+            return rows[0] if rows else None
+        return self.object_list.first()
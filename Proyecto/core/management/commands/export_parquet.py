@@ -0,0 +1,63 @@
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from core.snapshots import DATASETS, export_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Escribe una instantánea Parquet (un archivo por conjunto) de lotes, animales, "
+        "pesos, producción y costos, de un usuario o de toda la base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=Path, help="Directorio de destino.")
+        parser.add_argument("--user", default=None, help="Username; por defecto toda la base.")
+        parser.add_argument(
+            "--datasets",
+            default=",".join(DATASETS),
+            help=f"Separados por coma: {', '.join(DATASETS)}",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Solo las filas nuevas o editadas desde la última exportación.",
+        )
+        parser.add_argument("--row-group-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options["datasets"].split(",") if name.strip()]
+        unknown = set(names) - set(DATASETS)
+        if unknown:
+            raise CommandError(f"Conjuntos desconocidos: {', '.join(sorted(unknown))}")
+
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist as exc:
+                raise CommandError(f"No existe el usuario {options['user']}.") from exc
+
+        start = time.perf_counter()
+        try:
+            results = export_snapshot(
+                options["output"],
+                user=user,
+                names=names,
+                incremental=options["incremental"],
+                row_group_size=options["row_group_size"],
+            )
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc)) from exc
+        elapsed = time.perf_counter() - start
+
+        for result in results:
+            kind = "incremental" if result.incremental else "completa"
+            self.stdout.write(f"{result.dataset}: {result.rows} filas ({kind}) -> {result.path}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{sum(r.rows for r in results)} filas en {elapsed:.1f} s.")
+        )
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import measure_middleware_overhead
+from core.seeding import BENCH_USERNAME_PREFIX
+
+MIDDLEWARE_PATH = "core.middleware.ServerTimingMiddleware"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el sobrecosto de ServerTimingMiddleware sobre una vista caliente "
+        "(objetivo: menos de 1%). Requiere datos de seed_herd."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url-name", default="costs:list")
+        parser.add_argument("--rounds", type=int, default=300)
+        parser.add_argument("--max-overhead", type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        if not getattr(settings, "OFFLINE_PROFILE", False):
+            raise CommandError("Usa config.settings_benchmark.")
+        user = (
+            get_user_model()
+            .objects.filter(username__startswith=BENCH_USERNAME_PREFIX)
+            .order_by("pk")
+            .first()
+        )
+        if user is None:
+            raise CommandError("No hay datos sintéticos: ejecuta seed_herd primero.")
+
+        result = measure_middleware_overhead(
+            user, MIDDLEWARE_PATH, options["url_name"], options["rounds"]
+        )
+        message = (
+            f"{options['url_name']}: {result['enabled_ms']:.2f} ms con middleware, "
+            f"{result['disabled_ms']:.2f} ms sin él ({result['overhead_pct']:+.2f}%)"
+        )
+        if result["overhead_pct"] > options["max_overhead"]:
+            raise CommandError(message)
+        self.stdout.write(self.style.SUCCESS(message))
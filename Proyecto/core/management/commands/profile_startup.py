@@ -0,0 +1,49 @@
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from core.startup import group_by_package, measure_first_byte, profile_imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Perfila el arranque en frío: tiempo de importación por paquete y "
+        "time-to-first-byte de un proceso nuevo frente a COLD_START_TTFB_TARGET_MS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=20, help="Paquetes a mostrar.")
+        parser.add_argument("--path", default="", help="URL del primer request.")
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument("--target-ms", type=float, default=None)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Falla si la mediana del TTFB supera el objetivo.",
+        )
+
+    def handle(self, *args, **options):
+        entries = profile_imports()
+        total_ms = sum(entry.self_us for entry in entries) / 1000
+        self.stdout.write(f"Import time total: {total_ms:.0f} ms ({len(entries)} módulos)")
+        for package, self_us in group_by_package(entries)[: options["top"]]:
+            self.stdout.write(f"  {package:<30} {self_us / 1000:8.1f} ms")
+
+        path = options["path"] or reverse(settings.LOGIN_URL)
+        samples = []
+        for _ in range(options["runs"]):
+            elapsed_ms, status = measure_first_byte(path)
+            samples.append(elapsed_ms)
+            self.stdout.write(f"First byte {path} -> {status} in {elapsed_ms:.0f} ms")
+
+        target = options["target_ms"] or settings.COLD_START_TTFB_TARGET_MS
+        result = median(samples)
+        message = f"Cold start TTFB median {result:.0f} ms (target {target:.0f} ms)"
+        if result <= target:
+            self.stdout.write(self.style.SUCCESS(message))
+        elif options["check"]:
+            raise CommandError(message)
+        else:
+            self.stdout.write(self.style.WARNING(message))
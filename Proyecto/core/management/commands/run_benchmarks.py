@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import (
+    BASELINE_PATH,
+    SIZES,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    write_results,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide p50/p95, consultas y tiempo SQL de cada URL sobre datos sintéticos y "
+        "compara contra el baseline. Solo corre con config.settings_benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="small", help=f"Separados por coma: {', '.join(SIZES)}"
+        )
+        parser.add_argument("--repeat", type=int, default=15)
+        parser.add_argument("--output", type=Path, default=None)
+        parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+        parser.add_argument("--tolerance", type=float, default=0.3)
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Escribe los resultados como nuevo baseline.",
+        )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, "OFFLINE_PROFILE", False):
+            raise CommandError(
+                "Los benchmarks borran y regeneran datos: usa config.settings_benchmark."
+            )
+
+        sizes = [size.strip() for size in options["sizes"].split(",") if size.strip()]
+        unknown = set(sizes) - set(SIZES)
+        if unknown:
+            raise CommandError(f"Tamaños desconocidos: {', '.join(sorted(unknown))}")
+
+        results = run_benchmarks(sizes, options["repeat"], log=self.stdout.write)
+
+        if options["output"]:
+            write_results(results, options["output"])
+        if options["update_baseline"]:
+            write_results(results, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline actualizado en {options['baseline']}"))
+            return
+
+        if not options["baseline"].exists():
+            self.stdout.write(self.style.WARNING("No hay baseline para comparar."))
+            return
+
+        baseline = load_results(options["baseline"])
+        regressions = compare_results(results, baseline, options["tolerance"])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f"{len(regressions)} regresiones frente al baseline.")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones frente al baseline."))
@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seeding import BENCH_PASSWORD, BENCH_USERNAME_PREFIX, HerdSeeder, SeedConfig
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un hato sintético (usuarios, lotes, animales, pesos y producción "
+        "diarios, costos mensuales) para benchmarks con config.settings_benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5)
+        parser.add_argument("--batches-per-user", type=int, default=4)
+        parser.add_argument("--animals-per-batch", type=int, default=25)
+        parser.add_argument("--years", type=float, default=1.0)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Borra antes los usuarios sintéticos existentes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            HerdSeeder.clear()
+        elif get_user_model().objects.filter(username__startswith=BENCH_USERNAME_PREFIX).exists():
+            raise CommandError("Ya existen datos sintéticos; usa --reset para regenerarlos.")
+
+        config = SeedConfig(
+            users=options["users"],
+            batches_per_user=options["batches_per_user"],
+            animals_per_batch=options["animals_per_batch"],
+            years=options["years"],
+            chunk_size=options["chunk_size"],
+            seed=options["seed"],
+        )
+        start = time.perf_counter()
+        counts = HerdSeeder(config, log=self.stdout.write).run()
+        elapsed = time.perf_counter() - start
+
+        rows = sum(counts.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{rows} filas en {elapsed:.1f} s ({rows / elapsed:.0f} filas/s). "
+                f"Contraseña de los usuarios: {BENCH_PASSWORD}"
+            )
+        )
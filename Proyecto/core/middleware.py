@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.urls import reverse
+
+from . import profiling, timing
+
+logger = logging.getLogger("core.requests")
+
+
+class ServerTimingMiddleware:
+    """Mide total, BD, render de plantilla y storage de una muestra de requests.
+
+    Los tiempos se envían en la cabecera ``Server-Timing`` y en una línea de log
+    JSON por request. ``SERVER_TIMING_SAMPLE_RATE`` (0-1) controla la muestra; con
+    0 el middleware se desactiva por completo al arrancar.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 1.0)
+        self.send_header = getattr(settings, "SERVER_TIMING_HEADER", True)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = timing.RequestTimings()
+        start = time.perf_counter()
+        with timing.activate(timings), connection.execute_wrapper(self._time_query(timings)):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        if self.send_header:
+            response["Server-Timing"] = self._header(timings, total_ms)
+        logger.info(json.dumps(self._log_record(request, response, timings, total_ms)))
+        return response
+
+    def process_template_response(self, request, response):
+        timings = timing.current()
+        if timings is None:
+            return response
+
+        start = time.perf_counter()
+
+        def rendered(_response):
+            timings.add("template", time.perf_counter() - start)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def _time_query(timings: timing.RequestTimings):
+        durations, counts = timings.durations, timings.counts
+        perf_counter = time.perf_counter
+
+        def wrapper(execute, sql, params, many, context):
+            start = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                durations["db"] += perf_counter() - start
+                counts["db"] += 1
+
+        return wrapper
+
+    @staticmethod
+    def _header(timings: timing.RequestTimings, total_ms: float) -> str:
+        metrics = [f'db;dur={timings.ms("db"):.1f};desc="{timings.counts.get("db", 0)} queries"']
+        if "template" in timings.counts:
+            metrics.append(f'tpl;dur={timings.ms("template"):.1f}')
+        if "storage" in timings.counts:
+            metrics.append(f'storage;dur={timings.ms("storage"):.1f}')
+        metrics.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(metrics)
+
+    @staticmethod
+    def _log_record(request, response, timings: timing.RequestTimings, total_ms: float) -> dict:
+        match = getattr(request, "resolver_match", None)
+        return {
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "db_ms": round(timings.ms("db"), 2),
+            "queries": timings.counts.get("db", 0),
+            "template_ms": round(timings.ms("template"), 2),
+            "storage_ms": round(timings.ms("storage"), 2),
+            "storage_calls": timings.counts.get("storage", 0),
+        }
+
+
+class RequestProfilerMiddleware:
+    """Perfila con cProfile los requests de staff que lo piden explícitamente.
+
+    Se activa con ``?_profile=1`` o la cabecera ``X-Profile: 1``; para el resto de
+    usuarios el parámetro se ignora. Con ``REQUEST_PROFILER_ENABLED`` en False el
+    middleware se retira de la cadena al arrancar. Solo se perfila un request a
+    la vez por proceso: cProfile no admite perfiles simultáneos.
+    """
+
+    QUERY_PARAM = "_profile"
+    HEADER = "HTTP_X_PROFILE"
+
+    def __init__(self, get_response: Callable) -> None:
+        if not getattr(settings, "REQUEST_PROFILER_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.keep = getattr(settings, "REQUEST_PROFILER_KEEP", 50)
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if not self._requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+        if not self._lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self._profile(request)
+        finally:
+            self._lock.release()
+
+    def _requested(self, request) -> bool:
+        return request.GET.get(self.QUERY_PARAM) == "1" or request.META.get(self.HEADER) == "1"
+
+    def _profile(self, request):
+        from .models import ProfileReport
+
+        profiler = cProfile.Profile()
+        sql = profiling.SQLCapture()
+        start = time.perf_counter()
+        with connection.execute_wrapper(sql):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        title = f"{request.method} {request.get_full_path()}"
+        report = ProfileReport.objects.create(
+            usuario=request.user,
+            method=request.method,
+            path=request.get_full_path()[:500],
+            view_name=match.view_name if match else "",
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            query_count=len(sql.queries),
+            sql_ms=sql.total_ms,
+            report=profiling.build_report(title, duration_ms, profiler, sql),
+            stats=profiling.dump_stats(profiler),
+        )
+        stale = ProfileReport.objects.values_list("pk", flat=True)[self.keep:]
+        ProfileReport.objects.filter(pk__in=list(stale)).delete()
+
+        response["X-Profile-Report"] = reverse("admin:core_profilereport_change", args=[report.pk])
+        return response
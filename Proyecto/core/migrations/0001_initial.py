@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint_hash', models.CharField(max_length=40, unique=True, verbose_name='Hash de la huella')),
+                ('fingerprint', models.TextField(verbose_name='Huella SQL')),
+                ('sample_sql', models.TextField(verbose_name='Consulta de ejemplo')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Ejecuciones lentas')),
+                ('total_ms', models.FloatField(default=0, verbose_name='Tiempo total (ms)')),
+                ('max_ms', models.FloatField(default=0, verbose_name='Tiempo máximo (ms)')),
+                ('plan', models.JSONField(blank=True, null=True, verbose_name='Plan (EXPLAIN)')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='Primera vez')),
+                ('last_seen', models.DateTimeField(auto_now=True, verbose_name='Última vez')),
+            ],
+            options={
+                'verbose_name': 'Consulta lenta',
+                'verbose_name_plural': 'Consultas lentas',
+                'ordering': ['-total_ms'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='Método')),
+                ('path', models.CharField(max_length=500, verbose_name='Ruta')),
+                ('view_name', models.CharField(blank=True, max_length=200, verbose_name='Vista')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Código de respuesta')),
+                ('duration_ms', models.FloatField(verbose_name='Duración (ms)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Consultas')),
+                ('sql_ms', models.FloatField(verbose_name='Tiempo SQL (ms)')),
+                ('report', models.TextField(verbose_name='Reporte')),
+                ('stats', models.BinaryField(verbose_name='Estadísticas pstats')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profile_reports', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Perfil de request',
+                'verbose_name_plural': 'Perfiles de request',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
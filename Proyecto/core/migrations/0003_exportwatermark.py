@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_profilereport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset', models.CharField(max_length=20, verbose_name='Conjunto')),
+                ('ultimo_id', models.BigIntegerField(default=0, verbose_name='Último id exportado')),
+                ('ultima_actualizacion', models.DateTimeField(blank=True, null=True, verbose_name='Última actualización exportada')),
+                ('filas', models.PositiveIntegerField(default=0, verbose_name='Filas de la última exportación')),
+                ('exportado', models.DateTimeField(auto_now=True, verbose_name='Exportado')),
+                ('usuario', models.ForeignKey(blank=True, help_text='Vacío para la exportación de toda la base.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='export_watermarks', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Marca de agua de exportación',
+                'verbose_name_plural': 'Marcas de agua de exportación',
+                'ordering': ['dataset', 'usuario'],
+                'constraints': [models.UniqueConstraint(fields=('dataset', 'usuario'), name='unique_export_watermark')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_exportwatermark'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='exportwatermark',
+            name='unique_export_watermark',
+        ),
+        migrations.AddConstraint(
+            model_name='exportwatermark',
+            constraint=models.UniqueConstraint(fields=('dataset', 'usuario'), name='unique_export_watermark', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,164 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SlowQuery(models.Model):
+    """Agregado de las consultas lentas que comparten la misma huella SQL."""
+
+    fingerprint_hash = models.CharField(
+        max_length=40,
+        unique=True,
+        verbose_name=_("Hash de la huella")
+    )
+    fingerprint = models.TextField(
+        verbose_name=_("Huella SQL")
+    )
+    sample_sql = models.TextField(
+        verbose_name=_("Consulta de ejemplo")
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Ejecuciones lentas")
+    )
+    total_ms = models.FloatField(
+        default=0,
+        verbose_name=_("Tiempo total (ms)")
+    )
+    max_ms = models.FloatField(
+        default=0,
+        verbose_name=_("Tiempo máximo (ms)")
+    )
+    plan = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name=_("Plan (EXPLAIN)")
+    )
+    first_seen = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Primera vez")
+    )
+    last_seen = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Última vez")
+    )
+
+    class Meta:
+        verbose_name = _("Consulta lenta")
+        verbose_name_plural = _("Consultas lentas")
+        ordering = ["-total_ms"]
+
+    def __str__(self) -> str:
+        return self.fingerprint[:80]
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class ProfileReport(models.Model):
+    """Perfil cProfile de un request individual pedido por un usuario staff."""
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Usuario"),
+        related_name="profile_reports"
+    )
+    method = models.CharField(
+        max_length=10,
+        verbose_name=_("Método")
+    )
+    path = models.CharField(
+        max_length=500,
+        verbose_name=_("Ruta")
+    )
+    view_name = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name=_("Vista")
+    )
+    status_code = models.PositiveSmallIntegerField(
+        verbose_name=_("Código de respuesta")
+    )
+    duration_ms = models.FloatField(
+        verbose_name=_("Duración (ms)")
+    )
+    query_count = models.PositiveIntegerField(
+        verbose_name=_("Consultas")
+    )
+    sql_ms = models.FloatField(
+        verbose_name=_("Tiempo SQL (ms)")
+    )
+    report = models.TextField(
+        verbose_name=_("Reporte")
+    )
+    stats = models.BinaryField(
+        verbose_name=_("Estadísticas pstats")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Fecha de creación")
+    )
+
+    class Meta:
+        verbose_name = _("Perfil de request")
+        verbose_name_plural = _("Perfiles de request")
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class ExportWatermark(models.Model):
+    """Última exportación Parquet de un conjunto, por usuario o de toda la base."""
+
+    dataset = models.CharField(
+        max_length=20,
+        verbose_name=_("Conjunto")
+    )
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name=_("Usuario"),
+        help_text=_("Vacío para la exportación de toda la base."),
+        related_name="export_watermarks"
+    )
+    ultimo_id = models.BigIntegerField(
+        default=0,
+        verbose_name=_("Último id exportado")
+    )
+    ultima_actualizacion = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Última actualización exportada")
+    )
+    filas = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Filas de la última exportación")
+    )
+    exportado = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Exportado")
+    )
+
+    class Meta:
+        verbose_name = _("Marca de agua de exportación")
+        verbose_name_plural = _("Marcas de agua de exportación")
+        ordering = ["dataset", "usuario"]
+        constraints = [
+            # La exportación de toda la base (usuario NULL) también es única por conjunto
+            models.UniqueConstraint(
+                fields=["dataset", "usuario"],
+                name="unique_export_watermark",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self) -> str:
+        scope = self.usuario or _("toda la base")
+        return f"{self.dataset} · {scope}"
@@ -0,0 +1,74 @@
+"""Perfil cProfile bajo demanda de un request individual.
+
+Un usuario staff agrega ``?_profile=1`` (o la cabecera ``X-Profile: 1``) a
+cualquier URL; `RequestProfilerMiddleware` perfila ese request, captura sus
+consultas SQL y guarda un :class:`core.models.ProfileReport` con el árbol de
+llamadas y las consultas más costosas. La respuesta incluye la cabecera
+``X-Profile-Report`` con la ruta del reporte en el admin.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from collections import defaultdict
+
+from .budgets import fingerprint
+
+TOP_FUNCTIONS = 40
+TOP_CALLEES = 15
+TOP_QUERIES = 10
+
+
+class SQLCapture:
+    """Execute wrapper que guarda cada consulta con su duración."""
+
+    def __init__(self) -> None:
+        self.queries: list[tuple[str, float]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - start) * 1000))
+
+    @property
+    def total_ms(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    def top(self, limit: int = TOP_QUERIES) -> list[tuple[str, int, float]]:
+        """Huellas ordenadas por tiempo total: (huella, veces, ms)."""
+        grouped: dict[str, list[float]] = defaultdict(list)
+        for sql, duration in self.queries:
+            grouped[fingerprint(sql)].append(duration)
+        ranked = sorted(grouped.items(), key=lambda item: sum(item[1]), reverse=True)
+        return [(sql, len(durations), sum(durations)) for sql, durations in ranked[:limit]]
+
+
+def dump_stats(profiler: cProfile.Profile) -> bytes:
+    """Estadísticas en el formato de ``pstats`` (abrible con snakeviz o pstats)."""
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+def build_report(
+    title: str, duration_ms: float, profiler: cProfile.Profile, sql: SQLCapture
+) -> str:
+    stream = io.StringIO()
+    stream.write(
+        f"{title}\n{duration_ms:.1f} ms, {len(sql.queries)} consultas ({sql.total_ms:.1f} ms SQL)\n"
+    )
+
+    stream.write("\n== Consultas por tiempo total ==\n")
+    for statement, times, total in sql.top():
+        stream.write(f"{times:>4}x {total:>9.2f} ms  {statement[:300]}\n")
+
+    stats = pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats("cumulative")
+    stream.write("\n== Funciones por tiempo acumulado ==\n")
+    stats.print_stats(TOP_FUNCTIONS)
+    stream.write("\n== Árbol de llamadas ==\n")
+    stats.print_callees(TOP_CALLEES)
+    return stream.getvalue()
@@ -0,0 +1,192 @@
+"""Generador de un hato sintético para el perfil de benchmark.
+
+Usuarios, lotes y animales se construyen con las factories (Faker); los registros
+diarios de peso/producción y los costos mensuales se generan como tuplas y se
+insertan con `bulk_create` por bloques, para que millones de filas tomen minutos.
+"""
+from __future__ import annotations
+
+import random
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import factory.random
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import models, transaction
+from django.utils import timezone
+
+from animals.models import Animal
+from batches.models import Batch
+from costs.models import Cost
+from tracking.models import Peso, Produccion
+
+from .factories import AnimalFactory, BatchFactory, UserFactory
+
+User = get_user_model()
+
+BENCH_USERNAME_PREFIX = "bench-"
+BENCH_PASSWORD = "benchmark"
+
+MONTHLY_BATCH_COSTS = (
+    (Cost.CostType.FEED, "Alimento balanceado", 800_000, 2_500_000),
+    (Cost.CostType.LABOR, "Jornales", 1_200_000, 2_000_000),
+    (Cost.CostType.MAINTENANCE, "Mantenimiento de cercas", 100_000, 400_000),
+)
+
+
+@dataclass
+class SeedConfig:
+    users: int = 5
+    batches_per_user: int = 4
+    animals_per_batch: int = 25
+    years: float = 1.0
+    chunk_size: int = 5000
+    seed: int = 42
+    end_date: date | None = None
+
+    @property
+    def days(self) -> int:
+        return max(1, int(self.years * 365))
+
+
+class HerdSeeder:
+    def __init__(self, config: SeedConfig, log: Callable[[str], None] | None = None) -> None:
+        self.config = config
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(config.seed)
+        end = config.end_date or timezone.localdate()
+        self.start_date = end - timedelta(days=config.days - 1)
+        tz = timezone.get_current_timezone()
+        self.timestamps = [
+            timezone.make_aware(datetime.combine(self.start_date + timedelta(days=i), time(6)), tz)
+            for i in range(config.days)
+        ]
+
+    @staticmethod
+    def clear() -> int:
+        """Borra los usuarios sintéticos (y en cascada todos sus datos)."""
+        deleted, _ = User.objects.filter(username__startswith=BENCH_USERNAME_PREFIX).delete()
+        return deleted
+
+    def run(self) -> dict[str, int]:
+        factory.random.reseed_random(self.config.seed)
+        users = self._create_users()
+        batches = self._create_batches(users)
+        animals = self._create_animals(batches)
+
+        counts = {"users": len(users), "batches": len(batches), "animals": len(animals)}
+        counts["pesos"] = self._bulk_insert(Peso, self._iter_pesos(animals))
+        counts["producciones"] = self._bulk_insert(Produccion, self._iter_producciones(animals))
+        counts["costos"] = self._bulk_insert(Cost, self._iter_costs(batches, animals))
+        return counts
+
+    def _create_users(self) -> list:
+        password = make_password(BENCH_PASSWORD)
+        users = UserFactory.build_batch(self.config.users, password=password)
+        users = User.objects.bulk_create(users, batch_size=self.config.chunk_size)
+        self.log(f"{len(users)} usuarios")
+        return users
+
+    def _create_batches(self, users: list) -> list[Batch]:
+        batches = [
+            batch
+            for user in users
+            for batch in BatchFactory.build_batch(self.config.batches_per_user, usuario=user)
+        ]
+        batches = Batch.objects.bulk_create(batches, batch_size=self.config.chunk_size)
+        self.log(f"{len(batches)} lotes")
+        return batches
+
+    def _create_animals(self, batches: list[Batch]) -> list[Animal]:
+        animals = []
+        for batch in batches:
+            built = AnimalFactory.build_batch(self.config.animals_per_batch, batch=batch)
+            for index, animal in enumerate(built):
+                animal.codigo = f"B{batch.pk}-{index:04d}"
+            animals.extend(built)
+        animals = Animal.objects.bulk_create(animals, batch_size=self.config.chunk_size)
+        self.log(f"{len(animals)} animales")
+        return animals
+
+    def _first_day(self, animal: Animal) -> int:
+        return max(0, (animal.fecha_de_nacimiento - self.start_date).days)
+
+    def _iter_pesos(self, animals: list[Animal]) -> Iterator[Peso]:
+        rng = self.rng
+        for animal in animals:
+            age_at_start = (self.start_date - animal.fecha_de_nacimiento).days
+            birth_weight = rng.uniform(25, 45)
+            daily_gain = rng.uniform(0.35, 0.9)
+            mature_weight = rng.uniform(450, 700)
+            for day in range(self._first_day(animal), self.config.days):
+                weight = min(mature_weight, birth_weight + daily_gain * (age_at_start + day))
+                yield Peso(
+                    animal_id=animal.pk,
+                    fecha=self.timestamps[day],
+                    peso=round(weight + rng.gauss(0, 2.5), 2),
+                )
+
+    def _iter_producciones(self, animals: list[Animal]) -> Iterator[Produccion]:
+        rng = self.rng
+        for animal in animals:
+            if animal.sexo != "F":
+                continue
+            base = rng.uniform(8, 22)
+            for day in range(self._first_day(animal), self.config.days):
+                yield Produccion(
+                    animal_id=animal.pk,
+                    fecha=self.timestamps[day],
+                    tipo="Leche",
+                    cantidad=round(max(0.5, base + rng.gauss(0, 1.5)), 2),
+                )
+
+    def _iter_costs(self, batches: list[Batch], animals: list[Animal]) -> Iterator[Cost]:
+        rng = self.rng
+        animals_by_batch: dict[int, list[Animal]] = {}
+        for animal in animals:
+            animals_by_batch.setdefault(animal.batch_id, []).append(animal)
+
+        months = sorted({ts.date().replace(day=1) for ts in self.timestamps})
+        for batch in batches:
+            batch_animals = animals_by_batch.get(batch.pk, [])
+            for month_index, month in enumerate(months):
+                fecha = max(month, self.start_date)
+                for tipo, concepto, low, high in MONTHLY_BATCH_COSTS:
+                    yield Cost(
+                        batch_id=batch.pk,
+                        tipo=tipo,
+                        concepto=concepto,
+                        monto=Decimal(rng.randint(low, high)),
+                        fecha=fecha,
+                    )
+                if month_index % 3 or not batch_animals:
+                    continue
+                for animal in batch_animals:
+                    yield Cost(
+                        batch_id=batch.pk,
+                        animal_id=animal.pk,
+                        tipo=Cost.CostType.HEALTH,
+                        concepto="Vacunación",
+                        monto=Decimal(rng.randint(15_000, 60_000)),
+                        fecha=fecha,
+                    )
+
+    def _bulk_insert(self, model: type[models.Model], rows: Iterable[models.Model]) -> int:
+        chunk_size = self.config.chunk_size
+        total = 0
+        chunk = []
+        with transaction.atomic():
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    model.objects.bulk_create(chunk, batch_size=chunk_size)
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                model.objects.bulk_create(chunk, batch_size=chunk_size)
+                total += len(chunk)
+        self.log(f"{total} {model._meta.verbose_name_plural}")
+        return total
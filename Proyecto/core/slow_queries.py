@@ -0,0 +1,203 @@
+"""Muestreo de consultas lentas con captura de plan en segundo plano.
+
+`SlowQuerySampler` se instala como execute wrapper en cada conexión nueva (ver
+`CoreConfig.ready`). Las consultas que superan ``SLOW_QUERY_THRESHOLD_MS`` se
+encolan y un hilo aparte las agrega por huella en :class:`core.models.SlowQuery`
+(conteo, total y máximo) y, la primera vez que aparece una huella en PostgreSQL,
+guarda su ``EXPLAIN (ANALYZE off, FORMAT JSON)``. El request nunca espera por el
+registro: si la cola está llena la muestra se descarta.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import queue
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .budgets import fingerprint
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 200
+SAMPLE_SQL_LENGTH = 4000
+
+
+def fingerprint_hash(sql: str) -> tuple[str, str]:
+    digest = fingerprint(sql)
+    return digest, hashlib.sha1(digest.encode()).hexdigest()
+
+
+def _explain(alias: str, sql: str, params: Any) -> Any:
+    connection = connections[alias]
+    if connection.vendor != "postgresql" or not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    try:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE off, FORMAT JSON) {sql}", params)
+            return cursor.fetchone()[0]
+    except DatabaseError as exc:
+        return {"error": str(exc)}
+
+
+def record_slow_query(
+    sql: str,
+    params: Any,
+    duration_ms: float,
+    alias: str = "default",
+    explain: bool = False,
+    max_fingerprints: int | None = None,
+) -> None:
+    """Suma una ejecución lenta al agregado de su huella."""
+    from .models import SlowQuery
+
+    digest, key = fingerprint_hash(sql)
+    queryset = SlowQuery.objects.using(alias)
+    updated = queryset.filter(fingerprint_hash=key).update(
+        count=F("count") + 1,
+        total_ms=F("total_ms") + duration_ms,
+        max_ms=Greatest("max_ms", Value(duration_ms)),
+        last_seen=timezone.now(),
+    )
+    if updated:
+        return
+
+    slow, created = queryset.get_or_create(
+        fingerprint_hash=key,
+        defaults={
+            "fingerprint": digest,
+            "sample_sql": sql[:SAMPLE_SQL_LENGTH],
+            "count": 1,
+            "total_ms": duration_ms,
+            "max_ms": duration_ms,
+            "plan": _explain(alias, sql, params) if explain else None,
+        },
+    )
+    if not created:
+        # Otro proceso creó la huella entre el update y el insert
+        record_slow_query(sql, params, duration_ms, alias, explain, max_fingerprints)
+        return
+
+    if max_fingerprints:
+        # Se descartan las huellas que llevan más tiempo sin aparecer, nunca la recién creada:
+        # por total_ms la nueva (una sola ejecución) sería casi siempre la primera en salir
+        evicted = list(
+            queryset.exclude(pk=slow.pk)
+            .order_by("-last_seen", "-pk")
+            .values_list("pk", flat=True)[max_fingerprints - 1:]
+        )
+        if evicted:
+            queryset.filter(pk__in=evicted).delete()
+
+
+class SlowQuerySampler:
+    """Execute wrapper que mide cada consulta y encola las que superan el umbral."""
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain: bool = False,
+        max_fingerprints: int | None = None,
+        background: bool = True,
+    ) -> None:
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.max_fingerprints = max_fingerprints
+        self.background = background
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._local = threading.local()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold and not getattr(self._local, "recording", False):
+                alias = context["connection"].alias
+                self._submit(sql, None if many else params, elapsed * 1000, alias)
+
+    def _submit(self, sql: str, params: Any, duration_ms: float, alias: str) -> None:
+        sample = (sql, params, duration_ms, alias)
+        if not self.background:
+            self._record(sample)
+            return
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._ensure_worker()
+
+    def _record(self, sample: tuple) -> None:
+        sql, params, duration_ms, alias = sample
+        self._local.recording = True
+        try:
+            record_slow_query(
+                sql,
+                params,
+                duration_ms,
+                alias,
+                explain=self.explain and params is not None,
+                max_fingerprints=self.max_fingerprints,
+            )
+        except DatabaseError:
+            logger.exception("No se pudo registrar una consulta lenta")
+        finally:
+            self._local.recording = False
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="slow-query-sampler", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            sample = self._queue.get()
+            close_old_connections()
+            self._record(sample)
+            self._queue.task_done()
+
+    def flush(self) -> None:
+        """Espera a que se registren las muestras encoladas."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+
+_sampler: SlowQuerySampler | None = None
+
+
+def get_sampler() -> SlowQuerySampler | None:
+    global _sampler
+    threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    if threshold <= 0:
+        return None
+    if _sampler is None:
+        _sampler = SlowQuerySampler(
+            threshold,
+            explain=getattr(settings, "SLOW_QUERY_EXPLAIN", True),
+            max_fingerprints=getattr(settings, "SLOW_QUERY_MAX_FINGERPRINTS", 500),
+        )
+    return _sampler
+
+
+def install_sampler(sender, connection, **kwargs) -> None:
+    """Receptor de ``connection_created``: deja el sampler como wrapper más externo."""
+    sampler = get_sampler()
+    if sampler is not None and sampler not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, sampler)
@@ -0,0 +1,264 @@
+"""Instantáneas columnares (Parquet) de los datos para análisis en pandas/duckdb.
+
+Cada conjunto (`DATASETS`) se lee con ``values_list(...).iterator(chunk_size=...)``
+ordenado por su marca de agua; en PostgreSQL eso es un cursor del lado del
+servidor, así que la memoria queda acotada a un bloque. Cada bloque de
+``PARQUET_ROW_GROUP_SIZE`` filas se escribe como un row group con el esquema
+Arrow derivado de los campos del modelo: ``DecimalField`` como ``decimal128``
+con su precisión, ``DateTimeField`` como ``timestamp[us, UTC]`` y ``DateField``
+como ``date32``, en vez del texto sin tipo del CSV.
+
+Las exportaciones incrementales parten de la última `ExportWatermark` del
+conjunto y del alcance (un usuario o toda la base): ``updated_at`` para lotes y
+costos, que así incluyen las filas editadas, y el id para animales, pesos y
+producción, que no tienen fecha de actualización y solo aportan filas nuevas.
+Los borrados no viajan en una exportación incremental.
+
+``pyarrow`` es opcional: solo se importa al escribir y `require_pyarrow`
+explica cómo instalarlo si falta.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, transaction
+
+from animals.models import Animal
+from batches.models import Batch
+from costs.models import Cost
+from tracking.models import Peso, Produccion
+
+from .models import ExportWatermark
+
+
+def get_row_group_size() -> int:
+    return int(getattr(settings, "PARQUET_ROW_GROUP_SIZE", 50000))
+
+
+def require_pyarrow():
+    """Módulos ``pyarrow`` y ``pyarrow.parquet``; error de configuración si no están instalados."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImproperlyConfigured(
+            "La exportación Parquet necesita pyarrow: pip install pyarrow"
+        ) from exc
+    return pyarrow, pyarrow.parquet
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    model: type[models.Model]
+    columns: tuple[str, ...]
+    owner: str  # lookup hasta el usuario propietario
+    watermark: str = "id"  # "id" o "updated_at"
+
+    def queryset(self, user=None, since: ExportWatermark | None = None) -> models.QuerySet:
+        queryset = self.model._default_manager.all()
+        if user is not None:
+            queryset = queryset.filter(**{self.owner: user})
+        if since is not None:
+            if self.watermark == "updated_at" and since.ultima_actualizacion:
+                queryset = queryset.filter(updated_at__gt=since.ultima_actualizacion)
+            elif self.watermark == "id":
+                queryset = queryset.filter(pk__gt=since.ultimo_id)
+        ordering = ("updated_at", "pk") if self.watermark == "updated_at" else ("pk",)
+        return queryset.order_by(*ordering)
+
+
+DATASETS = {
+    dataset.name: dataset
+    for dataset in (
+        Dataset(
+            "lotes",
+            Batch,
+            ("id", "usuario_id", "nombre", "direccion", "is_active", "created_at", "updated_at"),
+            owner="usuario",
+            watermark="updated_at",
+        ),
+        Dataset(
+            "animales",
+            Animal,
+            (
+                "id", "batch_id", "codigo", "especie", "raza", "sexo",
+                "fecha_de_nacimiento", "cohorte",
+            ),
+            owner="batch__usuario",
+        ),
+        Dataset(
+            "pesos",
+            Peso,
+            ("id", "animal_id", "fecha", "peso", "notas"),
+            owner="animal__batch__usuario",
+        ),
+        Dataset(
+            "producciones",
+            Produccion,
+            ("id", "animal_id", "fecha", "tipo", "cantidad"),
+            owner="animal__batch__usuario",
+        ),
+        Dataset(
+            "costos",
+            Cost,
+            (
+                "id", "batch_id", "animal_id", "tipo", "concepto", "monto", "fecha",
+                "notas", "recurring_id", "occurrence_date", "created_at", "updated_at",
+            ),
+            owner="batch__usuario",
+            watermark="updated_at",
+        ),
+    )
+}
+
+
+def arrow_type(model_field: models.Field):
+    """Tipo Arrow de un campo de Django; las llaves foráneas toman el de su destino."""
+    pa, _ = require_pyarrow()
+    if isinstance(model_field, models.ForeignKey):
+        return arrow_type(model_field.target_field)
+    if isinstance(model_field, models.DecimalField):
+        return pa.decimal128(model_field.max_digits, model_field.decimal_places)
+    if isinstance(model_field, models.DateTimeField):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(model_field, models.DateField):
+        return pa.date32()
+    if isinstance(model_field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(model_field, (models.AutoField, models.BigAutoField, models.IntegerField)):
+        return pa.int64()
+    if isinstance(model_field, models.FloatField):
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_schema(dataset: Dataset):
+    pa, _ = require_pyarrow()
+    fields = []
+    for column in dataset.columns:
+        model_field = dataset.model._meta.get_field(column)
+        fields.append(pa.field(column, arrow_type(model_field), nullable=model_field.null))
+    return pa.schema(fields)
+
+
+@dataclass
+class ExportResult:
+    dataset: str
+    rows: int = 0
+    ultimo_id: int = 0
+    ultima_actualizacion: datetime | None = None
+    path: Path | None = None
+    incremental: bool = False
+
+
+def iter_column_batches(
+    dataset: Dataset, queryset: models.QuerySet, size: int, result: ExportResult
+) -> Iterator[dict[str, list]]:
+    """Bloques ``{columna: valores}`` de ``size`` filas; ``result`` lleva filas y marca de agua."""
+    columns = dataset.columns
+    id_index = columns.index("id")
+    updated_index = columns.index("updated_at") if "updated_at" in columns else None
+    batch: list[tuple] = []
+
+    def flush() -> dict[str, list]:
+        block = {column: [row[i] for row in batch] for i, column in enumerate(columns)}
+        result.rows += len(batch)
+        result.ultimo_id = max(result.ultimo_id, max(row[id_index] for row in batch))
+        if updated_index is not None:
+            result.ultima_actualizacion = batch[-1][updated_index]  # filas ordenadas por él
+        batch.clear()
+        return block
+
+    for row in queryset.values_list(*columns).iterator(chunk_size=size):
+        batch.append(row)
+        if len(batch) >= size:
+            yield flush()
+    if batch:
+        yield flush()
+
+
+def write_parquet(dataset: Dataset, batches, target) -> None:
+    """Escribe un row group por bloque; sin filas queda un archivo con el esquema."""
+    pa, pq = require_pyarrow()
+    schema = arrow_schema(dataset)
+    with pq.ParquetWriter(target, schema) as writer:
+        empty = True
+        for columns in batches:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            empty = False
+        if empty:
+            writer.write_table(schema.empty_table())
+
+
+def last_watermark(dataset: Dataset, user=None) -> ExportWatermark | None:
+    return ExportWatermark.objects.filter(dataset=dataset.name, usuario=user).first()
+
+
+def save_watermark(result: ExportResult, user=None) -> None:
+    """Avanza la marca de agua del conjunto; una exportación vacía conserva la anterior."""
+    with transaction.atomic():
+        mark = (
+            ExportWatermark.objects.select_for_update()
+            .filter(dataset=result.dataset, usuario=user)
+            .first()
+        ) or ExportWatermark(dataset=result.dataset, usuario=user)
+        if result.rows:
+            if result.incremental:  # las filas editadas pueden tener ids menores
+                mark.ultimo_id = max(mark.ultimo_id, result.ultimo_id)
+            else:
+                mark.ultimo_id = result.ultimo_id
+            mark.ultima_actualizacion = result.ultima_actualizacion or mark.ultima_actualizacion
+        mark.filas = result.rows
+        mark.save()
+
+
+def export_dataset(
+    dataset: Dataset,
+    target,
+    user=None,
+    incremental: bool = False,
+    row_group_size: int | None = None,
+    record: bool = True,
+) -> ExportResult:
+    """Escribe ``dataset`` en ``target`` (ruta o archivo binario).
+
+    Con ``record`` avanza la marca de agua; sin él es una copia de consulta que
+    no cambia desde dónde parte la siguiente exportación incremental.
+    """
+    since = last_watermark(dataset, user) if incremental else None
+    result = ExportResult(dataset.name, incremental=since is not None)
+    batches = iter_column_batches(
+        dataset,
+        dataset.queryset(user, since),
+        row_group_size or get_row_group_size(),
+        result,
+    )
+    write_parquet(dataset, batches, target)
+    if record:
+        save_watermark(result, user)
+    return result
+
+
+def export_snapshot(
+    directory: Path,
+    user=None,
+    names: list[str] | None = None,
+    incremental: bool = False,
+    row_group_size: int | None = None,
+) -> list[ExportResult]:
+    """Un archivo ``<conjunto>.parquet`` por conjunto dentro de ``directory``."""
+    require_pyarrow()
+    directory.mkdir(parents=True, exist_ok=True)
+    results = []
+    for name in names or list(DATASETS):
+        path = directory / f"{name}.parquet"
+        result = export_dataset(DATASETS[name], path, user, incremental, row_group_size)
+        result.path = path
+        results.append(result)
+    return results
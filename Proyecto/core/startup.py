@@ -0,0 +1,114 @@
+"""Medición del arranque en frío: tiempos de importación y time-to-first-byte.
+
+Cada medición corre en un intérprete nuevo para que nada quede cacheado del
+proceso que la lanza (como ocurre en un dyno recién escalado desde 0).
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+
+BASE_DIR = Path(settings.BASE_DIR)
+
+IMPORT_SNIPPET = "from django.core.wsgi import get_wsgi_application; get_wsgi_application()"
+
+FIRST_REQUEST_SNIPPET = """
+import sys
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+
+from django.conf import settings
+from django.test import Client
+from core.warmup import prime_database, warm_process
+
+warm_process()
+try:
+    prime_database()
+except Exception as e:
+    print(f"WARN database unavailable: {e}", flush=True)
+
+hosts = [h for h in settings.ALLOWED_HOSTS if h and not h.startswith(".") and h != "*"]
+client = Client(HTTP_HOST=hosts[0] if hosts else "localhost")
+response = client.get(sys.argv[1], secure=True)
+print(f"FIRST_BYTE {response.status_code}", flush=True)
+"""
+
+
+@dataclass
+class ImportEntry:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportEntry]:
+    """Convierte la salida de `python -X importtime` en entradas por módulo."""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        entries.append(ImportEntry(parts[2].strip(), self_us, cumulative_us))
+    return entries
+
+
+def group_by_package(entries: list[ImportEntry]) -> list[tuple[str, int]]:
+    """Suma el tiempo propio de cada módulo por paquete de primer nivel (µs)."""
+    totals: dict[str, int] = defaultdict(int)
+    for entry in entries:
+        totals[entry.module.split(".")[0]] += entry.self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def _child_env() -> dict[str, str]:
+    env = os.environ.copy()
+    env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    return env
+
+
+def profile_imports() -> list[ImportEntry]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET],
+        cwd=BASE_DIR,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_first_byte(path: str) -> tuple[float, int]:
+    """Milisegundos desde lanzar el intérprete hasta tener la primera respuesta."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", FIRST_REQUEST_SNIPPET, path],
+        cwd=BASE_DIR,
+        env=_child_env(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    status = 0
+    elapsed_ms = None
+    for line in process.stdout:
+        if line.startswith("FIRST_BYTE"):
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            status = int(line.split()[1])
+    _, stderr = process.communicate()
+    if elapsed_ms is None:
+        raise RuntimeError(f"First request failed:\n{stderr}")
+    return elapsed_ms, status
@@ -0,0 +1,542 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date
+from decimal import Decimal
+from importlib.util import find_spec
+from pathlib import Path
+from unittest import mock, skipIf, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.views import View
+
+from animals.models import Animal
+from costs.models import Cost
+from tracking.models import Peso, Produccion
+
+from . import timing
+from .benchmarks import (
+    build_cases,
+    compare_results,
+    measure_case,
+    percentile,
+    uncovered_url_names,
+)
+from .budgets import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    fingerprint,
+    get_view_budget,
+    query_budget,
+)
+from .exports import iter_csv
+from .middleware import RequestProfilerMiddleware, ServerTimingMiddleware
+from .models import ExportWatermark, ProfileReport, SlowQuery
+from .seeding import BENCH_USERNAME_PREFIX, HerdSeeder, SeedConfig
+from .slow_queries import SlowQuerySampler, install_sampler, record_slow_query
+from .snapshots import DATASETS, ExportResult, export_snapshot, iter_column_batches, save_watermark
+from .startup import group_by_package, parse_importtime
+from .warmup import prime_database, warm_process, warm_templates, warm_url_resolver
+
+
+class WarmupTests(TestCase):
+    def test_url_resolver_warms_nested_resolvers(self):
+        self.assertGreater(warm_url_resolver(), 1)
+
+    def test_templates_are_compiled(self):
+        self.assertGreater(warm_templates(), 0)
+
+    def test_warm_process_reports_timings(self):
+        timings = warm_process()
+
+        self.assertEqual(set(timings), {"urls", "templates"})
+
+    def test_prime_database(self):
+        with self.assertNumQueries(1):
+            prime_database()
+
+
+class ImportTimeParsingTests(TestCase):
+    OUTPUT = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      3000 |       5000 |     supabase._sync\n"
+        "import time:      2000 |       9000 |   supabase\n"
+        "import time:       500 |        500 | django.utils\n"
+    )
+
+    def test_parse_importtime(self):
+        entries = parse_importtime(self.OUTPUT)
+
+        self.assertEqual(len(entries), 4)
+        self.assertEqual(entries[1].module, "supabase._sync")
+        self.assertEqual(entries[2].cumulative_us, 9000)
+
+    def test_group_by_package_sorts_by_self_time(self):
+        grouped = group_by_package(parse_importtime(self.OUTPUT))
+
+        self.assertEqual(grouped[0], ("supabase", 5000))
+        self.assertEqual(grouped[-1], ("_io", 120))
+
+
+class HerdSeederTests(TestCase):
+    def test_seeds_requested_volumes(self):
+        config = SeedConfig(
+            users=2,
+            batches_per_user=2,
+            animals_per_batch=3,
+            years=0.1,
+            chunk_size=50,
+            end_date=date(2025, 6, 30),
+        )
+
+        counts = HerdSeeder(config).run()
+
+        self.assertEqual(counts["batches"], 4)
+        self.assertEqual(Animal.objects.count(), 12)
+        self.assertEqual(Peso.objects.count(), counts["pesos"])
+        self.assertEqual(Produccion.objects.count(), counts["producciones"])
+        self.assertEqual(Cost.objects.count(), counts["costos"])
+        self.assertTrue(
+            Peso.objects.filter(fecha__date__gte=date(2025, 5, 25)).exists()
+        )
+
+    def test_clear_removes_synthetic_users(self):
+        HerdSeeder(SeedConfig(users=1, batches_per_user=1, animals_per_batch=1, years=0.01)).run()
+
+        HerdSeeder.clear()
+
+        self.assertFalse(Animal.objects.exists())
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_cases_cover_every_url(self):
+        HerdSeeder(SeedConfig(users=1, batches_per_user=1, animals_per_batch=1, years=0.01)).run()
+        user = get_user_model().objects.get(username__startswith=BENCH_USERNAME_PREFIX)
+
+        self.assertEqual(uncovered_url_names(build_cases(user)), set())
+
+    def test_sql_time_keeps_sub_millisecond_precision(self):
+        user = get_user_model().objects.create_user(username="bench", password="testpass")
+        self.client.force_login(user)
+
+        result = measure_case(self.client, reverse("costs:list"), {}, repeat=3)
+
+        self.assertGreater(result["queries"], 0)
+        self.assertGreater(result["sql_ms"], 0)
+
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertAlmostEqual(percentile([10, 20], 95), 19.5)
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {"sizes": {"small": {"cases": {
+            "cost_list": {"p95_ms": 20.0, "sql_ms": 5.0, "queries": 4},
+        }}}}
+        current = {"sizes": {"small": {"cases": {
+            "cost_list": {"p95_ms": 30.0, "sql_ms": 5.5, "queries": 6},
+        }}}}
+
+        regressions = compare_results(current, baseline, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertIn("consultas", regressions[0])
+        self.assertIn("p95_ms", regressions[1])
+
+    def test_compare_results_within_tolerance(self):
+        result = {"sizes": {"small": {"cases": {
+            "cost_list": {"p95_ms": 20.0, "sql_ms": 5.0, "queries": 4},
+        }}}}
+
+        self.assertEqual(compare_results(result, result, tolerance=0.1), [])
+
+
+@query_budget(1)
+def two_query_view(request):
+    list(get_user_model().objects.all())
+    list(get_user_model().objects.all())
+    return HttpResponse("ok")
+
+
+@query_budget(1)
+def cached_view(request):
+    cache.set("budget", 1)
+    cache.get("budget")
+    list(get_user_model().objects.all())
+    return HttpResponse("ok")
+
+
+class BudgetedView(View):
+    query_budget = 3
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def call(self, view):
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = QueryBudgetMiddleware(get_response)
+        return middleware(self.factory.get("/budget/"))
+
+    def test_fingerprint_strips_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 42 AND name = 'x' AND pk IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND pk IN (...)",
+        )
+
+    def test_budget_from_decorator_and_class_attribute(self):
+        self.assertEqual(get_view_budget(two_query_view), 1)
+        self.assertEqual(get_view_budget(BudgetedView.as_view()), 3)
+        self.assertIsNone(get_view_budget(View.as_view()))
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_exceeding_budget_raises_when_enforced(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, "2 consultas (presupuesto 1)"):
+            self.call(two_query_view)
+
+        self.assertEqual(connection.execute_wrappers, [])
+
+    @override_settings(QUERY_BUDGET_ENFORCE=False)
+    def test_exceeding_budget_logs_fingerprints_and_site(self):
+        with self.assertLogs("core.budgets", level="WARNING") as logs:
+            response = self.call(two_query_view)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("2x SELECT", logs.output[0])
+        self.assertIn("core/tests.py", logs.output[0])
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_database_cache_queries_are_not_counted(self):
+        self.assertEqual(self.call(cached_view).status_code, 200)
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def call(self, view):
+        middleware = ServerTimingMiddleware(None)
+
+        def get_response(request):
+            response = view(request)
+            if hasattr(response, "render"):
+                response = middleware.process_template_response(request, response)
+                response.render()
+            return response
+
+        middleware.get_response = get_response
+        with self.assertLogs("core.requests", level="INFO") as logs:
+            response = middleware(self.factory.get("/timed/"))
+        return response, json.loads(logs.records[0].getMessage())
+
+    def test_header_and_log_include_db_template_and_storage(self):
+        def view(request):
+            get_user_model().objects.count()
+            with timing.span("storage"):
+                pass
+            template = engines["django"].from_string("{{ value }}")
+            return TemplateResponse(request, template, {"value": "ok"})
+
+        response, record = self.call(view)
+
+        header = response["Server-Timing"]
+        self.assertIn('desc="1 queries"', header)
+        for metric in ("db;dur=", "tpl;dur=", "storage;dur=", "total;dur="):
+            self.assertIn(metric, header)
+        self.assertEqual(record["queries"], 1)
+        self.assertEqual(record["storage_calls"], 1)
+        self.assertEqual(record["path"], "/timed/")
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_span_outside_a_request_is_a_no_op(self):
+        with timing.span("storage"):
+            pass
+
+        self.assertIsNone(timing.current())
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        response, record = self.call(lambda request: HttpResponse("ok"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertEqual(record["queries"], 0)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_zero_sample_rate_disables_middleware(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(lambda request: HttpResponse())
+
+
+class SlowQuerySamplerTests(TestCase):
+    def run_with_sampler(self, sampler, sql):
+        with connection.execute_wrapper(sampler), connection.cursor() as cursor:
+            cursor.execute(sql)
+
+    def test_slow_statements_are_aggregated_by_fingerprint(self):
+        sampler = SlowQuerySampler(threshold_ms=0, background=False)
+
+        self.run_with_sampler(sampler, "SELECT 1 WHERE 2 = 2")
+        self.run_with_sampler(sampler, "SELECT 1 WHERE 3 = 3")
+
+        slow = SlowQuery.objects.get()
+        self.assertEqual(slow.fingerprint, "SELECT ? WHERE ? = ?")
+        self.assertEqual(slow.count, 2)
+        self.assertGreaterEqual(slow.max_ms, slow.total_ms / 2)
+        self.assertIsNone(slow.plan)  # EXPLAIN solo en PostgreSQL
+
+    def test_fast_statements_are_ignored(self):
+        sampler = SlowQuerySampler(threshold_ms=60_000, background=False)
+
+        self.run_with_sampler(sampler, "SELECT 1")
+
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_full_table_evicts_the_least_recently_seen_fingerprints(self):
+        for index, duration in enumerate([5.0, 50.0, 20.0]):
+            record_slow_query(f"SELECT * FROM t{index}", None, duration, max_fingerprints=2)
+
+        self.assertEqual(
+            sorted(SlowQuery.objects.values_list("total_ms", flat=True)), [20.0, 50.0]
+        )
+
+        with mock.patch("core.slow_queries._explain") as explain:
+            record_slow_query("SELECT * FROM t2", None, 1.0, explain=True, max_fingerprints=2)
+        explain.assert_not_called()
+        self.assertEqual(SlowQuery.objects.get(total_ms=21.0).count, 2)
+
+    def test_max_keeps_the_slowest_execution(self):
+        record_slow_query("SELECT 1", None, 30.0)
+        record_slow_query("SELECT 2", None, 10.0)
+
+        slow = SlowQuery.objects.get()
+        self.assertEqual((slow.count, slow.total_ms, slow.max_ms), (2, 40.0, 30.0))
+        self.assertEqual(slow.avg_ms, 20.0)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_disabled_sampler_is_not_installed(self):
+        wrappers = list(connection.execute_wrappers)
+
+        install_sampler(sender=None, connection=connection)
+
+        self.assertEqual(connection.execute_wrappers, wrappers)
+
+
+class RequestProfilerTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff@example.com", password="pass", is_staff=True, is_superuser=True
+        )
+        self.user = User.objects.create_user(username="user@example.com", password="pass")
+
+    def test_staff_request_is_profiled_and_stored(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.get(reverse("costs:list"), {"_profile": "1"})
+
+        report = ProfileReport.objects.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Profile-Report"],
+            reverse("admin:core_profilereport_change", args=[report.pk]),
+        )
+        self.assertEqual(report.view_name, "costs:list")
+        self.assertEqual(report.usuario, self.staff)
+        self.assertGreater(report.query_count, 0)
+        self.assertIn("== Consultas por tiempo total ==", report.report)
+        self.assertIn("== Árbol de llamadas ==", report.report)
+
+    def test_header_trigger_and_report_download(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse("costs:list"), HTTP_X_PROFILE="1")
+        report = ProfileReport.objects.get()
+
+        download = self.client.get(
+            reverse("admin:core_profilereport_download", args=[report.pk, "txt"])
+        )
+        stats = self.client.get(
+            reverse("admin:core_profilereport_download", args=[report.pk, "prof"])
+        )
+
+        self.assertIn("attachment", download["Content-Disposition"])
+        self.assertEqual(download.content.decode(), report.report)
+        self.assertEqual(stats.content, bytes(report.stats))
+
+    def test_non_staff_users_are_never_profiled(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("costs:list"), {"_profile": "1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("X-Profile-Report"))
+        self.assertFalse(ProfileReport.objects.exists())
+
+    @override_settings(REQUEST_PROFILER_ENABLED=False)
+    def test_disabled_profiler_leaves_the_chain(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestProfilerMiddleware(lambda request: HttpResponse())
+
+
+class CsvExportTests(TestCase):
+    def setUp(self):
+        HerdSeeder(SeedConfig(users=2, batches_per_user=2, animals_per_batch=2, years=0.1)).run()
+        self.user = (
+            get_user_model().objects.filter(username__startswith=BENCH_USERNAME_PREFIX).first()
+        )
+        self.batch = (
+            Animal.objects.filter(batch__usuario=self.user).values_list("batch_id", flat=True)[0]
+        )
+        self.client.force_login(self.user)
+
+    def export(self, name, params=None):
+        response = self.client.get(reverse(name), params or {})
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment", response["Content-Disposition"])
+        text = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(text)))
+
+    def test_exports_honor_list_filters_and_ownership(self):
+        own = Peso.objects.filter(animal__batch__usuario=self.user)
+        self.assertEqual(len(self.export("tracking:peso-export")) - 1, own.count())
+
+        rows = self.export("tracking:peso-export", {"batch": self.batch})
+        self.assertEqual(rows[0][:3], ["Fecha", "Lote", "Animal"])
+        self.assertEqual(len(rows) - 1, own.filter(animal__batch_id=self.batch).count())
+
+        costs = self.export("costs:export", {"batch": self.batch, "tipo": Cost.CostType.FEED})
+        expected = Cost.objects.for_user(self.user).filter(
+            batch_id=self.batch, tipo=Cost.CostType.FEED
+        )
+        self.assertEqual(len(costs) - 1, expected.count())
+
+        animals = self.export("animals:export", {"sex": "F"})
+        self.assertEqual(
+            len(animals) - 1, Animal.objects.filter(batch__usuario=self.user, sexo="F").count()
+        )
+        self.assertGreater(len(self.export("tracking:produccion-export")), 1)
+
+    def test_rows_are_written_in_chunks_after_the_header(self):
+        chunks = list(iter_csv(["a", "b"], iter([(1, None), (2, "x"), (3, "y")]), chunk_size=2))
+
+        self.assertEqual(chunks, ["\ufeffa,b\r\n", "1,\r\n2,x\r\n", "3,y\r\n"])
+
+    def test_text_cells_cannot_start_a_formula(self):
+        rows = [("=HYPERLINK(\"http://x\")", Decimal("-5")), ("+1", "@SUM(A1)"), ("-2", "\tx")]
+        text = "".join(iter_csv(["concepto", "monto"], iter(rows), chunk_size=10))
+
+        parsed = list(csv.reader(io.StringIO(text.lstrip("\ufeff"))))
+        self.assertEqual(
+            parsed[1:],
+            [["'=HYPERLINK(\"http://x\")", "-5"], ["'+1", "'@SUM(A1)"], ["'-2", "'\tx"]],
+        )
+
+    @override_settings(EXPORT_CHUNK_SIZE=7)
+    def test_export_reads_rows_with_an_iterator(self):
+        with CaptureQueriesContext(connection) as captured:
+            rows = self.export("costs:export")
+
+        self.assertEqual(len(rows) - 1, Cost.objects.for_user(self.user).count())
+        self.assertEqual(len([q for q in captured if "costs_cost" in q["sql"]]), 1)
+
+
+class ParquetSnapshotTests(TestCase):
+    def setUp(self):
+        HerdSeeder(SeedConfig(users=2, batches_per_user=1, animals_per_batch=2, years=0.1)).run()
+        self.user = (
+            get_user_model().objects.filter(username__startswith=BENCH_USERNAME_PREFIX).first()
+        )
+
+    def test_batches_are_row_group_sized_and_track_the_watermark(self):
+        dataset = DATASETS["pesos"]
+        queryset = dataset.queryset(self.user)
+        result = ExportResult("pesos")
+
+        blocks = list(iter_column_batches(dataset, queryset, 7, result))
+
+        self.assertEqual(result.rows, queryset.count())
+        self.assertTrue(all(len(block["id"]) == 7 for block in blocks[:-1]))
+        self.assertEqual(set(blocks[0]), set(dataset.columns))
+        self.assertEqual(result.ultimo_id, queryset.order_by("-pk").values_list("pk", flat=True)[0])
+
+    def test_incremental_queryset_starts_after_the_user_watermark(self):
+        pesos = DATASETS["pesos"]
+        result = ExportResult("pesos")
+        list(iter_column_batches(pesos, pesos.queryset(self.user), 100, result))
+        save_watermark(result, self.user)
+
+        mark = ExportWatermark.objects.get(dataset="pesos", usuario=self.user)
+        self.assertFalse(pesos.queryset(self.user, since=mark).exists())
+        self.assertTrue(pesos.queryset(None, since=ExportWatermark(dataset="pesos")).exists())
+
+        animal = Animal.objects.filter(batch__usuario=self.user).first()
+        fecha = animal.registros_peso.last().fecha
+        nuevo = Peso.objects.create(animal=animal, fecha=fecha, peso=300)
+        pendientes = pesos.queryset(self.user, since=mark).values_list("pk", flat=True)
+        self.assertEqual(list(pendientes), [nuevo.pk])
+
+        costos = DATASETS["costos"]
+        result = ExportResult("costos")
+        list(iter_column_batches(costos, costos.queryset(self.user), 100, result))
+        save_watermark(result, self.user)
+        mark = ExportWatermark.objects.get(dataset="costos", usuario=self.user)
+        editado = Cost.objects.for_user(self.user).order_by("pk").first()
+        editado.save()
+        self.assertEqual(list(costos.queryset(self.user, since=mark)), [editado])
+
+    def test_admin_download_is_read_only_and_incremental_needs_post(self):
+        admin_user = get_user_model().objects.create_user(
+            username="admin@example.com", password="pass", is_staff=True, is_superuser=True
+        )
+        mark = ExportWatermark.objects.create(dataset="pesos", usuario=self.user, ultimo_id=5)
+        self.client.force_login(admin_user)
+        url = reverse("admin:core_exportwatermark_download", args=["pesos"])
+
+        with mock.patch("core.admin.export_dataset") as export:
+            self.client.get(url, {"usuario": self.user.pk, "incremental": 1})
+            self.assertEqual(export.call_args.kwargs, {"user": self.user, "record": False})
+            self.assertEqual(self.client.post(url).status_code, 405)
+
+            self.client.post(
+                reverse("admin:core_exportwatermark_changelist"),
+                {"action": "export_incremental", "_selected_action": [mark.pk]},
+            )
+            self.assertEqual(export.call_args.kwargs, {"user": self.user, "incremental": True})
+
+    @skipIf(find_spec("pyarrow"), "pyarrow instalado")
+    def test_command_explains_missing_pyarrow(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaisesMessage(CommandError, "pyarrow"):
+                call_command("export_parquet", directory)
+
+    @skipUnless(find_spec("pyarrow"), "requiere pyarrow")
+    def test_snapshot_keeps_column_types(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = export_snapshot(Path(directory), user=self.user, row_group_size=10)
+            costos = pq.ParquetFile(Path(directory) / "costos.parquet")
+            table = costos.read()
+            pesos = pq.ParquetFile(Path(directory) / "pesos.parquet")
+
+        self.assertEqual(table.schema.field("monto").type, pa.decimal128(12, 2))
+        self.assertEqual(table.schema.field("created_at").type, pa.timestamp("us", tz="UTC"))
+        self.assertEqual(table.schema.field("fecha").type, pa.date32())
+        self.assertIsInstance(table.column("monto")[0].as_py(), Decimal)
+        self.assertEqual(table.num_rows, Cost.objects.for_user(self.user).count())
+        self.assertEqual(pesos.num_row_groups, -(-results[2].rows // 10))
@@ -0,0 +1,57 @@
+"""Acumulador de tiempos por categoría para el request en curso.
+
+El middleware de Server-Timing activa un :class:`RequestTimings` en un
+``ContextVar``; el resto del código marca tramos con :func:`span` sin saber si
+hay un request medido (fuera de uno, ``span`` no hace nada)::
+
+    with span("storage"):
+        client.storage.from_(bucket).upload(...)
+"""
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = defaultdict(float)
+        self.counts: dict[str, int] = defaultdict(int)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] += seconds
+        self.counts[name] += 1
+
+    def ms(self, name: str) -> float:
+        return self.durations.get(name, 0.0) * 1000
+
+
+def current() -> RequestTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def activate(timings: RequestTimings) -> Iterator[RequestTimings]:
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
@@ -0,0 +1,79 @@
+"""Precalentamiento del proceso web para reducir el costo del primer request.
+
+`warm_process` es seguro de ejecutar en el maestro de gunicorn antes del fork
+(solo toca estructuras en memoria); `prime_database` debe ejecutarse en cada
+worker, porque las conexiones a la BD no se pueden compartir entre procesos.
+"""
+from __future__ import annotations
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARMUP_TEMPLATES = (
+    "accounts/login.html",
+    "dashboard/home.html",
+    "batches/batch_list.html",
+    "animals/animal_list.html",
+    "tracking/peso_list.html",
+    "tracking/produccion_list.html",
+    "costs/cost_list.html",
+)
+
+
+def warm_url_resolver() -> int:
+    """Construye los índices de `reverse()` de todos los resolvers anidados."""
+    pending = [get_resolver()]
+    warmed = 0
+    while pending:
+        resolver = pending.pop()
+        resolver.reverse_dict  # noqa: B018 - poblar el caché del resolver
+        warmed += 1
+        pending.extend(
+            pattern for pattern in resolver.url_patterns if isinstance(pattern, URLResolver)
+        )
+    return warmed
+
+
+def warm_templates() -> int:
+    """Compila las plantillas más usadas en el caché del loader."""
+    warmed = 0
+    for name in getattr(settings, "WARMUP_TEMPLATES", DEFAULT_WARMUP_TEMPLATES):
+        try:
+            get_template(name)
+        except TemplateDoesNotExist:
+            logger.warning(f"Warmup template {name} not found")
+            continue
+        warmed += 1
+    return warmed
+
+
+def prime_database() -> None:
+    """Abre la conexión del proceso actual y la valida con una consulta trivial."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def warm_process() -> dict[str, float]:
+    """Precalienta resolver y plantillas; retorna la duración de cada paso en ms."""
+    timings = {}
+
+    start = time.perf_counter()
+    warm_url_resolver()
+    timings["urls"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    warm_templates()
+    timings["templates"] = (time.perf_counter() - start) * 1000
+
+    logger.info(
+        "Process warmed up: " + ", ".join(f"{k}={v:.1f}ms" for k, v in timings.items())
+    )
+    return timings
@@ -5,7 +5,8 @@ from unfold.admin import ModelAdmin
 
 
 class AutoModelAdmin(ModelAdmin):
-    pass
+    # __str__ de Cost usa el lote: evita una consulta por fila en el listado
+    list_select_related = True
 
 
 for model in apps.get_app_config("costs").get_models():
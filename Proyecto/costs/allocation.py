@@ -0,0 +1,266 @@
+"""Reparto de los costos generales del lote entre sus animales.
+
+Un costo sin animal se reparte entre los animales del lote nacidos en o antes de
+la fecha del costo (el modelo no registra entradas ni salidas del lote) según
+``COST_ALLOCATION_DRIVER``:
+
+- ``equal``: partes iguales.
+- ``days``: días presente dentro de la ventana de ``COST_ALLOCATION_WINDOW_DAYS``
+  que termina en la fecha del costo.
+- ``weight``: último peso registrado en o antes de esa fecha; los animales sin
+  pesar toman la media de los pesados.
+
+Los costos con animal se asignan completos a ese animal (``direct``). El cálculo
+se hace por lote con NumPy sobre matrices costo × animal, y los centavos se
+reparten por mayor residuo para que cada costo sume exactamente su monto.
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable, Iterator
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import TruncDate
+
+from animals.models import Animal
+from tracking.models import Peso
+
+from .models import Cost, CostAllocation
+
+Driver = CostAllocation.Driver
+
+CHUNK_SIZE = 1000
+
+
+def get_driver() -> str:
+    return getattr(settings, "COST_ALLOCATION_DRIVER", Driver.EQUAL)
+
+
+def get_window() -> int:
+    return getattr(settings, "COST_ALLOCATION_WINDOW_DAYS", 30)
+
+
+def presence(cost_days: np.ndarray, birth_days: np.ndarray) -> np.ndarray:
+    return birth_days[None, :] <= cost_days[:, None]
+
+
+def days_present(cost_days: np.ndarray, birth_days: np.ndarray, window: int) -> np.ndarray:
+    start = np.maximum(birth_days[None, :], cost_days[:, None] - window + 1)
+    return np.clip(cost_days[:, None] - start + 1, 0, window).astype(float)
+
+
+def latest_weights(
+    cost_days: np.ndarray,
+    n_animals: int,
+    peso_animals: np.ndarray,
+    peso_days: np.ndarray,
+    peso_values: np.ndarray,
+) -> np.ndarray:
+    """Matriz costo × animal con el último peso a la fecha del costo (NaN sin peso)."""
+    result = np.full((len(cost_days), n_animals), np.nan)
+    if not len(peso_days) or not len(cost_days):
+        return result
+
+    # Una sola búsqueda binaria sobre la clave (animal, día) ordenada
+    span = int(max(cost_days.max(), peso_days.max())) + 1
+    order = np.lexsort((peso_days, peso_animals))
+    keys = peso_animals[order] * span + peso_days[order]
+    animals, values = peso_animals[order], peso_values[order]
+
+    columns = np.arange(n_animals)
+    index = np.searchsorted(keys, columns[None, :] * span + cost_days[:, None], side="right") - 1
+    safe = np.maximum(index, 0)
+    found = (index >= 0) & (animals[safe] == columns[None, :])
+    return np.where(found, values[safe], result)
+
+
+def driver_weights(
+    driver: str,
+    cost_days: np.ndarray,
+    birth_days: np.ndarray,
+    window: int = 30,
+    pesos: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None,
+) -> np.ndarray:
+    if driver == Driver.DAYS:
+        return days_present(cost_days, birth_days, window)
+    present = presence(cost_days, birth_days)
+    if driver != Driver.WEIGHT:
+        return present.astype(float)
+
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+    latest = latest_weights(cost_days, len(birth_days), *(pesos or empty))
+    weights = np.where(present, latest, np.nan)
+    known = ~np.isnan(weights)
+    count = known.sum(axis=1)
+    total = np.where(known, weights, 0).sum(axis=1)
+    # Sin ningún animal pesado el reparto cae en partes iguales
+    mean = np.divide(total, count, out=np.ones_like(total), where=count > 0)
+    return np.where(present, np.where(known, weights, mean[:, None]), 0.0)
+
+
+def split_cents(cents: np.ndarray, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Reparte montos enteros en centavos proporcionalmente, sin perder centavos."""
+    totals = weights.sum(axis=1, keepdims=True)
+    shares = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+    raw = shares * cents[:, None]
+    allocated = np.floor(raw).astype(np.int64)
+    missing = np.where(totals[:, 0] > 0, cents - allocated.sum(axis=1), 0)
+
+    order = np.argsort(allocated - raw, axis=1, kind="stable")  # mayor residuo primero
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.broadcast_to(np.arange(order.shape[1]), order.shape), axis=1)
+    allocated += rank < missing[:, None]
+    return allocated, shares
+
+
+def _peso_arrays(batch_id: int, animal_index: dict[int, int]):
+    rows = (
+        Peso.objects.filter(animal__batch_id=batch_id)
+        .annotate(dia=TruncDate("fecha"))
+        .values_list("animal_id", "dia", "peso")
+    )
+    animals, days, values = [], [], []
+    for animal_id, day, peso in rows:
+        animals.append(animal_index[animal_id])
+        days.append(day.toordinal())
+        values.append(float(peso))
+    return (
+        np.array(animals, dtype=np.int64),
+        np.array(days, dtype=np.int64),
+        np.array(values, dtype=float),
+    )
+
+
+def allocate_batch(
+    batch_id: int,
+    since: date | None = None,
+    cost_ids: Iterable[int] | None = None,
+    driver: str | None = None,
+) -> int:
+    """Recalcula las asignaciones de los costos del lote.
+
+    Sin ``since`` ni ``cost_ids`` recalcula todo el lote; con ellos, solo los
+    costos desde esa fecha y los indicados. Retorna las filas escritas.
+    """
+    driver = driver or get_driver()
+    cost_ids = set(cost_ids or ())
+    costs = Cost.objects.filter(batch_id=batch_id)
+    if since is not None or cost_ids:
+        scope = Q(pk__in=cost_ids)
+        if since is not None:
+            scope |= Q(fecha__gte=since)
+        costs = costs.filter(scope)
+    cost_rows = list(costs.order_by("fecha", "pk").values_list("pk", "animal_id", "fecha", "monto"))
+
+    animals = list(
+        Animal.objects.filter(batch_id=batch_id)
+        .order_by("pk")
+        .values_list("pk", "fecha_de_nacimiento")
+    )
+    # Subconsulta y no lista de ids: un lote puede tener más costos que parámetros admite SQLite.
+    # Los costos pedidos que ya no están en el lote solo limpian sus filas de este lote
+    stale = Q(cost_id__in=costs.values("pk")) | Q(batch_id=batch_id, cost_id__in=cost_ids)
+    written = 0
+    with transaction.atomic():
+        CostAllocation.objects.filter(stale).delete()
+        for allocations in _iter_allocations(batch_id, cost_rows, animals, driver):
+            CostAllocation.objects.bulk_create(allocations, batch_size=CHUNK_SIZE)
+            written += len(allocations)
+    return written
+
+
+def _iter_allocations(batch_id, cost_rows, animals, driver) -> Iterator[list[CostAllocation]]:
+    """Filas de asignación por bloques de costos, para no tenerlas todas en memoria."""
+    yield [
+        CostAllocation(
+            cost_id=pk,
+            animal_id=animal_id,
+            batch_id=batch_id,
+            fecha=fecha,
+            driver=Driver.DIRECT,
+            share=1.0,
+            monto=monto,
+        )
+        for pk, animal_id, fecha, monto in cost_rows
+        if animal_id is not None
+    ]
+
+    shared = [row for row in cost_rows if row[1] is None]
+    if not shared or not animals:
+        return
+    animal_ids = np.array([pk for pk, _ in animals])
+    birth_days = np.array([born.toordinal() for _, born in animals], dtype=np.int64)
+    pesos = None
+    if driver == Driver.WEIGHT:
+        pesos = _peso_arrays(batch_id, {pk: index for index, (pk, _) in enumerate(animals)})
+
+    for start in range(0, len(shared), CHUNK_SIZE):
+        chunk = shared[start:start + CHUNK_SIZE]
+        cost_days = np.array([fecha.toordinal() for _, _, fecha, _ in chunk], dtype=np.int64)
+        cents = np.array([int(monto * 100) for *_, monto in chunk], dtype=np.int64)
+        weights = driver_weights(driver, cost_days, birth_days, get_window(), pesos)
+        allocated, shares = split_cents(cents, weights)
+        rows, columns = np.nonzero(shares > 0)
+        yield [
+            CostAllocation(
+                cost_id=chunk[row][0],
+                animal_id=int(animal_ids[column]),
+                batch_id=batch_id,
+                fecha=chunk[row][2],
+                driver=driver,
+                share=float(shares[row, column]),
+                monto=Decimal(int(allocated[row, column])).scaleb(-2),
+            )
+            for row, column in zip(rows, columns, strict=True)
+        ]
+
+
+def allocate_all(driver: str | None = None, batch_ids: Iterable[int] | None = None) -> int:
+    if batch_ids is None:
+        batch_ids = Cost.objects.order_by().values_list("batch_id", flat=True).distinct()
+    return sum(allocate_batch(batch_id, driver=driver) for batch_id in list(batch_ids))
+
+
+_pending = threading.local()
+
+
+def schedule_recompute(
+    batch_id: int, since: date | None = None, cost_id: int | None = None
+) -> None:
+    """Agrupa los recálculos pedidos en la transacción y los corre al confirmar.
+
+    ``since=None`` sin ``cost_id`` pide recalcular el lote completo. El primer
+    callback que se ejecuta procesa todo lo acumulado y los demás no hacen nada;
+    si la transacción se revierte, lo pendiente se recalcula en el siguiente
+    commit, lo cual es inocuo porque el recálculo es idempotente.
+    """
+    pending: dict[int, dict] | None = getattr(_pending, "batches", None)
+    if pending is None:
+        pending = _pending.batches = {}
+
+    entry = pending.setdefault(batch_id, {"full": False, "since": None, "costs": set()})
+    if cost_id is not None:
+        entry["costs"].add(cost_id)
+    elif since is None:
+        entry["full"] = True
+    elif entry["since"] is None or since < entry["since"]:
+        entry["since"] = since
+    # Fuera de una transacción el callback corre de inmediato: va después de anotar
+    transaction.on_commit(_run_pending)
+
+
+def _run_pending() -> None:
+    pending = getattr(_pending, "batches", None)
+    if not pending:
+        return
+    _pending.batches = None
+    for batch_id, entry in pending.items():
+        if entry["full"]:
+            allocate_batch(batch_id)
+        else:
+            allocate_batch(batch_id, since=entry["since"], cost_ids=entry["costs"])
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'costs'
+
+    def ready(self):
+        from . import signals
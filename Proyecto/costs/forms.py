@@ -42,7 +42,11 @@ class CostForm(forms.ModelForm):
         batch_queryset = Batch.objects.by_user(self.user) if self.user else Batch.objects.none()
         self.fields["batch"].queryset = batch_queryset
 
-        animal_queryset = Animal.objects.filter(batch__usuario=self.user) if self.user else Animal.objects.none()
+        animal_queryset = (
+            Animal.objects.filter(batch__usuario=self.user, batch__is_active=True)
+            if self.user
+            else Animal.objects.none()
+        )
         self.fields["animal"].queryset = animal_queryset.select_related("batch")
         self.fields["animal"].required = False
         self.fields["animal"].empty_label = "Costo general"
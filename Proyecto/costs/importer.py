@@ -0,0 +1,324 @@
+"""Importación de costos desde un CSV contable o bancario.
+
+El archivo se lee en streaming y se procesa por bloques de ``chunk_size`` filas:
+cada bloque se convierte a columnas, se valida con las mismas reglas de
+`CostForm.clean` sobre arreglos de NumPy, resuelve lotes y animales con una
+consulta por bloque y se inserta con ``bulk_create``. La memoria usada depende
+del tamaño del bloque, no del archivo. El archivo completo se importa en una
+sola transacción::
+
+    importer = CostImporter(user, ColumnMapping(fecha="Fecha", monto="Valor"))
+    with open("libro.csv", encoding="utf-8-sig", newline="") as handle:
+        result = importer.run(handle)
+"""
+from __future__ import annotations
+
+import csv
+import re
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import IO
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from animals.models import Animal
+from batches.models import Batch
+
+from .allocation import schedule_recompute
+from .models import Cost
+from .signals import costs_bulk_created
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 200
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y")
+
+CostType = Cost.CostType
+
+# Palabras clave (sin tildes, en minúscula) para inferir el tipo desde el concepto
+TIPO_RULES: list[tuple[tuple[str, ...], str]] = [
+    (
+        (
+            "alimento", "concentrado", "balanceado", "pasto", "forraje",
+            "heno", "silo", "sal mineral", "melaza",
+        ),
+        CostType.FEED,
+    ),
+    (
+        (
+            "vacuna", "veterinari", "medicamento", "desparasit", "vitamina",
+            "antibiotico", "tratamiento",
+        ),
+        CostType.HEALTH,
+    ),
+    (
+        (
+            "reparacion", "mantenimiento", "cerca", "herramienta", "combustible",
+            "repuesto", "bebedero",
+        ),
+        CostType.MAINTENANCE,
+    ),
+    (
+        ("jornal", "salario", "nomina", "mano de obra", "vaquero", "ordenador", "prestaciones"),
+        CostType.LABOR,
+    ),
+]
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in text if not unicodedata.combining(char)).strip().lower()
+
+
+_TIPO_BY_NAME = {
+    **{normalize(value): value for value in CostType.values},
+    **{normalize(str(label)): value for value, label in CostType.choices},
+}
+
+
+def infer_tipo(explicit: str, concepto: str, rules=TIPO_RULES) -> str:
+    """Tipo explícito si es válido (valor o etiqueta); si no, por palabras clave."""
+    tipo = _TIPO_BY_NAME.get(normalize(explicit))
+    if tipo:
+        return tipo
+    text = normalize(concepto)
+    for keywords, tipo in rules:
+        if any(keyword in text for keyword in keywords):
+            return tipo
+    return CostType.OTHER
+
+
+_NON_NUMERIC = re.compile(r"[^\d,.\-()]")
+_SCIENTIFIC = re.compile(r"[-+]?\d+(?:[.,]\d+)?[eE][-+]?\d+")
+_EXPONENT = re.compile(r"\d\s*[eE]\s*[-+]?\d")
+# Miles agrupados de a tres ("1.500", "1,234,567"); "0.500" no es un grupo de miles
+_GROUPED = {sep: re.compile(rf"-?[1-9]\d{{0,2}}(?:\{sep}\d{{3}})+") for sep in ",."}
+# Cost.monto tiene 12 dígitos con 2 decimales
+MAX_AMOUNT = Decimal(10) ** 10
+
+
+def parse_amount(value: str) -> Decimal | None:
+    """Acepta "1.234,56", "1,234.56", "$ 1.500", "-12.5", "(450)" o "1.2E+06".
+
+    Con los dos separadores el último es el decimal. Con uno solo, "." y ","
+    siguen la misma regla: repetido o seguido de exactamente tres dígitos separa
+    miles ("1.500" son mil quinientos); si no, es el decimal. Los paréntesis
+    contables son negativos.
+    """
+    value = (value or "").strip()
+    if _SCIENTIFIC.fullmatch(value):
+        text = value.replace(",", ".")
+    elif _EXPONENT.search(value):
+        return None  # exponente con otros símbolos: ambiguo
+    else:
+        text = _NON_NUMERIC.sub("", value)
+        if text.startswith("(") and text.endswith(")"):
+            text = "-" + text[1:-1]
+        if not text or "(" in text or ")" in text:
+            return None
+        if "," in text and "." in text:
+            decimal_sep = "," if text.rfind(",") > text.rfind(".") else "."
+            thousands = "." if decimal_sep == "," else ","
+            text = text.replace(thousands, "").replace(decimal_sep, ".")
+        else:
+            for sep in ",.":
+                if _GROUPED[sep].fullmatch(text):
+                    text = text.replace(sep, "")
+                elif text.count(sep) == 1:
+                    text = text.replace(sep, ".")
+    try:
+        return Decimal(text).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+
+def parse_date(value: str) -> date | None:
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+@dataclass
+class ColumnMapping:
+    """Nombre de la columna del CSV para cada campo del costo ("" si no existe)."""
+
+    fecha: str = "fecha"
+    concepto: str = "concepto"
+    monto: str = "monto"
+    lote: str = "lote"
+    animal: str = "animal"
+    tipo: str = "tipo"
+    notas: str = "notas"
+
+    REQUIRED = ("fecha", "concepto", "monto", "lote")
+
+    def missing(self, header: Iterable[str]) -> list[str]:
+        header = set(header)
+        return [name for name in self.REQUIRED if getattr(self, name) not in header]
+
+
+@dataclass
+class RowError:
+    line: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"Línea {self.line}: {self.message}"
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    rejected: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, message))
+
+
+class CostImporter:
+    def __init__(
+        self,
+        user,
+        mapping: ColumnMapping | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        absolute_amounts: bool = False,
+        dry_run: bool = False,
+        today: date | None = None,
+    ) -> None:
+        self.user = user
+        self.mapping = mapping or ColumnMapping()
+        self.chunk_size = chunk_size
+        self.absolute_amounts = absolute_amounts
+        self.dry_run = dry_run
+        self.today = today or timezone.localdate()
+        # Los lotes de un usuario son pocos: se resuelven todos una vez
+        self.batches = {
+            normalize(nombre): pk
+            for pk, nombre in Batch.objects.by_user(user).values_list("pk", "nombre")
+        }
+
+    def run(self, handle: IO[str], delimiter: str = ",") -> ImportResult:
+        reader = csv.DictReader(handle, delimiter=delimiter)
+        missing = self.mapping.missing(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Faltan columnas en el archivo: {', '.join(missing)}")
+
+        result = ImportResult()
+        self.earliest: dict[int, date] = {}
+        # Línea 1 es el encabezado
+        rows = enumerate(reader, start=2)
+        # Todo o nada: un error a mitad del archivo no deja bloques ya insertados
+        # que un segundo intento duplicaría.
+        with transaction.atomic():
+            for chunk in iter(lambda: list(islice(rows, self.chunk_size)), []):
+                self._process_chunk(chunk, result)
+
+            # Un solo recálculo del reparto por lote al final, no uno por bloque
+            for batch_id, since in self.earliest.items():
+                schedule_recompute(batch_id, since=since)
+            if self.earliest:
+                costs_bulk_created.send(sender=Cost, batch_ids=list(self.earliest))
+        return result
+
+    def _column(self, chunk, name: str) -> list[str]:
+        column = getattr(self.mapping, name)
+        if not column:
+            return [""] * len(chunk)
+        return [(row.get(column) or "").strip() for _, row in chunk]
+
+    def _resolve_animals(self, codes: set[str]) -> dict[str, tuple[int, int]]:
+        if not codes:
+            return {}
+        animals = Animal.objects.filter(
+            batch__usuario=self.user, batch__is_active=True, codigo__in=codes
+        )
+        return {
+            codigo: (pk, batch_id)
+            for pk, codigo, batch_id in animals.values_list("pk", "codigo", "batch_id")
+        }
+
+    def _process_chunk(self, chunk: list[tuple[int, dict]], result: ImportResult) -> None:
+        lines = [line for line, _ in chunk]
+        fechas = [parse_date(value) for value in self._column(chunk, "fecha")]
+        montos = [parse_amount(value) for value in self._column(chunk, "monto")]
+        conceptos = self._column(chunk, "concepto")
+        lotes = [self.batches.get(normalize(name)) for name in self._column(chunk, "lote")]
+        codes = self._column(chunk, "animal")
+        animals = self._resolve_animals({code for code in codes if code})
+        animal_refs = [animals.get(code) if code else None for code in codes]
+
+        if self.absolute_amounts:
+            montos = [abs(monto) if monto is not None else None for monto in montos]
+
+        # Validación por columnas, equivalente a CostForm.clean
+        too_large = np.array([monto is not None and abs(monto) >= MAX_AMOUNT for monto in montos])
+        cents = np.array(
+            [
+                int(monto * 100) if monto is not None and not large else 0
+                for monto, large in zip(montos, too_large, strict=True)
+            ],
+            dtype=np.int64,
+        )
+        days = np.array([fecha.toordinal() if fecha else 0 for fecha in fechas], dtype=np.int64)
+        batch_ids = np.array([pk or 0 for pk in lotes], dtype=np.int64)
+        animal_batches = np.array([ref[1] if ref else 0 for ref in animal_refs], dtype=np.int64)
+        has_code = np.array([bool(code) for code in codes])
+
+        checks = [
+            (days == 0, "fecha inválida"),
+            (days > self.today.toordinal(), "la fecha no puede ser futura"),
+            (np.array([monto is None for monto in montos]), "monto inválido"),
+            (too_large, "el monto excede el máximo permitido"),
+            (cents <= 0, "el monto debe ser mayor a cero"),
+            (np.array([not concepto for concepto in conceptos]), "el concepto es obligatorio"),
+            (batch_ids == 0, "lote desconocido"),
+            (has_code & (animal_batches == 0), "animal desconocido"),
+            (
+                has_code & (animal_batches != 0) & (animal_batches != batch_ids),
+                "el animal no pertenece al lote",
+            ),
+        ]
+        invalid = np.zeros(len(chunk), dtype=bool)
+        messages = np.empty(len(chunk), dtype=object)
+        for mask, message in checks:
+            messages[mask & ~invalid] = message  # se reporta el primer error de cada fila
+            invalid |= mask
+        for index in np.flatnonzero(invalid):
+            result.add_error(lines[index], messages[index])
+
+        tipos = self._column(chunk, "tipo")
+        notas = self._column(chunk, "notas")
+        costs = [
+            Cost(
+                batch_id=lotes[index],
+                animal_id=animal_refs[index][0] if animal_refs[index] else None,
+                tipo=infer_tipo(tipos[index], conceptos[index]),
+                concepto=conceptos[index][:120],
+                monto=montos[index],
+                fecha=fechas[index],
+                notas=notas[index],
+            )
+            for index in np.flatnonzero(~invalid)
+        ]
+        if self.dry_run or not costs:
+            result.created += len(costs)
+            return
+
+        Cost.objects.bulk_create(costs)
+        result.created += len(costs)
+        for cost in costs:
+            current = self.earliest.get(cost.batch_id)
+            if current is None or cost.fecha < current:
+                self.earliest[cost.batch_id] = cost.fecha
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from costs.allocation import allocate_all, get_driver
+from costs.models import CostAllocation
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde cero el reparto de costos por animal de todos los lotes "
+        "o de los indicados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--driver",
+            choices=[choice for choice in CostAllocation.Driver.values if choice != "direct"],
+            default=None,
+            help="Criterio de reparto; por defecto COST_ALLOCATION_DRIVER.",
+        )
+        parser.add_argument("--batch", type=int, action="append", dest="batches")
+
+    def handle(self, *args, **options):
+        driver = options["driver"] or get_driver()
+        start = time.perf_counter()
+        rows = allocate_all(driver=driver, batch_ids=options["batches"])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(f"{rows} asignaciones ({driver}) escritas en {elapsed:.1f} s.")
+        )
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from costs.importer import DEFAULT_CHUNK_SIZE, ColumnMapping, CostImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa costos desde un CSV del libro contable o del banco. Ejemplo: "
+        "import_costs libro.csv --user ana@example.com --map fecha=Fecha --map monto=Valor --abs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--user", required=True, help="Usuario dueño de los lotes.")
+        parser.add_argument(
+            "--map",
+            action="append",
+            default=[],
+            metavar="CAMPO=COLUMNA",
+            help=(
+                "Columna del CSV para un campo: fecha, concepto, monto, lote, animal, tipo, notas."
+            ),
+        )
+        parser.add_argument("--delimiter", default=",")
+        parser.add_argument("--encoding", default="utf-8-sig")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--abs",
+            action="store_true",
+            help="Usa el valor absoluto de los montos (débitos negativos).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Valida sin guardar.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist as exc:
+            raise CommandError(f"No existe el usuario {options['user']}") from exc
+
+        mapping = ColumnMapping()
+        for item in options["map"]:
+            name, sep, column = item.partition("=")
+            if not sep or not hasattr(mapping, name) or name == "REQUIRED":
+                raise CommandError(f"Mapeo inválido: {item}")
+            setattr(mapping, name, column)
+
+        importer = CostImporter(
+            user,
+            mapping,
+            chunk_size=options["chunk_size"],
+            absolute_amounts=options["abs"],
+            dry_run=options["dry_run"],
+        )
+        try:
+            with open(options["path"], encoding=options["encoding"], newline="") as handle:
+                result = importer.run(handle, delimiter=options["delimiter"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        for error in result.errors:
+            self.stderr.write(str(error))
+        verb = "válidos" if options["dry_run"] else "importados"
+        summary = f"{result.created} costos {verb}, {result.rejected} filas rechazadas."
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from costs.recurring import BATCH_SIZE, materialize_recurring_costs
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea los costos vencidos de todas las plantillas recurrentes. Es idempotente: "
+        "se puede volver a ejecutar tras una falla sin duplicar costos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date", default=None, help="Fecha de corte YYYY-MM-DD (por defecto hoy)."
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = date.fromisoformat(options["date"])
+            except ValueError as exc:
+                raise CommandError(f"Fecha inválida: {options['date']}") from exc
+
+        created = materialize_recurring_costs(today, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{created} ocurrencias procesadas."))
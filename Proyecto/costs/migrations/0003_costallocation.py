@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0003_animal_codigo'),
+        ('batches', '0005_pendingimagedeletion'),
+        ('costs', '0002_rename_costs_cost_batch_i_63c1ee_idx_costs_cost_batch_i_41888e_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CostAllocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('driver', models.CharField(choices=[('direct', 'Directo'), ('equal', 'Partes iguales'), ('days', 'Días presente'), ('weight', 'Último peso')], max_length=10, verbose_name='Criterio de reparto')),
+                ('share', models.FloatField(verbose_name='Proporción')),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Monto asignado')),
+                ('animal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones_costo', to='animals.animal', verbose_name='Animal')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones_costo', to='batches.batch', verbose_name='Lote')),
+                ('cost', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones', to='costs.cost', verbose_name='Costo')),
+            ],
+            options={
+                'verbose_name': 'Asignación de costo',
+                'verbose_name_plural': 'Asignaciones de costo',
+                'ordering': ['-fecha', 'cost', 'animal'],
+                'indexes': [models.Index(fields=['animal', 'fecha'], name='costs_costa_animal__2b57b0_idx'), models.Index(fields=['batch', 'fecha'], name='costs_costa_batch_i_56240f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cost', 'animal'), name='cost_allocation_unique_animal')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0003_animal_codigo'),
+        ('batches', '0005_pendingimagedeletion'),
+        ('costs', '0003_costallocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cost',
+            name='occurrence_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Fecha de la ocurrencia'),
+        ),
+        migrations.CreateModel(
+            name='RecurringCost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('feed', 'Alimentación'), ('health', 'Salud'), ('maintenance', 'Mantenimiento'), ('labor', 'Mano de obra'), ('other', 'Otro')], max_length=20, verbose_name='Tipo de costo')),
+                ('concepto', models.CharField(max_length=120, verbose_name='Concepto')),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Monto')),
+                ('notas', models.TextField(blank=True, verbose_name='Notas')),
+                ('frequency', models.CharField(choices=[('weekly', 'Semanal'), ('monthly', 'Mensual')], default='monthly', max_length=10, verbose_name='Frecuencia')),
+                ('interval', models.PositiveSmallIntegerField(default=1, verbose_name='Cada cuántos periodos')),
+                ('start_date', models.DateField(verbose_name='Primera fecha')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='Fecha final')),
+                ('next_due', models.DateField(editable=False, verbose_name='Próxima ocurrencia')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('animal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='costos_recurrentes', to='animals.animal', verbose_name='Animal')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='costos_recurrentes', to='batches.batch', verbose_name='Lote')),
+            ],
+            options={
+                'verbose_name': 'Costo recurrente',
+                'verbose_name_plural': 'Costos recurrentes',
+                'ordering': ['next_due', 'concepto'],
+            },
+        ),
+        migrations.AddField(
+            model_name='cost',
+            name='recurring',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ocurrencias', to='costs.recurringcost', verbose_name='Costo recurrente'),
+        ),
+        migrations.AddConstraint(
+            model_name='cost',
+            constraint=models.UniqueConstraint(fields=('recurring', 'occurrence_date'), name='cost_unique_recurring_occurrence'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringcost',
+            index=models.Index(fields=['is_active', 'next_due'], name='costs_recur_is_acti_8afeb3_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurringcost',
+            constraint=models.CheckConstraint(condition=models.Q(('monto__gt', 0)), name='recurring_cost_monto_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurringcost',
+            constraint=models.CheckConstraint(condition=models.Q(('interval__gte', 1)), name='recurring_cost_interval_positive'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
 from django.db import models
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
@@ -12,7 +15,7 @@ class CostQuerySet(models.QuerySet):
     def for_user(self, user) -> "CostQuerySet":
         if not user or not getattr(user, "is_authenticated", False):
             return self.none()
-        return self.filter(batch__usuario=user)
+        return self.filter(batch__usuario=user, batch__is_active=True)
 
     def with_relations(self) -> "CostQuerySet":
         return self.select_related("batch", "animal")
@@ -59,6 +62,19 @@ class Cost(models.Model):
         verbose_name=_("Notas"),
         blank=True,
     )
+    recurring = models.ForeignKey(
+        "RecurringCost",
+        on_delete=models.SET_NULL,
+        related_name="ocurrencias",
+        blank=True,
+        null=True,
+        verbose_name=_("Costo recurrente"),
+    )
+    occurrence_date = models.DateField(
+        blank=True,
+        null=True,
+        verbose_name=_("Fecha de la ocurrencia"),
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -78,7 +94,220 @@ class Cost(models.Model):
                 check=Q(monto__gt=0),
                 name="cost_monto_positive",
             ),
+            # Clave de idempotencia de la materialización de costos recurrentes
+            models.UniqueConstraint(
+                fields=["recurring", "occurrence_date"],
+                name="cost_unique_recurring_occurrence",
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.concepto} - {self.batch.nombre}"
+
+
+class RecurringCost(models.Model):
+    """Plantilla de un costo que se repite cada semana o cada mes."""
+
+    class Frequency(models.TextChoices):
+        WEEKLY = ("weekly", _("Semanal"))
+        MONTHLY = ("monthly", _("Mensual"))
+
+    batch = models.ForeignKey(
+        Batch,
+        on_delete=models.CASCADE,
+        related_name="costos_recurrentes",
+        verbose_name=_("Lote"),
+    )
+    animal = models.ForeignKey(
+        Animal,
+        on_delete=models.SET_NULL,
+        related_name="costos_recurrentes",
+        blank=True,
+        null=True,
+        verbose_name=_("Animal"),
+    )
+    tipo = models.CharField(
+        max_length=20,
+        choices=Cost.CostType.choices,
+        verbose_name=_("Tipo de costo"),
+    )
+    concepto = models.CharField(
+        max_length=120,
+        verbose_name=_("Concepto"),
+    )
+    monto = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name=_("Monto"),
+    )
+    notas = models.TextField(
+        verbose_name=_("Notas"),
+        blank=True,
+    )
+    frequency = models.CharField(
+        max_length=10,
+        choices=Frequency.choices,
+        default=Frequency.MONTHLY,
+        verbose_name=_("Frecuencia"),
+    )
+    interval = models.PositiveSmallIntegerField(
+        default=1,
+        verbose_name=_("Cada cuántos periodos"),
+    )
+    start_date = models.DateField(verbose_name=_("Primera fecha"))
+    end_date = models.DateField(
+        blank=True,
+        null=True,
+        verbose_name=_("Fecha final"),
+    )
+    next_due = models.DateField(
+        editable=False,
+        verbose_name=_("Próxima ocurrencia"),
+    )
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name=_("Activo"),
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Costo recurrente")
+        verbose_name_plural = _("Costos recurrentes")
+        ordering = ["next_due", "concepto"]
+        indexes = [
+            models.Index(fields=["is_active", "next_due"]),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(monto__gt=0),
+                name="recurring_cost_monto_positive",
+            ),
+            models.CheckConstraint(
+                check=Q(interval__gte=1),
+                name="recurring_cost_interval_positive",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.concepto} ({self.get_frequency_display()}) - {self.batch.nombre}"
+
+    SCHEDULE_FIELDS = ("start_date", "frequency", "interval")
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, "_loaded_values", None)
+        if self.next_due is None:
+            self.next_due = self.start_date
+        elif loaded and any(getattr(self, name) != loaded[name] for name in self.SCHEDULE_FIELDS):
+            self.next_due = self.first_due_from(loaded)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "next_due"}
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            name: getattr(self, name) for name in (*self.SCHEDULE_FIELDS, "next_due")
+        }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Calendario original: al cambiarlo hay que recalcular next_due
+        instance._loaded_values = {
+            name: instance.__dict__.get(name) for name in (*cls.SCHEDULE_FIELDS, "next_due")
+        }
+        return instance
+
+    def first_due_from(self, loaded: dict) -> date:
+        """Primera ocurrencia del calendario nuevo que aún no se materializó.
+
+        Si la plantilla nunca generó costos se arranca desde ``start_date``; si no,
+        desde la primera fecha del calendario nuevo a partir del ``next_due`` viejo.
+        """
+        if loaded["next_due"] is None or loaded["next_due"] <= loaded["start_date"]:
+            return self.start_date
+        index, current = 0, self.start_date
+        while current < loaded["next_due"]:
+            index += 1
+            current = self.occurrence(index)
+        return current
+
+    def occurrence(self, index: int) -> date:
+        """Fecha de la ocurrencia número ``index`` contando desde la primera.
+
+        Los meses se cuentan desde ``start_date`` para que un día 31 caiga en el
+        último día de los meses cortos sin desplazar los siguientes.
+        """
+        if self.frequency == self.Frequency.WEEKLY:
+            return self.start_date + timedelta(weeks=index * self.interval)
+        return self.start_date + relativedelta(months=index * self.interval)
+
+    def due_dates(self, until: date) -> tuple[list[date], date]:
+        """Ocurrencias pendientes hasta ``until`` (o la fecha final) y la siguiente."""
+        limit = min(until, self.end_date) if self.end_date else until
+        dates, index = [], 0
+        current = self.start_date
+        while current <= limit:
+            if current >= self.next_due:
+                dates.append(current)
+            index += 1
+            current = self.occurrence(index)
+        return dates, current
+
+
+class CostAllocation(models.Model):
+    """Parte de un costo asignada a un animal del lote según un criterio de reparto."""
+
+    class Driver(models.TextChoices):
+        DIRECT = ("direct", _("Directo"))
+        EQUAL = ("equal", _("Partes iguales"))
+        DAYS = ("days", _("Días presente"))
+        WEIGHT = ("weight", _("Último peso"))
+
+    cost = models.ForeignKey(
+        Cost,
+        on_delete=models.CASCADE,
+        related_name="asignaciones",
+        verbose_name=_("Costo"),
+    )
+    animal = models.ForeignKey(
+        Animal,
+        on_delete=models.CASCADE,
+        related_name="asignaciones_costo",
+        verbose_name=_("Animal"),
+    )
+    batch = models.ForeignKey(
+        Batch,
+        on_delete=models.CASCADE,
+        related_name="asignaciones_costo",
+        verbose_name=_("Lote"),
+    )
+    fecha = models.DateField(verbose_name=_("Fecha"))
+    driver = models.CharField(
+        max_length=10,
+        choices=Driver.choices,
+        verbose_name=_("Criterio de reparto"),
+    )
+    share = models.FloatField(verbose_name=_("Proporción"))
+    monto = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name=_("Monto asignado"),
+    )
+
+    class Meta:
+        verbose_name = _("Asignación de costo")
+        verbose_name_plural = _("Asignaciones de costo")
+        ordering = ["-fecha", "cost", "animal"]
+        indexes = [
+            models.Index(fields=["animal", "fecha"]),
+            models.Index(fields=["batch", "fecha"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cost", "animal"],
+                name="cost_allocation_unique_animal",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.cost_id} → {self.animal_id}: {self.monto}"
@@ -0,0 +1,70 @@
+"""Materialización de los costos recurrentes pendientes.
+
+Cada ocurrencia se inserta como un `Cost` con la clave única
+``(recurring, occurrence_date)``; la inserción usa ``ignore_conflicts``, así que
+repetir la corrida (por ejemplo tras una caída entre el insert y el avance de
+``next_due``) no duplica costos.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .allocation import schedule_recompute
+from .models import Cost, RecurringCost
+from .signals import costs_bulk_created
+
+BATCH_SIZE = 1000
+
+
+def due_templates(today: date):
+    return RecurringCost.objects.filter(
+        is_active=True, batch__is_active=True, next_due__lte=today
+    ).filter(
+        Q(end_date__isnull=True) | Q(next_due__lte=F("end_date"))
+    )
+
+
+def materialize_recurring_costs(today: date | None = None, batch_size: int = BATCH_SIZE) -> int:
+    """Crea en una sola pasada las ocurrencias vencidas de todos los usuarios.
+
+    Retorna cuántas ocurrencias se intentaron insertar (las ya existentes se
+    ignoran en la base de datos).
+    """
+    today = today or timezone.localdate()
+    templates = list(due_templates(today))
+    costs: list[Cost] = []
+    since_by_batch: dict[int, date] = {}
+
+    for template in templates:
+        dates, template.next_due = template.due_dates(today)
+        for fecha in dates:
+            costs.append(
+                Cost(
+                    batch_id=template.batch_id,
+                    animal_id=template.animal_id,
+                    tipo=template.tipo,
+                    concepto=template.concepto,
+                    monto=template.monto,
+                    fecha=fecha,
+                    notas=template.notas,
+                    recurring=template,
+                    occurrence_date=fecha,
+                )
+            )
+        if dates:
+            current = since_by_batch.get(template.batch_id)
+            since_by_batch[template.batch_id] = min(dates[0], current) if current else dates[0]
+
+    with transaction.atomic():
+        Cost.objects.bulk_create(costs, batch_size=batch_size, ignore_conflicts=True)
+        RecurringCost.objects.bulk_update(templates, ["next_due"], batch_size=batch_size)
+        # bulk_create no emite post_save: el reparto se recalcula por lote y fecha
+        for batch_id, since in since_by_batch.items():
+            schedule_recompute(batch_id, since=since)
+        if since_by_batch:
+            costs_bulk_created.send(sender=Cost, batch_ids=list(since_by_batch))
+    return len(costs)
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from animals.models import Animal
+from tracking.models import Peso
+
+from .allocation import get_driver, schedule_recompute
+from .models import Cost, CostAllocation
+
+# bulk_create no emite post_save: la importación y los recurrentes envían este,
+# con ``batch_ids``, para los lotes donde insertaron costos.
+costs_bulk_created = Signal()
+
+
+@receiver(post_save, sender=Cost)
+def reallocate_cost(sender, instance: Cost, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_recompute(instance.batch_id, cost_id=instance.pk)
+
+
+@receiver(post_save, sender=Animal)
+def reallocate_on_animal_change(sender, instance: Animal, created=False, raw=False, **kwargs):
+    """Un animal nuevo o movido cambia el reparto de los costos desde su nacimiento."""
+    if raw:
+        return
+    previous = getattr(instance, "_loaded_values", None)
+    if created or previous is None:
+        schedule_recompute(instance.batch_id, since=instance.fecha_de_nacimiento)
+        return
+    old_batch, old_birth = previous["batch_id"], previous["fecha_de_nacimiento"]
+    if (old_batch, old_birth) == (instance.batch_id, instance.fecha_de_nacimiento):
+        return
+
+    if old_batch != instance.batch_id:
+        schedule_recompute(old_batch, since=old_birth)
+        schedule_recompute(instance.batch_id, since=instance.fecha_de_nacimiento)
+    else:
+        schedule_recompute(instance.batch_id, since=min(old_birth, instance.fecha_de_nacimiento))
+
+
+@receiver(post_delete, sender=Animal)
+def reallocate_on_animal_delete(sender, instance: Animal, **kwargs):
+    schedule_recompute(instance.batch_id, since=instance.fecha_de_nacimiento)
+
+
+@receiver(post_save, sender=Peso)
+@receiver(post_delete, sender=Peso)
+def reallocate_on_weight_change(sender, instance: Peso, raw=False, **kwargs):
+    """Solo el reparto por peso depende de los registros de peso."""
+    if raw or get_driver() != CostAllocation.Driver.WEIGHT:
+        return
+    batch_id = (
+        Animal.objects.filter(pk=instance.animal_id).values_list("batch_id", flat=True).first()
+    )
+    if batch_id is not None:
+        fecha = instance.fecha
+        since = timezone.localdate(fecha) if timezone.is_aware(fecha) else fecha.date()
+        schedule_recompute(batch_id, since=since)
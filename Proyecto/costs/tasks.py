@@ -0,0 +1,9 @@
+from jobs.queue import task
+
+from .recurring import materialize_recurring_costs
+
+
+@task
+def materialize_recurring() -> int:
+    """Crea los costos vencidos de las plantillas recurrentes; es idempotente."""
+    return materialize_recurring_costs()
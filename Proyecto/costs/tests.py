@@ -1,14 +1,25 @@
+import io
 from datetime import date, timedelta
 from decimal import Decimal
+from unittest import mock
 
+import numpy
 from django.contrib.auth import get_user_model
-from django.test import RequestFactory, TestCase
+from django.db import DatabaseError
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 
 from animals.models import Animal
 from batches.models import Batch
+from tracking.models import Peso
 
+from .allocation import allocate_batch, split_cents
 from .forms import CostForm
-from .models import Cost
+from .importer import ColumnMapping, CostImporter, infer_tipo, parse_amount
+from .models import Cost, CostAllocation, RecurringCost
+from .recurring import materialize_recurring_costs
 from .views import CostListView
 
 User = get_user_model()
@@ -163,6 +174,17 @@ class CostListViewTests(TestCase):
 
         self.assertEqual(list(queryset), [self.cost])
 
+    def test_stats_come_from_a_single_aggregate(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("costs:list"))
+
+        stats = response.context["stats"]
+        self.assertEqual(stats["total"], 1)
+        self.assertEqual(stats["sum"], Decimal("45.00"))
+        self.assertEqual(stats["last_date"], self.cost.fecha)
+        self.assertEqual(response.context["paginator"].count, 1)
+
     def test_search_filter(self):
         request = self.factory.get("/", {"search": "Pasto"})
         request.user = self.user
@@ -172,3 +194,389 @@ class CostListViewTests(TestCase):
         queryset = view.get_queryset()
 
         self.assertEqual(list(queryset), [self.cost])
+
+
+class CostAllocationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="testpass")
+        self.batch = Batch.objects.create(usuario=self.user, nombre="Lote 1")
+        self.old = Animal.objects.create(
+            batch=self.batch, especie="Vaca", sexo="F", fecha_de_nacimiento=date(2023, 1, 1)
+        )
+        self.young = Animal.objects.create(
+            batch=self.batch, especie="Vaca", sexo="M", fecha_de_nacimiento=date(2024, 3, 20)
+        )
+
+    def create_cost(self, monto, fecha, animal=None):
+        return Cost.objects.create(
+            batch=self.batch,
+            animal=animal,
+            tipo=Cost.CostType.FEED,
+            concepto="Concentrado",
+            monto=Decimal(monto),
+            fecha=fecha,
+        )
+
+    def allocated(self, cost):
+        return dict(cost.asignaciones.values_list("animal_id", "monto"))
+
+    def test_split_cents_never_loses_a_cent(self):
+        allocated, shares = split_cents(
+            numpy.array([100, 1001]), numpy.array([[1.0, 1.0, 1.0], [0.0, 2.0, 1.0]])
+        )
+
+        self.assertEqual(allocated.tolist(), [[34, 33, 33], [0, 667, 334]])
+        self.assertAlmostEqual(shares[1, 1], 2 / 3)
+
+    def test_equal_share_only_over_animals_present(self):
+        before = self.create_cost("90.00", date(2024, 1, 10))
+        after = self.create_cost("90.01", date(2024, 4, 1))
+
+        allocate_batch(self.batch.pk, driver="equal")
+
+        self.assertEqual(self.allocated(before), {self.old.pk: Decimal("90.00")})
+        self.assertEqual(
+            self.allocated(after), {self.old.pk: Decimal("45.01"), self.young.pk: Decimal("45.00")}
+        )
+
+    def test_days_present_within_window(self):
+        cost = self.create_cost("40.00", date(2024, 3, 29))
+
+        allocate_batch(self.batch.pk, driver="days")
+
+        # 30 días del animal adulto frente a 10 del recién nacido
+        self.assertEqual(
+            self.allocated(cost), {self.old.pk: Decimal("30.00"), self.young.pk: Decimal("10.00")}
+        )
+
+    def test_weight_uses_latest_weight_before_cost_date(self):
+        third = Animal.objects.create(
+            batch=self.batch, especie="Vaca", sexo="F", fecha_de_nacimiento=date(2023, 6, 1)
+        )
+        for animal, day, peso in [
+            (self.old, date(2024, 2, 1), "100"),
+            (self.old, date(2024, 4, 1), "300"),
+            (self.young, date(2024, 3, 25), "50"),
+            (self.young, date(2024, 5, 1), "999"),
+        ]:
+            Peso.objects.create(
+                animal=animal,
+                fecha=timezone.make_aware(timezone.datetime(day.year, day.month, day.day, 12)),
+                peso=Decimal(peso),
+            )
+        cost = self.create_cost("300.00", date(2024, 4, 10))
+
+        allocate_batch(self.batch.pk, driver="weight")
+
+        # El tercer animal no tiene peso: toma la media de los pesados (175)
+        self.assertEqual(
+            self.allocated(cost),
+            {
+                self.old.pk: Decimal("171.43"),
+                self.young.pk: Decimal("28.57"),
+                third.pk: Decimal("100.00"),
+            },
+        )
+
+    def test_direct_costs_stay_on_their_animal(self):
+        cost = self.create_cost("12.50", date(2024, 4, 1), animal=self.young)
+
+        allocate_batch(self.batch.pk, driver="equal")
+
+        self.assertEqual(self.allocated(cost), {self.young.pk: Decimal("12.50")})
+        self.assertEqual(cost.asignaciones.get().driver, CostAllocation.Driver.DIRECT)
+
+    @override_settings(COST_ALLOCATION_DRIVER="equal")
+    def test_recomputed_incrementally_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cost = self.create_cost("10.00", date(2024, 4, 1))
+        self.assertEqual(len(self.allocated(cost)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer = Animal.objects.create(
+                batch=self.batch, especie="Vaca", sexo="F", fecha_de_nacimiento=date(2024, 1, 1)
+            )
+        self.assertEqual(
+            self.allocated(cost),
+            {
+                self.old.pk: Decimal("3.34"),
+                self.young.pk: Decimal("3.33"),
+                newcomer.pk: Decimal("3.33"),
+            },
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.young.fecha_de_nacimiento = date(2024, 5, 1)
+            self.young.save()
+        self.assertEqual(
+            self.allocated(cost), {self.old.pk: Decimal("5.00"), newcomer.pk: Decimal("5.00")}
+        )
+
+
+class RecurringCostTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="testpass")
+        self.batch = Batch.objects.create(usuario=self.user, nombre="Lote 1")
+
+    def create_template(self, **kwargs):
+        data = {
+            "batch": self.batch,
+            "tipo": Cost.CostType.FEED,
+            "concepto": "Concentrado",
+            "monto": Decimal("150.00"),
+            "start_date": date(2024, 1, 31),
+        }
+        data.update(kwargs)
+        return RecurringCost.objects.create(**data)
+
+    def occurrence_dates(self, template):
+        return list(
+            template.ocurrencias.order_by("fecha").values_list("occurrence_date", flat=True)
+        )
+
+    def test_monthly_occurrences_clamp_to_month_end(self):
+        template = self.create_template()
+
+        materialize_recurring_costs(date(2024, 4, 30))
+
+        self.assertEqual(
+            self.occurrence_dates(template),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)],
+        )
+        template.refresh_from_db()
+        self.assertEqual(template.next_due, date(2024, 5, 31))
+
+    def test_weekly_interval_and_end_date(self):
+        template = self.create_template(
+            frequency=RecurringCost.Frequency.WEEKLY,
+            interval=2,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 2, 1),
+        )
+
+        materialize_recurring_costs(date(2024, 6, 1))
+
+        self.assertEqual(
+            self.occurrence_dates(template),
+            [date(2024, 1, 1), date(2024, 1, 15), date(2024, 1, 29)],
+        )
+        self.assertFalse(
+            RecurringCost.objects.filter(pk=template.pk, next_due__lte=date(2024, 2, 1)).exists()
+        )
+
+    def test_rerun_after_crash_does_not_duplicate(self):
+        template = self.create_template()
+        materialize_recurring_costs(date(2024, 3, 31))
+        # Simula una caída antes de avanzar next_due
+        RecurringCost.objects.filter(pk=template.pk).update(next_due=template.start_date)
+
+        materialize_recurring_costs(date(2024, 3, 31))
+
+        self.assertEqual(template.ocurrencias.count(), 3)
+
+    def test_editing_the_schedule_recomputes_next_due(self):
+        template = self.create_template()
+        template = RecurringCost.objects.get(pk=template.pk)
+        template.start_date = date(2024, 2, 15)
+        template.save()
+        self.assertEqual(template.next_due, date(2024, 2, 15))
+
+        materialize_recurring_costs(date(2024, 3, 20))
+        template = RecurringCost.objects.get(pk=template.pk)
+        self.assertEqual(template.next_due, date(2024, 4, 15))
+
+        template.frequency = RecurringCost.Frequency.WEEKLY
+        template.save(update_fields=["frequency"])
+
+        template.refresh_from_db()
+        self.assertEqual(template.next_due, date(2024, 4, 18))
+        materialize_recurring_costs(date(2024, 4, 30))
+        self.assertEqual(
+            self.occurrence_dates(template),
+            [date(2024, 2, 15), date(2024, 3, 15), date(2024, 4, 18), date(2024, 4, 25)],
+        )
+
+    def test_saving_without_schedule_changes_keeps_next_due(self):
+        template = self.create_template()
+        materialize_recurring_costs(date(2024, 3, 31))
+        template = RecurringCost.objects.get(pk=template.pk)
+
+        template.concepto = "Sal mineral"
+        template.save()
+
+        template.refresh_from_db()
+        self.assertEqual(template.next_due, date(2024, 4, 30))
+
+    def test_inactive_and_future_templates_are_skipped(self):
+        self.create_template(is_active=False)
+        self.create_template(start_date=date(2025, 1, 1))
+
+        self.assertEqual(materialize_recurring_costs(date(2024, 12, 31)), 0)
+        self.assertFalse(Cost.objects.exists())
+
+    def test_materialized_costs_are_allocated_on_commit(self):
+        animal = Animal.objects.create(
+            batch=self.batch, especie="Vaca", sexo="F", fecha_de_nacimiento=date(2020, 1, 1)
+        )
+        self.create_template()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            materialize_recurring_costs(date(2024, 2, 29))
+
+        self.assertEqual(CostAllocation.objects.filter(animal=animal).count(), 2)
+
+
+class CostImporterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="testpass")
+        self.batch = Batch.objects.create(usuario=self.user, nombre="Potrero Norte")
+        other_batch = Batch.objects.create(usuario=self.user, nombre="Potrero Sur")
+        self.animal = Animal.objects.create(
+            batch=self.batch, codigo="VN-01", especie="Vaca", sexo="F",
+            fecha_de_nacimiento=date(2020, 1, 1)
+        )
+        Animal.objects.create(
+            batch=other_batch, codigo="VS-01", especie="Vaca", sexo="F",
+            fecha_de_nacimiento=date(2020, 1, 1)
+        )
+        intruder = User.objects.create_user(username="intruder", password="testpass")
+        Batch.objects.create(usuario=intruder, nombre="Ajeno")
+
+    def run_import(self, text, **kwargs):
+        mapping = ColumnMapping(
+            fecha="Fecha", concepto="Descripción", monto="Valor", lote="Lote", animal="Animal"
+        )
+        importer = CostImporter(self.user, mapping, chunk_size=2, today=date(2024, 6, 30), **kwargs)
+        return importer.run(io.StringIO(text), delimiter=";")
+
+    def test_parse_amount_formats(self):
+        self.assertEqual(parse_amount("$ 1.234,56"), Decimal("1234.56"))
+        self.assertEqual(parse_amount("1,234.56"), Decimal("1234.56"))
+        self.assertEqual(parse_amount("12,5"), Decimal("12.50"))
+        self.assertEqual(parse_amount("-45"), Decimal("-45.00"))
+        self.assertIsNone(parse_amount("n/a"))
+
+    def test_parse_amount_reads_dots_as_thousands_like_commas(self):
+        self.assertEqual(parse_amount("1.500"), Decimal("1500.00"))
+        self.assertEqual(parse_amount("$ 1.500"), Decimal("1500.00"))
+        self.assertEqual(parse_amount("450.000"), Decimal("450000.00"))
+        self.assertEqual(parse_amount("1.234.567"), Decimal("1234567.00"))
+        self.assertEqual(parse_amount("$1.500.000"), Decimal("1500000.00"))
+        self.assertEqual(parse_amount("(1.500)"), Decimal("-1500.00"))
+        self.assertEqual(parse_amount("1,234,567"), Decimal("1234567.00"))
+        self.assertEqual(parse_amount("0.500"), Decimal("0.50"))
+        self.assertEqual(parse_amount("12.5"), Decimal("12.50"))
+        self.assertIsNone(parse_amount("1.23.4"))
+
+    def test_parse_amount_accounting_and_scientific_notation(self):
+        self.assertEqual(parse_amount("(450)"), Decimal("-450.00"))
+        self.assertEqual(parse_amount("$ (1.234,56)"), Decimal("-1234.56"))
+        self.assertEqual(parse_amount("1.2E+06"), Decimal("1200000.00"))
+        self.assertEqual(parse_amount("1e5"), Decimal("100000.00"))
+        self.assertIsNone(parse_amount("$ 1.2E+06 aprox"))
+        self.assertIsNone(parse_amount("(4)5"))
+
+    def test_infer_tipo_from_explicit_value_or_keywords(self):
+        self.assertEqual(infer_tipo("Salud", "Compra"), Cost.CostType.HEALTH)
+        self.assertEqual(infer_tipo("", "Vacuna aftosa"), Cost.CostType.HEALTH)
+        self.assertEqual(infer_tipo("", "Pago jornal ordeño"), Cost.CostType.LABOR)
+        self.assertEqual(infer_tipo("", "Concentrado 40kg"), Cost.CostType.FEED)
+        self.assertEqual(infer_tipo("", "Impuesto predial"), Cost.CostType.OTHER)
+
+    def test_imports_valid_rows_across_chunks(self):
+        result = self.run_import(
+            "Fecha;Descripción;Valor;Lote;Animal\n"
+            "05/06/2024;Concentrado 40kg;-120.000,00;potrero norte;\n"
+            "2024-06-10;Desparasitante;35.000;Potrero Norte;VN-01\n"
+            "2024-06-11;Reparación cerca;80.000;Potrero Sur;\n",
+            absolute_amounts=True,
+        )
+
+        self.assertEqual((result.created, result.rejected), (3, 0))
+        feed = Cost.objects.get(tipo=Cost.CostType.FEED)
+        self.assertEqual(
+            (feed.batch, feed.monto, feed.fecha),
+            (self.batch, Decimal("120000.00"), date(2024, 6, 5)),
+        )
+        self.assertEqual(Cost.objects.get(tipo=Cost.CostType.HEALTH).animal, self.animal)
+        self.assertTrue(Cost.objects.filter(tipo=Cost.CostType.MAINTENANCE, animal=None).exists())
+
+    def test_rejects_rows_like_cost_form(self):
+        result = self.run_import(
+            "Fecha;Descripción;Valor;Lote;Animal\n"
+            "2024-07-01;Alimento;10;Potrero Norte;\n"
+            "2024-06-01;Alimento;0;Potrero Norte;\n"
+            "2024-06-01;Alimento;10;Ajeno;\n"
+            "2024-06-01;Alimento;10;Potrero Norte;VS-01\n"
+            "2024-06-01;Alimento;10;Potrero Norte;NO-EXISTE\n"
+            "ayer;Alimento;10;Potrero Norte;\n"
+            "2024-06-01;Alimento;10;Potrero Norte;VN-01\n"
+        )
+
+        self.assertEqual((result.created, result.rejected), (1, 6))
+        self.assertEqual(
+            [str(error) for error in result.errors],
+            [
+                "Línea 2: la fecha no puede ser futura",
+                "Línea 3: el monto debe ser mayor a cero",
+                "Línea 4: lote desconocido",
+                "Línea 5: el animal no pertenece al lote",
+                "Línea 6: animal desconocido",
+                "Línea 7: fecha inválida",
+            ],
+        )
+
+    def test_rejects_amounts_beyond_the_field(self):
+        result = self.run_import(
+            "Fecha;Descripción;Valor;Lote;Animal\n"
+            "2024-06-01;Alimento;1e12;Potrero Norte;\n"
+            "2024-06-01;Alimento;9999999999,99;Potrero Norte;\n"
+        )
+
+        self.assertEqual((result.created, result.rejected), (1, 1))
+        self.assertEqual(str(result.errors[0]), "Línea 2: el monto excede el máximo permitido")
+
+    def test_failed_import_leaves_no_partial_chunks(self):
+        bulk_create = Cost.objects.bulk_create
+
+        def fail_on_second_chunk(costs, *args, **kwargs):
+            if Cost.objects.exists():
+                raise DatabaseError("conexión perdida")
+            return bulk_create(costs, *args, **kwargs)
+
+        text = (
+            "Fecha;Descripción;Valor;Lote;Animal\n"
+            "2024-06-01;Alimento;10;Potrero Norte;\n"
+            "2024-06-02;Alimento;10;Potrero Norte;\n"
+            "2024-06-03;Alimento;10;Potrero Norte;\n"
+        )
+        with mock.patch.object(Cost.objects, "bulk_create", side_effect=fail_on_second_chunk):
+            with self.assertRaises(DatabaseError):
+                self.run_import(text)
+
+        self.assertFalse(Cost.objects.exists())
+
+    def test_dry_run_and_missing_columns(self):
+        result = self.run_import(
+            "Fecha;Descripción;Valor;Lote\n2024-06-01;Alimento;10;Potrero Norte\n", dry_run=True
+        )
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Cost.objects.exists())
+
+        with self.assertRaisesMessage(ValueError, "Faltan columnas en el archivo: monto"):
+            self.run_import("Fecha;Descripción;Lote\n")
+
+    def test_allocations_are_recomputed_once_after_import(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_import(
+                "Fecha;Descripción;Valor;Lote;Animal\n"
+                "2024-06-05;Concentrado;100;Potrero Norte;\n"
+                "2024-06-06;Sal mineral;50;Potrero Norte;\n"
+                "2024-06-07;Vacuna;30;Potrero Norte;VN-01\n"
+            )
+
+        self.assertEqual(CostAllocation.objects.filter(batch=self.batch).count(), 3)
+        self.assertEqual(
+            CostAllocation.objects.filter(animal=self.animal).aggregate(total=Sum("monto"))["total"],
+            Decimal("180.00"),
+        )
@@ -6,6 +6,7 @@ app_name = "costs"
 
 urlpatterns = [
     path("", views.CostListView.as_view(), name="list"),
+    path("export/", views.CostExportView.as_view(), name="export"),
     path("add/", views.CostCreateView.as_view(), name="add"),
     path("<int:pk>/edit/", views.CostUpdateView.as_view(), name="edit"),
     path("<int:pk>/delete/", views.CostDeleteView.as_view(), name="delete"),
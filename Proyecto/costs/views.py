@@ -14,6 +14,8 @@ from django.views.generic import CreateView, ListView, UpdateView
 
 from animals.models import Animal
 from batches.models import Batch
+from core.exports import CsvExportMixin
+from core.lists import SummaryListMixin
 
 from .forms import CostForm
 from .models import Cost
@@ -31,17 +33,19 @@ class CostQuerysetMixin(LoginRequiredMixin):
 
     def get_user_animals(self):
         return (
-            Animal.objects.filter(batch__usuario=self.request.user)
+            Animal.objects.filter(batch__usuario=self.request.user, batch__is_active=True)
             .select_related("batch")
             .order_by("codigo", "especie")
         )
 
 
-class CostListView(CostQuerysetMixin, ListView):
+class CostListView(SummaryListMixin, CostQuerysetMixin, ListView):
     model = Cost
     template_name = "costs/cost_list.html"
     context_object_name = "costs"
     paginate_by = 12
+    query_budget = 6
+    summary_aggregates = {"sum": Sum("monto")}
 
     @staticmethod
     def _parse_date(value: str | None) -> date | None:
@@ -82,12 +86,7 @@ class CostListView(CostQuerysetMixin, ListView):
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        queryset = self.object_list
-        stats = {
-            "total": queryset.count(),
-            "sum": queryset.aggregate(total=Sum("monto"))["total"],
-            "last_date": queryset.order_by("-fecha").values_list("fecha", flat=True).first(),
-        }
+        stats = self.get_summary()
         filters = {
             "search": self.request.GET.get("search", ""),
             "batch": self.request.GET.get("batch", ""),
@@ -100,8 +99,8 @@ class CostListView(CostQuerysetMixin, ListView):
             {
                 "filters": filters,
                 "filters_query": urlencode({k: v for k, v in filters.items() if v}),
-                "batches": self.get_user_batches(),
-                "animals": self.get_user_animals(),
+                "batches": list(self.get_user_batches()),
+                "animals": list(self.get_user_animals()),
                 "cost_types": Cost.CostType.choices,
                 "stats": stats,
             }
@@ -109,6 +108,19 @@ class CostListView(CostQuerysetMixin, ListView):
         return context
 
 
+class CostExportView(CsvExportMixin, CostListView):
+    export_filename = "costos"
+    export_fields = [
+        ("Fecha", "fecha"),
+        ("Lote", "batch__nombre"),
+        ("Animal", "animal__codigo"),
+        ("Tipo", "tipo"),
+        ("Concepto", "concepto"),
+        ("Monto", "monto"),
+        ("Notas", "notas"),
+    ]
+
+
 class CostFormMixin(CostQuerysetMixin):
     form_class = CostForm
     template_name = "costs/cost_form.html"
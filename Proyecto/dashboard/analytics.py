@@ -0,0 +1,244 @@
+"""Costo por kilo ganado, costo por litro y margen por lote y mes.
+
+La ganancia de peso sale de una ventana ``LAG`` sobre los pesajes de cada
+animal: cada pesaje aporta la diferencia con el anterior y se imputa al mes en
+que ocurre. Sumadas dentro de un período, esas diferencias dan el último peso
+del período menos el último anterior a él, sin perder la ganancia que cruza el
+cambio de mes. Como SQL no permite agregar sobre una ventana, la consulta con
+``LAG`` se compila con el ORM y se agrupa en una consulta externa.
+
+El gasto por lote sale de `Cost` y el gasto por animal de `CostAllocation`. El
+valor producido es la ganancia de peso a ``DASHBOARD_PRICE_PER_KG`` más los
+litros de leche a ``DASHBOARD_PRICE_PER_LITER``.
+
+Los resultados se guardan en la caché de Django. La clave incluye una versión
+por lote que las señales de `dashboard.signals` renuevan cuando cambian sus
+costos, pesos, producciones o animales, así que no hace falta esperar al
+``DASHBOARD_CACHE_TIMEOUT`` para ver los cambios.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, QuerySet, Sum, Value, When, Window
+from django.db.models.functions import ExtractMonth, ExtractYear, Lag
+
+from animals.models import Animal
+from costs.models import Cost, CostAllocation
+from tracking.models import Peso, Produccion
+
+CACHE_PREFIX = "dashboard:rentabilidad"
+
+
+def get_prices() -> tuple[float, float]:
+    return (
+        float(getattr(settings, "DASHBOARD_PRICE_PER_KG", 9000)),
+        float(getattr(settings, "DASHBOARD_PRICE_PER_LITER", 1800)),
+    )
+
+
+def month_key(field: str):
+    """Mes como entero (año * 12 + mes - 1), comparable y sin conversiones de fecha."""
+    return ExtractYear(field) * 12 + ExtractMonth(field) - 1
+
+
+def month_from_key(key: int) -> date:
+    return date(key // 12, key % 12 + 1, 1)
+
+
+def metrics(gasto: float, kg: float, litros: float, prices: tuple[float, float]) -> dict[str, Any]:
+    price_kg, price_liter = prices
+    valor = kg * price_kg + litros * price_liter
+    return {
+        "gasto": round(gasto, 2),
+        "kg": round(kg, 2),
+        "litros": round(litros, 2),
+        "costo_por_kg": round(gasto / kg, 2) if kg > 0 else None,
+        "costo_por_litro": round(gasto / litros, 2) if litros > 0 else None,
+        "valor": round(valor, 2),
+        "margen": round(valor - gasto, 2),
+    }
+
+
+def _date_range(prefix: str, fecha_inicio: date | None, fecha_fin: date | None) -> Q:
+    q = Q()
+    if fecha_inicio:
+        q &= Q(**{f"{prefix}__gte": fecha_inicio})
+    if fecha_fin:
+        q &= Q(**{f"{prefix}__lte": fecha_fin})
+    return q
+
+
+def weight_gain(pesos: QuerySet, group_by: tuple[str, ...], period: Q) -> list[tuple]:
+    """Suma de ganancias por ``group_by`` (columnas entre lote, animal y mes).
+
+    ``pesos`` no debe filtrarse por fecha: el pesaje previo al período es el que
+    fija el punto de partida. El período se aplica en la consulta externa.
+    """
+    gains = pesos.order_by().annotate(
+        lote=F("animal__batch_id"),
+        mes=month_key("fecha"),
+        ganancia=F("peso")
+        - Window(Lag("peso"), partition_by=[F("animal_id")], order_by=F("fecha").asc()),
+        en_periodo=Case(When(period, then=Value(1)), default=Value(0), output_field=IntegerField())
+        if period
+        else Value(1),
+    ).values("animal_id", "lote", "mes", "ganancia", "en_periodo")
+    try:
+        inner, params = gains.query.sql_with_params()
+    except EmptyResultSet:
+        return []
+    columns = ", ".join(group_by)
+    sql = (
+        f"SELECT {columns}, SUM(ganancia) FROM ({inner}) AS pesajes "
+        f"WHERE en_periodo = 1 AND ganancia IS NOT NULL GROUP BY {columns}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+class MarginAnalytics:
+    def __init__(self, user, milk_tipo: str | None = None) -> None:
+        self.user = user
+        self.milk_tipo = milk_tipo or getattr(settings, "DASHBOARD_MILK_TIPO", "Leche")
+        self.prices = get_prices()
+
+    def compute(
+        self,
+        lotes: dict[int, str],
+        lote_id: int | None = None,
+        fecha_inicio: date | None = None,
+        fecha_fin: date | None = None,
+    ) -> dict[str, Any]:
+        lote_ids = [lote_id] if lote_id else list(lotes)
+        pesos = Peso.objects.filter(animal__batch_id__in=lote_ids)
+        costos = Cost.objects.filter(batch_id__in=lote_ids).filter(
+            _date_range("fecha", fecha_inicio, fecha_fin)
+        )
+        producciones = Produccion.objects.filter(
+            animal__batch_id__in=lote_ids, tipo__iexact=self.milk_tipo
+        ).filter(_date_range("fecha__date", fecha_inicio, fecha_fin))
+        period = _date_range("fecha__date", fecha_inicio, fecha_fin)
+
+        # (lote, mes) -> [gasto, kg, litros]
+        cells: dict[tuple[int, int], list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+        for row in (
+            costos.order_by()
+            .values("batch_id", mes=month_key("fecha"))
+            .annotate(total=Sum("monto"))
+        ):
+            cells[row["batch_id"], row["mes"]][0] += float(row["total"])
+        for lote, mes, kg in weight_gain(pesos, ("lote", "mes"), period):
+            cells[lote, mes][1] += float(kg)
+        for row in (
+            producciones.order_by()
+            .values(lote=F("animal__batch_id"), mes=month_key("fecha"))
+            .annotate(total=Sum("cantidad"))
+        ):
+            cells[row["lote"], row["mes"]][2] += float(row["total"])
+
+        by_lote: dict[int, list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+        by_month: dict[int, list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+        for (lote, mes), values in cells.items():
+            for index, value in enumerate(values):
+                by_lote[lote][index] += value
+                by_month[mes][index] += value
+        totals = [sum(values[index] for values in by_lote.values()) for index in range(3)]
+
+        months = sorted(by_month)
+        monthly = [metrics(*by_month[mes], self.prices) for mes in months]
+        labels = [month_from_key(mes).strftime("%b %Y") for mes in months]
+        return {
+            "kpis": metrics(*totals, self.prices),
+            "por_lote": sorted(
+                (
+                    {"nombre": lotes.get(lote, "Sin lote"), **metrics(*values, self.prices)}
+                    for lote, values in by_lote.items()
+                ),
+                key=lambda row: row["margen"],
+            ),
+            "por_animal": self._by_animal(
+                lote_id, pesos, producciones, period, fecha_inicio, fecha_fin
+            )
+            if lote_id
+            else [],
+            "charts": {
+                "costo_kg_mensual": {
+                    "labels": labels,
+                    "values": [row["costo_por_kg"] or 0 for row in monthly],
+                },
+                "margen_mensual": {"labels": labels, "values": [row["margen"] for row in monthly]},
+            },
+        }
+
+    def _by_animal(
+        self, lote_id, pesos, producciones, period, fecha_inicio, fecha_fin
+    ) -> list[dict]:
+        """Detalle por animal de un lote, con el gasto ya repartido por `CostAllocation`."""
+        animals: dict[int, list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+        allocations = CostAllocation.objects.filter(batch_id=lote_id).filter(
+            _date_range("fecha", fecha_inicio, fecha_fin)
+        )
+        gasto = allocations.order_by().values_list("animal_id").annotate(Sum("monto"))
+        for animal_id, total in gasto:
+            animals[animal_id][0] += float(total)
+        for animal_id, kg in weight_gain(pesos, ("animal_id",), period):
+            animals[animal_id][1] += float(kg)
+        litros = producciones.order_by().values_list("animal_id").annotate(Sum("cantidad"))
+        for animal_id, total in litros:
+            animals[animal_id][2] += float(total)
+
+        # Solo los animales que siguen en el lote
+        codes = dict(Animal.objects.filter(batch_id=lote_id).values_list("pk", "codigo"))
+        rows = [
+            {"codigo": codes[animal_id] or f"#{animal_id}", **metrics(*values, self.prices)}
+            for animal_id, values in animals.items()
+            if animal_id in codes
+        ]
+        return sorted(rows, key=lambda row: row["margen"])
+
+
+def lote_versions(lote_ids) -> dict[int, int]:
+    """Versión de caché de cada lote; un lote sin versión recibe una nueva."""
+    keys = {f"{CACHE_PREFIX}:lote:{pk}": pk for pk in lote_ids}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    for key, version in missing.items():
+        cache.add(key, version, None)
+    versions.update(cache.get_many(missing) if missing else {})
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_lote(lote_id: int | None) -> None:
+    if lote_id is not None:
+        cache.set(f"{CACHE_PREFIX}:lote:{lote_id}", time.time_ns(), None)
+
+
+def get_margin_stats(
+    user,
+    lotes: dict[int, str],
+    lote_id: int | None = None,
+    fecha_inicio: date | None = None,
+    fecha_fin: date | None = None,
+) -> dict[str, Any]:
+    """`MarginAnalytics.compute` con caché; ``lotes`` son los lotes visibles del usuario."""
+    if lote_id and lote_id not in lotes:
+        lote_id = None
+    versions = sorted(lote_versions([lote_id] if lote_id else lotes).items())
+    raw_key = repr((user.pk, lote_id, fecha_inicio, fecha_fin, get_prices(), versions))
+    key = f"{CACHE_PREFIX}:{hashlib.sha1(raw_key.encode()).hexdigest()}"
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = MarginAnalytics(user).compute(lotes, lote_id, fecha_inicio, fecha_fin)
+        cache.set(key, stats, getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 600))
+    return stats
@@ -0,0 +1,165 @@
+"""Cohortes de nacimiento: matriz cohorte × edad en meses de peso, producción y costo.
+
+Cada animal guarda su cohorte (`Animal.cohorte`, mes de nacimiento como
+``año * 12 + mes - 1``) con índice, así que agrupar por cohorte es agrupar por
+un entero en vez de extraer año y mes del nacimiento en cada fila del join. La
+edad de un registro es su mes (`analytics.month_key`) menos la cohorte.
+
+Cada métrica sale de una sola consulta agregada por (cohorte, edad):
+
+- ``peso``: peso promedio de los pesajes.
+- ``ganancia``: diferencia entre columnas consecutivas de ``peso``.
+- ``produccion`` y ``costo``: total del mes dividido entre los animales de la
+  cohorte, con el costo ya repartido por `CostAllocation`.
+
+El resultado se guarda en caché por usuario con la misma versión por lote que
+usa la pestaña de rentabilidad, de modo que las mismas señales lo invalidan.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Sum
+
+from animals.models import Animal
+from costs.models import CostAllocation
+from tracking.models import Peso, Produccion
+
+from .analytics import lote_versions, month_from_key, month_key
+
+CACHE_PREFIX = "dashboard:cohortes"
+GRANULARIDADES = {"mes": 1, "trimestre": 3}
+METRICAS = {
+    "peso": "Peso promedio (kg)",
+    "ganancia": "Ganancia mensual (kg)",
+    "produccion": "Producción por animal",
+    "costo": "Costo por animal ($)",
+}
+
+
+def get_max_age() -> int:
+    return int(getattr(settings, "DASHBOARD_COHORT_MAX_AGE", 36))
+
+
+def cohort_label(key: int, granularidad: str) -> str:
+    if granularidad == "trimestre":
+        return f"T{key % 4 + 1} {key // 4}"
+    return month_from_key(key).strftime("%b %Y")
+
+
+class CohortReport:
+    def __init__(self, user, granularidad: str = "mes", max_age: int | None = None) -> None:
+        self.user = user
+        self.granularidad = granularidad if granularidad in GRANULARIDADES else "mes"
+        self.max_age = get_max_age() if max_age is None else max_age
+
+    def _cohort(self, prefix: str = ""):
+        """Cohorte del animal (o del animal de un registro) según la granularidad."""
+        cohort = F(f"{prefix}cohorte")
+        size = GRANULARIDADES[self.granularidad]
+        return cohort / size if size > 1 else cohort
+
+    def _by_age(self, queryset, aggregate) -> dict[tuple[int, int], float]:
+        rows = (
+            queryset.annotate(edad=month_key("fecha") - F("animal__cohorte"))
+            .filter(edad__gte=0, edad__lte=self.max_age)
+            .order_by()
+            .values("edad", clave=self._cohort("animal__"))
+            .annotate(valor=aggregate)
+        )
+        return {
+            (row["clave"], row["edad"]): float(row["valor"])
+            for row in rows
+            if row["valor"] is not None
+        }
+
+    def compute(self, lote_ids: list[int]) -> dict[str, Any]:
+        animals = Animal.objects.filter(batch_id__in=lote_ids)
+        sizes = dict(
+            animals.order_by()
+            .values(clave=self._cohort())
+            .annotate(animales=Count("pk"))
+            .values_list("clave", "animales")
+        )
+        records = {"animal__batch_id__in": lote_ids}
+        pesos = self._by_age(Peso.objects.filter(**records), Avg("peso"))
+        produccion = self._by_age(Produccion.objects.filter(**records), Sum("cantidad"))
+        costos = self._by_age(CostAllocation.objects.filter(**records), Sum("monto"))
+
+        cohorts = sorted(sizes)
+        oldest = max((age for cells in (pesos, produccion, costos) for _, age in cells), default=0)
+        ages = list(range(oldest + 1))
+
+        def matrix(cells: dict[tuple[int, int], float], per_animal: bool = False) -> list[list]:
+            return [
+                [
+                    round(cells[cohort, age] / (sizes[cohort] if per_animal else 1), 2)
+                    if (cohort, age) in cells
+                    else None
+                    for age in ages
+                ]
+                for cohort in cohorts
+            ]
+
+        peso = matrix(pesos)
+        ganancia = [
+            [None] + [
+                None if current is None or previous is None else round(current - previous, 2)
+                for previous, current in zip(row[:-1], row[1:], strict=True)
+            ]
+            for row in peso
+        ]
+        return {
+            "granularidad": self.granularidad,
+            "edades": ages,
+            "cohortes": [
+                {
+                    "clave": cohort,
+                    "nombre": cohort_label(cohort, self.granularidad),
+                    "animales": sizes[cohort],
+                }
+                for cohort in cohorts
+            ],
+            "metricas": {
+                "peso": peso,
+                "ganancia": ganancia,
+                "produccion": matrix(produccion, per_animal=True),
+                "costo": matrix(costos, per_animal=True),
+            },
+        }
+
+
+def get_cohort_stats(
+    user, lotes: dict[int, str], lote_id: int | None = None, granularidad: str = "mes"
+) -> dict[str, Any]:
+    """`CohortReport.compute` con caché por usuario; ``lotes`` son sus lotes visibles."""
+    lote_ids = [lote_id] if lote_id in lotes else list(lotes)
+    report = CohortReport(user, granularidad)
+    versions = sorted(lote_versions(lote_ids).items())
+    raw_key = repr((user.pk, lote_ids, report.granularidad, report.max_age, versions))
+    key = f"{CACHE_PREFIX}:{hashlib.sha1(raw_key.encode()).hexdigest()}"
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = report.compute(lote_ids)
+        cache.set(key, stats, getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 600))
+    return stats
+
+
+def heat_rows(stats: dict[str, Any], metrica: str) -> list[dict[str, Any]]:
+    """Filas de la matriz de ``metrica`` con la intensidad (0-1) de cada celda."""
+    matrix = stats["metricas"][metrica]
+    values = [abs(value) for row in matrix for value in row if value is not None]
+    top = max(values, default=0) or 1
+    return [
+        {
+            **cohort,
+            "celdas": [
+                (value, 0 if value is None else round(abs(value) / top, 2)) for value in row
+            ],
+        }
+        for cohort, row in zip(stats["cohortes"], matrix, strict=True)
+    ]
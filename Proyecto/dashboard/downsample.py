@@ -0,0 +1,61 @@
+"""Reducción de series para las gráficas con LTTB (largest-triangle-three-buckets).
+
+Con granularidad diaria un animal puede acumular miles de puntos; Chart.js se
+vuelve lento mucho antes de que la gráfica gane detalle. LTTB conserva el
+primer y el último punto y, de cada cubeta intermedia, el que forma el
+triángulo de mayor área con el punto ya elegido y el promedio de la cubeta
+siguiente, así que picos y caídas sobreviven a la reducción.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+from django.conf import settings
+
+MIN_POINTS = 20
+MAX_POINTS = 2000
+
+
+def get_point_budget(requested: str | int | None = None) -> int:
+    """Puntos por serie: el pedido por el cliente (ancho del canvas) o el de settings, acotado."""
+    try:
+        budget = int(requested)
+    except (TypeError, ValueError):
+        budget = int(getattr(settings, "DASHBOARD_CHART_POINTS", 400))
+    return min(max(budget, MIN_POINTS), MAX_POINTS)
+
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> np.ndarray:
+    """Índices de los ``threshold`` puntos que LTTB conserva, en orden."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    every = (count - 2) / (threshold - 2)
+    edges = np.append((np.arange(threshold - 1) * every).astype(int) + 1, count)
+    edges[-2] = count - 1  # la última cubeta intermedia termina antes del último punto
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, count - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        area = np.abs(
+            (x[anchor] - next_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (next_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def downsample(labels: list[str], x: Sequence[float], values: list[float], threshold: int):
+    """Aplica LTTB a una serie de la gráfica; retorna etiquetas y valores reducidos."""
+    if len(values) <= threshold:
+        return labels, values
+    keep = lttb(x, values, threshold)
+    return [labels[index] for index in keep], [values[index] for index in keep]
@@ -0,0 +1,103 @@
+"""Comparación de KPIs contra el periodo anterior y el mismo periodo del año pasado.
+
+Los tres periodos salen de un solo recorrido por modelo: la consulta se limita
+a la unión de los tres rangos y cada agregado lleva su propio ``filter=Q(...)``,
+que Django traduce a ``FILTER (WHERE ...)`` en PostgreSQL y a ``CASE WHEN`` en
+SQLite. Sin fecha de inicio no hay periodo que comparar y los KPIs se calculan
+como siempre sobre todo el rango filtrado.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+from django.db.models import Aggregate, Q, QuerySet
+
+PERIODOS = ("actual", "anterior", "anio_anterior")
+
+
+def _shift_year(value: date) -> date:
+    try:
+        return value.replace(year=value.year - 1)
+    except ValueError:  # 29 de febrero
+        return value.replace(year=value.year - 1, day=28)
+
+
+def comparison_periods(inicio: date, fin: date) -> dict[str, tuple[date, date]]:
+    """Rango actual, el de igual duración inmediatamente anterior y el del año pasado."""
+    length = fin - inicio + timedelta(days=1)
+    return {
+        "actual": (inicio, fin),
+        "anterior": (inicio - length, inicio - timedelta(days=1)),
+        "anio_anterior": (_shift_year(inicio), _shift_year(fin)),
+    }
+
+
+def _range_q(field: str, inicio: date | None, fin: date | None) -> Q:
+    q = Q()
+    if inicio:
+        q &= Q(**{f"{field}__gte": inicio})
+    if fin:
+        q &= Q(**{f"{field}__lte": fin})
+    return q
+
+
+def aggregate_periods(
+    queryset: QuerySet,
+    field: str,
+    aggregates: dict[str, tuple[type[Aggregate], str]],
+    inicio: date | None,
+    fin: date | None,
+    today: date,
+) -> dict[str, dict[str, Any]]:
+    """Agregados ``{nombre: (Clase, campo)}`` por periodo en una sola consulta.
+
+    Retorna ``{periodo: {nombre: valor}}``; solo ``actual`` si no hay fecha de inicio.
+    """
+    if not inicio:
+        values = queryset.filter(_range_q(field, None, fin)).aggregate(
+            **{name: function(source) for name, (function, source) in aggregates.items()}
+        )
+        return {"actual": values}
+
+    bounds = comparison_periods(inicio, fin or today)
+    bounds["actual"] = (inicio, fin)  # el rango actual queda tal cual lo filtró el usuario
+    periods = {periodo: _range_q(field, *rango) for periodo, rango in bounds.items()}
+    combined = Q()
+    for q in periods.values():
+        combined |= q
+    values = queryset.filter(combined).aggregate(**{
+        f"{periodo}_{name}": function(source, filter=q)
+        for periodo, q in periods.items()
+        for name, (function, source) in aggregates.items()
+    })
+    return {
+        periodo: {name: values[f"{periodo}_{name}"] for name in aggregates}
+        for periodo in periods
+    }
+
+
+def _change(actual: float, previous: float) -> tuple[float, float | None]:
+    delta = round(actual - previous, 2)
+    return delta, round(delta / previous * 100, 1) if previous else None
+
+
+def compare(por_periodo: dict[str, dict[str, float]]) -> dict[str, dict[str, float | None]]:
+    """Delta y variación porcentual de cada KPI de ``actual`` frente a los otros periodos."""
+    if "anterior" not in por_periodo:
+        return {}
+    result = {}
+    for name, actual in por_periodo["actual"].items():
+        anterior = por_periodo["anterior"][name]
+        anio_anterior = por_periodo["anio_anterior"][name]
+        delta, pct = _change(actual, anterior)
+        delta_anual, pct_anual = _change(actual, anio_anterior)
+        result[name] = {
+            "anterior": anterior,
+            "delta": delta,
+            "pct": pct,
+            "anio_anterior": anio_anterior,
+            "delta_anual": delta_anual,
+            "pct_anual": pct_anual,
+        }
+    return result
@@ -1,20 +1,39 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
 from datetime import date
 from typing import Any
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Avg, Count, Sum
-from django.db.models.functions import TruncMonth
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
 
 from animals.models import Animal
 from batches.models import Batch
 from costs.models import Cost
 from tracking.models import Peso, Produccion
+from tracking.timeseries import herd_adg
+
+from .analytics import lote_versions
+from .downsample import downsample, get_point_budget
+from .periods import aggregate_periods, compare
 
 User = get_user_model()
 
+# Granularidad de las series temporales: función de truncado y formato de etiqueta
+# granularidad -> (truncado, formato de etiqueta, nombre en el selector)
+GRANULARIDADES = {
+    "dia": (TruncDay, "%d %b %Y", "Diaria"),
+    "semana": (TruncWeek, "%d %b %Y", "Semanal"),
+    "mes": (TruncMonth, "%b %Y", "Mensual"),
+}
+GRANULARIDAD_DEFAULT = "mes"
+ADG_CACHE_PREFIX = "dashboard:gdp"
+
 
 @dataclass
 class ChartData:
@@ -36,7 +55,7 @@ class DashboardStatsService:
         orden: str | None = None,
     ) -> dict[str, Any]:
         batches = Batch.objects.by_user(self.user)
-        animals = Animal.objects.filter(batch__usuario=self.user)
+        animals = Animal.objects.filter(batch__usuario=self.user, batch__is_active=True)
 
         if lote_id:
             animals = animals.filter(batch_id=lote_id)
@@ -101,9 +120,20 @@ class DashboardStatsService:
         tipo_produccion: str | None = None,
         fecha_inicio: date | None = None,
         fecha_fin: date | None = None,
+        excluir_anomalias: bool | None = None,
+        granularidad: str = GRANULARIDAD_DEFAULT,
+        puntos: int | None = None,
     ) -> dict[str, Any]:
-        pesos = Peso.objects.filter(animal__batch__usuario=self.user)
-        producciones = Produccion.objects.filter(animal__batch__usuario=self.user)
+        pesos = Peso.objects.filter(
+            animal__batch__usuario=self.user, animal__batch__is_active=True
+        )
+        if excluir_anomalias is None:
+            excluir_anomalias = getattr(settings, "DASHBOARD_EXCLUDE_ANOMALIES", True)
+        if excluir_anomalias:
+            pesos = pesos.filter(anomalia__isnull=True)
+        producciones = Produccion.objects.filter(
+            animal__batch__usuario=self.user, animal__batch__is_active=True
+        )
 
         if lote_id:
             pesos = pesos.filter(animal__batch_id=lote_id)
@@ -116,6 +146,22 @@ class DashboardStatsService:
         if tipo_produccion:
             producciones = producciones.filter(tipo__icontains=tipo_produccion)
 
+        today = timezone.localdate()
+        kpis_pesos = aggregate_periods(
+            pesos, "fecha", {"total_pesos": (Count, "pk"), "peso_promedio": (Avg, "peso")},
+            fecha_inicio, fecha_fin, today,
+        )
+        kpis_producciones = aggregate_periods(
+            producciones,
+            "fecha",
+            {"total_producciones": (Count, "pk"), "produccion_total": (Sum, "cantidad")},
+            fecha_inicio, fecha_fin, today,
+        )
+        por_periodo = {
+            periodo: self._clean_kpis({**values, **kpis_producciones[periodo]})
+            for periodo, values in kpis_pesos.items()
+        }
+
         if fecha_inicio:
             pesos = pesos.filter(fecha__gte=fecha_inicio)
             producciones = producciones.filter(fecha__gte=fecha_inicio)
@@ -124,59 +170,117 @@ class DashboardStatsService:
             pesos = pesos.filter(fecha__lte=fecha_fin)
             producciones = producciones.filter(fecha__lte=fecha_fin)
 
-        total_pesos = pesos.count()
-        total_producciones = producciones.count()
-        peso_promedio = pesos.aggregate(avg=Avg("peso"))["avg"] or 0
-        produccion_total = producciones.aggregate(sum=Sum("cantidad"))["sum"] or 0
-
+        trunc, _, _ = GRANULARIDADES.get(granularidad, GRANULARIDADES[GRANULARIDAD_DEFAULT])
         pesos_mensuales = list(
-            pesos.annotate(mes=TruncMonth("fecha"))
+            pesos.annotate(mes=trunc("fecha"))
             .values("mes")
             .annotate(promedio=Avg("peso"))
             .order_by("mes")
         )
 
         producciones_mensuales = list(
-            producciones.annotate(mes=TruncMonth("fecha"))
+            producciones.annotate(mes=trunc("fecha"))
             .values("mes")
             .annotate(total=Sum("cantidad"))
             .order_by("mes")
         )
 
-        chart_pesos = ChartData(
-            labels=[item["mes"].strftime("%b %Y") if item["mes"] else "" for item in pesos_mensuales],
-            values=[round(float(item["promedio"]), 2) for item in pesos_mensuales],
+        lotes_disponibles = list(Batch.objects.by_user(self.user).values("id", "nombre"))
+        lote_ids = [lote["id"] for lote in lotes_disponibles if str(lote["id"]) == lote_id]
+        adg = self._herd_adg(
+            pesos,
+            lote_ids if lote_id else [lote["id"] for lote in lotes_disponibles],
+            (lote_id, animal_id, fecha_inicio, fecha_fin, excluir_anomalias),
         )
-
-        chart_producciones = ChartData(
-            labels=[item["mes"].strftime("%b %Y") if item["mes"] else "" for item in producciones_mensuales],
-            values=[round(float(item["total"]), 2) for item in producciones_mensuales],
+        animales_disponibles = list(
+            Animal.objects.filter(batch__usuario=self.user, batch__is_active=True)
+            .values("id", "codigo", "especie", "batch__nombre")
         )
 
+        chart_pesos = self._time_chart(pesos_mensuales, "promedio", granularidad, puntos)
+        chart_producciones = self._time_chart(producciones_mensuales, "total", granularidad, puntos)
+
         return {
             "kpis": {
-                "total_pesos": total_pesos,
-                "total_producciones": total_producciones,
-                "peso_promedio": round(float(peso_promedio), 2),
-                "produccion_total": round(float(produccion_total), 2),
+                **por_periodo["actual"],
+                "gdp_30": adg["gdp_30"],
+                "gdp_90": adg["gdp_90"],
+                "comparacion": compare(por_periodo),
             },
             "charts": {
                 "pesos_mensuales": chart_pesos.to_dict(),
                 "producciones_mensuales": chart_producciones.to_dict(),
             },
-            "lotes_disponibles": list(Batch.objects.by_user(self.user).values("id", "nombre")),
-            "animales_disponibles": list(
-                Animal.objects.filter(batch__usuario=self.user)
-                .values("id", "codigo", "especie", "batch__nombre")
-            ),
+            "gdp_ranking": self._rank_adg(adg["rows"], animales_disponibles),
+            "lotes_disponibles": lotes_disponibles,
+            "animales_disponibles": animales_disponibles,
         }
 
+    def _herd_adg(self, pesos, lote_ids: list[int], filtros: tuple) -> dict[str, Any]:
+        """GDP del hato con caché; la clave lleva la versión de cada lote, como la rentabilidad.
+
+        `herd_adg` trae toda la historia de pesajes a memoria, así que solo se
+        recalcula cuando las señales renuevan la versión de alguno de los lotes.
+        """
+        versions = sorted(lote_versions(lote_ids).items())
+        raw_key = repr((self.user.pk, filtros, versions))
+        key = f"{ADG_CACHE_PREFIX}:{hashlib.sha1(raw_key.encode()).hexdigest()}"
+
+        adg = cache.get(key)
+        if adg is None:
+            summary = herd_adg(pesos)
+            adg = {
+                "gdp_30": summary.median(30),
+                "gdp_90": summary.median(90),
+                "rows": summary.to_rows(),
+            }
+            cache.set(key, adg, getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 600))
+        return adg
+
+    @staticmethod
+    def _clean_kpis(values: dict[str, Any]) -> dict[str, int | float]:
+        """Conteos como enteros y el resto como float a dos decimales (0 si no hay datos)."""
+        return {
+            name: value if isinstance(value, int) else round(float(value or 0), 2)
+            for name, value in values.items()
+        }
+
+    @staticmethod
+    def _time_chart(
+        rows: list[dict[str, Any]], value_key: str, granularidad: str, puntos: int | None = None
+    ) -> ChartData:
+        """Serie por periodo (clave ``mes``) reducida con LTTB al presupuesto de puntos."""
+        _, label_format, _ = GRANULARIDADES.get(granularidad, GRANULARIDADES[GRANULARIDAD_DEFAULT])
+        rows = [item for item in rows if item["mes"]]
+        labels = [item["mes"].strftime(label_format) for item in rows]
+        values = [round(float(item[value_key]), 2) for item in rows]
+        x = [item["mes"].toordinal() for item in rows]
+        labels, values = downsample(labels, x, values, get_point_budget(puntos))
+        return ChartData(labels=labels, values=values)
+
+    @staticmethod
+    def _rank_adg(
+        rows: list[dict[str, Any]], animales: list[dict[str, Any]], size: int = 5
+    ) -> dict[str, Any]:
+        """Animales con mejor y peor GDP a 90 días según su percentil en el hato."""
+        codes = {animal["id"]: animal["codigo"] or animal["especie"] for animal in animales}
+        ranked = sorted(
+            (row for row in rows if row["percentil"] is not None),
+            key=lambda row: row["percentil"],
+            reverse=True,
+        )
+        for row in ranked:
+            row["codigo"] = codes.get(row["animal_id"], f"#{row['animal_id']}")
+        return {"mejores": ranked[:size], "peores": ranked[size:][-size:][::-1]}
+
     def get_costos_stats(
         self,
         lote_id: str | None = None,
         tipo_costo: str | None = None,
         fecha_inicio: date | None = None,
         fecha_fin: date | None = None,
+        granularidad: str = GRANULARIDAD_DEFAULT,
+        puntos: int | None = None,
     ) -> dict[str, Any]:
         costos = Cost.objects.for_user(self.user)
 
@@ -186,15 +290,23 @@ class DashboardStatsService:
         if tipo_costo:
             costos = costos.filter(tipo=tipo_costo)
 
+        por_periodo = aggregate_periods(
+            costos, "fecha", {"total_registros": (Count, "pk"), "gasto_total": (Sum, "monto")},
+            fecha_inicio, fecha_fin, timezone.localdate(),
+        )
+        for periodo, values in por_periodo.items():
+            values = por_periodo[periodo] = self._clean_kpis(values)
+            registros = values["total_registros"]
+            values["promedio_por_registro"] = (
+                round(values["gasto_total"] / registros, 2) if registros else 0
+            )
+
         if fecha_inicio:
             costos = costos.filter(fecha__gte=fecha_inicio)
 
         if fecha_fin:
             costos = costos.filter(fecha__lte=fecha_fin)
 
-        total_registros = costos.count()
-        gasto_total = costos.aggregate(sum=Sum("monto"))["sum"] or 0
-
         costos_por_tipo = list(
             costos.values("tipo")
             .annotate(total=Sum("monto"))
@@ -207,8 +319,9 @@ class DashboardStatsService:
             .order_by("-total")
         )
 
+        trunc, _, _ = GRANULARIDADES.get(granularidad, GRANULARIDADES[GRANULARIDAD_DEFAULT])
         costos_mensuales = list(
-            costos.annotate(mes=TruncMonth("fecha"))
+            costos.annotate(mes=trunc("fecha"))
             .values("mes")
             .annotate(total=Sum("monto"))
             .order_by("mes")
@@ -224,24 +337,19 @@ class DashboardStatsService:
             values=[round(float(item["total"]), 2) for item in costos_por_lote],
         )
 
-        chart_mensual = ChartData(
-            labels=[item["mes"].strftime("%b %Y") if item["mes"] else "" for item in costos_mensuales],
-            values=[round(float(item["total"]), 2) for item in costos_mensuales],
-        )
+        chart_mensual = self._time_chart(costos_mensuales, "total", granularidad, puntos)
 
         return {
-            "kpis": {
-                "total_registros": total_registros,
-                "gasto_total": round(float(gasto_total), 2),
-                "promedio_por_registro": round(float(gasto_total) / total_registros, 2) if total_registros else 0,
-            },
+            "kpis": {**por_periodo["actual"], "comparacion": compare(por_periodo)},
             "charts": {
                 "por_tipo": chart_por_tipo.to_dict(),
                 "por_lote": chart_por_lote.to_dict(),
                 "mensual": chart_mensual.to_dict(),
             },
             "lotes_disponibles": list(Batch.objects.by_user(self.user).values("id", "nombre")),
-            "tipos_disponibles": [(str(value), str(label)) for value, label in Cost.CostType.choices],
+            "tipos_disponibles": [
+                (str(value), str(label)) for value, label in Cost.CostType.choices
+            ],
         }
 
     @staticmethod
@@ -0,0 +1,56 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from animals.models import Animal
+from costs.models import Cost
+from costs.signals import costs_bulk_created
+from tracking.models import Peso, Produccion
+
+from .analytics import invalidate_lote
+
+
+def invalidate_on_commit(lote_id: int | None) -> None:
+    # Al confirmar, después del recálculo del reparto que registró costs.signals
+    transaction.on_commit(partial(invalidate_lote, lote_id))
+
+
+@receiver(post_save, sender=Cost)
+@receiver(post_delete, sender=Cost)
+def invalidate_cost_lote(sender, instance: Cost, raw=False, **kwargs):
+    if not raw:
+        invalidate_on_commit(instance.batch_id)
+
+
+@receiver(costs_bulk_created, sender=Cost)
+def invalidate_bulk_cost_lotes(sender, batch_ids, **kwargs):
+    for batch_id in batch_ids:
+        invalidate_on_commit(batch_id)
+
+
+@receiver(post_save, sender=Peso)
+@receiver(post_delete, sender=Peso)
+@receiver(post_save, sender=Produccion)
+@receiver(post_delete, sender=Produccion)
+def invalidate_record_lote(sender, instance, raw=False, origin=None, **kwargs):
+    # En un borrado en cascada ya invalida el receptor del animal o el lote
+    if raw or (origin is not None and origin is not instance):
+        return
+    # El formulario deja el animal cargado; si no, es una consulta
+    invalidate_on_commit(instance.animal.batch_id)
+
+
+@receiver(pre_save, sender=Animal)
+def invalidate_previous_lote(sender, instance: Animal, raw=False, **kwargs):
+    previous = getattr(instance, "_loaded_values", None)
+    if not raw and previous and previous["batch_id"] != instance.batch_id:
+        invalidate_on_commit(previous["batch_id"])
+
+
+@receiver(post_save, sender=Animal)
+@receiver(post_delete, sender=Animal)
+def invalidate_animal_lote(sender, instance: Animal, raw=False, **kwargs):
+    if not raw:
+        invalidate_on_commit(instance.batch_id)
@@ -1,4 +1,10 @@
 document.addEventListener("DOMContentLoaded", function () {
+    // Presupuesto de puntos para las series temporales: uno cada 2 px del contenedor
+    document.querySelectorAll("[data-chart-points]").forEach(function (input) {
+        const container = document.querySelector(".dashboard-chart-card") || document.body;
+        input.value = Math.round(container.clientWidth / 2) || "";
+    });
+
     const dataElement = document.getElementById("charts-data");
     if (!dataElement) return;
 
@@ -134,8 +140,8 @@ document.addEventListener("DOMContentLoaded", function () {
                     borderColor: colors.primary,
                     backgroundColor: colors.primaryLight,
                     fill: true,
-                    tension: 0.4,
-                    pointRadius: 4,
+                    tension: data.values.length > 60 ? 0 : 0.4,
+                    pointRadius: data.values.length > 60 ? 0 : 4,
                     pointBackgroundColor: colors.primary,
                 }],
             },
@@ -183,6 +189,14 @@ document.addEventListener("DOMContentLoaded", function () {
         createBarChart("chart-por-lote-costos", chartsData.por_lote, "Gastos");
     }
     if (chartsData.mensual) {
-        createLineChart("chart-mensual", chartsData.mensual, "Gasto mensual ($)");
+        createLineChart("chart-mensual", chartsData.mensual, "Gasto ($)");
+    }
+
+    // Gráficas de Rentabilidad
+    if (chartsData.costo_kg_mensual) {
+        createLineChart("chart-costo-kg-mensual", chartsData.costo_kg_mensual, "Costo por kg ganado ($)");
+    }
+    if (chartsData.margen_mensual) {
+        createBarChart("chart-margen-mensual", chartsData.margen_mensual, "Margen ($)");
     }
 });
\ No newline at end of file
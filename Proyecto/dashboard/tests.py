@@ -1,2 +1,370 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from animals.models import Animal
+from batches.models import Batch
+from core.budgets import cache_tables
+from costs.allocation import allocate_batch
+from costs.models import Cost, RecurringCost
+from costs.recurring import materialize_recurring_costs
+from tracking.models import Peso, Produccion
+from tracking.timeseries import herd_adg
+
+from .analytics import MarginAnalytics, get_margin_stats
+from .cohorts import get_cohort_stats
+from .downsample import get_point_budget, lttb
+from .periods import aggregate_periods
+from .services import GRANULARIDADES, DashboardStatsService
+
+User = get_user_model()
+
+
+def at(year, month, day):
+    return timezone.make_aware(datetime(year, month, day, 8, 0))
+
+
+def data_queries(queries):
+    """Consultas capturadas fuera de la tabla de la caché."""
+    return [query["sql"] for query in queries if not any(t in query["sql"] for t in cache_tables())]
+
+
+@override_settings(DASHBOARD_PRICE_PER_KG=10000, DASHBOARD_PRICE_PER_LITER=2000)
+class MarginAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="testpass")
+        self.batch = Batch.objects.create(usuario=self.user, nombre="Lechería")
+        self.other_batch = Batch.objects.create(usuario=self.user, nombre="Ceba")
+        self.vaca = Animal.objects.create(
+            batch=self.batch, codigo="V-01", especie="Vaca", sexo="F",
+            fecha_de_nacimiento=date(2020, 1, 1),
+        )
+        self.novilla = Animal.objects.create(
+            batch=self.batch, codigo="V-02", especie="Vaca", sexo="F",
+            fecha_de_nacimiento=date(2022, 1, 1),
+        )
+        for fecha, peso in [(at(2024, 1, 20), 400), (at(2024, 2, 5), 410), (at(2024, 2, 25), 430)]:
+            Peso.objects.create(animal=self.vaca, fecha=fecha, peso=Decimal(peso))
+        for fecha, peso in [(at(2024, 2, 10), 250), (at(2024, 3, 10), 270)]:
+            Peso.objects.create(animal=self.novilla, fecha=fecha, peso=Decimal(peso))
+        for tipo, cantidad in [("Leche", "300"), ("Carne", "5")]:
+            Produccion.objects.create(
+                animal=self.vaca, fecha=at(2024, 2, 15), tipo=tipo, cantidad=Decimal(cantidad)
+            )
+        for concepto, monto, fecha in [
+            ("Concentrado", "900000", date(2024, 2, 1)),
+            ("Sal", "100000", date(2024, 3, 1)),
+        ]:
+            Cost.objects.create(
+                batch=self.batch, concepto=concepto, monto=Decimal(monto), fecha=fecha
+            )
+        self.lotes = {
+            self.batch.pk: self.batch.nombre,
+            self.other_batch.pk: self.other_batch.nombre,
+        }
+
+    def test_gain_in_period_starts_from_the_previous_weighing(self):
+        stats = MarginAnalytics(self.user).compute(
+            self.lotes, fecha_inicio=date(2024, 2, 1), fecha_fin=date(2024, 2, 29)
+        )
+
+        # Vaca: 430 - 400 (el pesaje de enero es el punto de partida); novilla: sin anterior
+        self.assertEqual(stats["kpis"]["kg"], 30)
+        self.assertEqual(stats["kpis"]["gasto"], 900000)
+        self.assertEqual(stats["kpis"]["litros"], 300)
+        self.assertEqual(stats["kpis"]["costo_por_kg"], 30000)
+        self.assertEqual(stats["kpis"]["costo_por_litro"], 3000)
+        self.assertEqual(stats["kpis"]["margen"], 30 * 10000 + 300 * 2000 - 900000)
+
+    def test_monthly_series_and_batch_rows(self):
+        stats = MarginAnalytics(self.user).compute(self.lotes)
+
+        self.assertEqual(stats["charts"]["margen_mensual"]["labels"], ["Feb 2024", "Mar 2024"])
+        self.assertEqual(stats["charts"]["costo_kg_mensual"]["values"], [30000, 5000])
+        self.assertEqual([row["nombre"] for row in stats["por_lote"]], ["Lechería"])
+        self.assertEqual(stats["por_animal"], [])
+
+    def test_animal_rows_use_allocated_costs(self):
+        allocate_batch(self.batch.pk, driver="equal")
+
+        stats = MarginAnalytics(self.user).compute(self.lotes, lote_id=self.batch.pk)
+
+        rows = {row["codigo"]: row for row in stats["por_animal"]}
+        self.assertEqual(rows["V-01"]["gasto"], 500000)
+        self.assertEqual(rows["V-01"]["kg"], 30)
+        self.assertEqual(rows["V-02"]["kg"], 20)
+        self.assertEqual(rows["V-02"]["costo_por_kg"], 25000)
+
+    def test_results_are_cached_until_a_lote_changes(self):
+        first = get_margin_stats(self.user, self.lotes)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(get_margin_stats(self.user, self.lotes), first)
+        self.assertEqual(data_queries(queries), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Peso.objects.create(animal=self.novilla, fecha=at(2024, 4, 10), peso=Decimal("290"))
+
+        kpis = get_margin_stats(self.user, self.lotes)["kpis"]
+        self.assertEqual(kpis["kg"], first["kpis"]["kg"] + 20)
+
+    def test_bulk_created_costs_invalidate_their_lote(self):
+        first = get_margin_stats(self.user, self.lotes)
+        RecurringCost.objects.create(
+            batch=self.batch,
+            tipo=Cost.CostType.FEED,
+            concepto="Heno",
+            monto=Decimal("50000"),
+            start_date=date(2024, 3, 15),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            materialize_recurring_costs(date(2024, 3, 20))
+
+        self.assertEqual(
+            get_margin_stats(self.user, self.lotes)["kpis"]["gasto"], first["kpis"]["gasto"] + 50000
+        )
+
+    def test_view_ignores_foreign_lotes(self):
+        intruder = User.objects.create_user(username="intruder", password="testpass")
+        self.client.force_login(intruder)
+
+        response = self.client.get(reverse("dashboard:rentabilidad"), {"lote": self.batch.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["por_lote"], [])
+        self.assertEqual(response.context["kpis"]["gasto"], 0)
+
+
+class ChartDownsamplingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="testpass")
+        self.batch = Batch.objects.create(usuario=self.user, nombre="Ceba")
+        self.animal = Animal.objects.create(
+            batch=self.batch, codigo="C-01", especie="Vaca", sexo="M",
+            fecha_de_nacimiento=date(2020, 1, 1),
+        )
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        x = numpy.arange(1000)
+        y = numpy.sin(x / 50.0)
+        y[500] = 10
+
+        keep = lttb(x, y, 50)
+
+        self.assertEqual(len(keep), 50)
+        self.assertEqual((keep[0], keep[-1]), (0, 999))
+        self.assertIn(500, keep)
+        self.assertTrue((numpy.diff(keep) > 0).all())
+        self.assertEqual(list(lttb(x[:10], y[:10], 50)), list(range(10)))
+
+    def test_point_budget_is_clamped(self):
+        self.assertEqual(get_point_budget("5"), 20)
+        self.assertEqual(get_point_budget("999999"), 2000)
+        with self.settings(DASHBOARD_CHART_POINTS=300):
+            self.assertEqual(get_point_budget("abc"), 300)
+
+    def test_daily_granularity_is_downsampled(self):
+        start = at(2020, 1, 1)
+        Peso.objects.bulk_create(
+            Peso(
+                animal=self.animal, fecha=start + timedelta(days=day), peso=Decimal(200 + day // 10)
+            )
+            for day in range(900)
+        )
+        service = DashboardStatsService(self.user)
+
+        daily = service.get_tracking_stats(granularidad="dia", puntos=100)
+        daily = daily["charts"]["pesos_mensuales"]
+        monthly = service.get_tracking_stats()["charts"]["pesos_mensuales"]
+
+        self.assertEqual(len(daily["values"]), 100)
+        self.assertEqual(daily["labels"][0], "01 Jan 2020")
+        self.assertEqual(daily["values"][-1], 289)
+        self.assertEqual(len(monthly["values"]), 30)
+
+    def test_cost_view_accepts_granularity(self):
+        for monto, day in [("1000", 6), ("500", 7)]:
+            Cost.objects.create(
+                batch=self.batch, concepto="Sal", monto=Decimal(monto), fecha=date(2024, 3, day)
+            )
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse("dashboard:costos"), {"granularidad": "semana", "puntos": "300"}
+        )
+
+        self.assertEqual(response.context["filters"]["granularidad"], "semana")
+        self.assertEqual(
+            [key for key, _ in response.context["granularidades"]], list(GRANULARIDADES)
+        )
+        self.assertContains(response, "04 Mar 2024")
+        response = self.client.get(reverse("dashboard:costos"), {"granularidad": "hora"})
+        self.assertEqual(response.context["filters"]["granularidad"], "mes")
+
+
+class PeriodComparisonTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="testpass")
+        self.batch = Batch.objects.create(usuario=self.user, nombre="Ceba")
+        self.service = DashboardStatsService(self.user)
+        for fecha, monto in [
+            (date(2024, 3, 10), 1000), (date(2024, 3, 20), 500),  # actual
+            (date(2024, 2, 15), 1000),  # anterior
+            (date(2023, 3, 5), 3000),  # año anterior
+            (date(2022, 1, 1), 9999),  # fuera de los tres periodos
+        ]:
+            Cost.objects.create(batch=self.batch, concepto="Sal", monto=Decimal(monto), fecha=fecha)
+
+    def test_costs_compare_previous_period_and_last_year(self):
+        with self.assertNumQueries(1):
+            por_periodo = aggregate_periods(
+                Cost.objects.all(), "fecha", {"gasto_total": (Sum, "monto")},
+                date(2024, 3, 1), date(2024, 3, 31), date(2024, 4, 1),
+            )
+        self.assertEqual(set(por_periodo), {"actual", "anterior", "anio_anterior"})
+
+        stats = self.service.get_costos_stats(
+            fecha_inicio=date(2024, 3, 1), fecha_fin=date(2024, 3, 31)
+        )
+        kpis = stats["kpis"]
+
+        self.assertEqual(kpis["gasto_total"], 1500)
+        self.assertEqual(kpis["total_registros"], 2)
+        gasto = kpis["comparacion"]["gasto_total"]
+        self.assertEqual((gasto["anterior"], gasto["delta"], gasto["pct"]), (1000, 500, 50.0))
+        self.assertEqual(
+            (gasto["anio_anterior"], gasto["delta_anual"], gasto["pct_anual"]), (3000, -1500, -50.0)
+        )
+        self.assertEqual(kpis["comparacion"]["promedio_por_registro"]["anterior"], 1000)
+
+    def test_without_start_date_there_is_nothing_to_compare(self):
+        kpis = self.service.get_costos_stats()["kpis"]
+
+        self.assertEqual(kpis["gasto_total"], 15499)
+        self.assertEqual(kpis["comparacion"], {})
+
+    def test_tracking_kpis_include_comparison(self):
+        animal = Animal.objects.create(
+            batch=self.batch, codigo="C-01", especie="Vaca", sexo="M",
+            fecha_de_nacimiento=date(2022, 1, 1),
+        )
+        Peso.objects.create(animal=animal, fecha=at(2024, 2, 10), peso=Decimal("300"))
+        Peso.objects.create(animal=animal, fecha=at(2024, 3, 10), peso=Decimal("330"))
+
+        stats = self.service.get_tracking_stats(
+            fecha_inicio=date(2024, 3, 1), fecha_fin=date(2024, 3, 31)
+        )
+        kpis = stats["kpis"]
+
+        self.assertEqual(kpis["peso_promedio"], 330)
+        self.assertEqual(kpis["comparacion"]["peso_promedio"]["delta"], 30)
+        self.assertIsNone(kpis["comparacion"]["total_pesos"]["pct_anual"])
+
+    def test_herd_adg_is_cached_until_its_lote_changes(self):
+        cache.clear()
+        animal = Animal.objects.create(
+            batch=self.batch, codigo="C-02", especie="Vaca", sexo="M",
+            fecha_de_nacimiento=date(2022, 1, 1),
+        )
+        Peso.objects.create(animal=animal, fecha=at(2024, 3, 1), peso=Decimal("300"))
+        Peso.objects.create(animal=animal, fecha=at(2024, 3, 31), peso=Decimal("330"))
+
+        with mock.patch("dashboard.services.herd_adg", wraps=herd_adg) as compute:
+            first = self.service.get_tracking_stats()["kpis"]["gdp_30"]
+            self.assertEqual(self.service.get_tracking_stats()["kpis"]["gdp_30"], first)
+            self.assertEqual(compute.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Peso.objects.create(animal=animal, fecha=at(2024, 4, 30), peso=Decimal("390"))
+            kpis = self.service.get_tracking_stats()["kpis"]
+
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual((first, kpis["gdp_30"]), (1.0, 2.0))
+
+
+class CohortReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="testpass")
+        self.batch = Batch.objects.create(usuario=self.user, nombre="Cría")
+        self.lotes = {self.batch.pk: self.batch.nombre}
+        self.enero = [
+            Animal.objects.create(
+                batch=self.batch, codigo=f"E-{index}", especie="Vaca", sexo="F",
+                fecha_de_nacimiento=date(2024, 1, day),
+            )
+            for index, day in enumerate((5, 25))
+        ]
+        self.marzo = Animal.objects.create(
+            batch=self.batch, codigo="M-1", especie="Vaca", sexo="M",
+            fecha_de_nacimiento=date(2024, 3, 10),
+        )
+        for animal, peso in zip(self.enero, (100, 120), strict=True):
+            Peso.objects.create(animal=animal, fecha=at(2024, 3, 15), peso=Decimal(peso))
+            Peso.objects.create(animal=animal, fecha=at(2024, 4, 15), peso=Decimal(peso + 30))
+        Peso.objects.create(animal=self.marzo, fecha=at(2024, 5, 15), peso=Decimal(90))
+        Produccion.objects.create(
+            animal=self.enero[0], fecha=at(2024, 3, 20), tipo="Leche", cantidad=Decimal("40")
+        )
+
+    def test_cohort_key_follows_birth_date(self):
+        animal = self.enero[0]
+        self.assertEqual(animal.cohorte, 2024 * 12)
+
+        animal.fecha_de_nacimiento = date(2023, 12, 1)
+        animal.save(update_fields=["fecha_de_nacimiento"])
+
+        animal.refresh_from_db()
+        self.assertEqual(animal.cohorte, 2023 * 12 + 11)
+
+    def test_matrix_by_cohort_and_age(self):
+        stats = get_cohort_stats(self.user, self.lotes)
+
+        self.assertEqual([row["nombre"] for row in stats["cohortes"]], ["Jan 2024", "Mar 2024"])
+        self.assertEqual([row["animales"] for row in stats["cohortes"]], [2, 1])
+        self.assertEqual(stats["edades"], [0, 1, 2, 3])
+        self.assertEqual(stats["metricas"]["peso"][0], [None, None, 110, 140])
+        self.assertEqual(stats["metricas"]["ganancia"][0], [None, None, None, 30])
+        self.assertEqual(stats["metricas"]["peso"][1], [None, None, 90, None])
+        self.assertEqual(stats["metricas"]["produccion"][0][2], 20)
+
+    def test_quarter_cohorts_are_cached_until_a_lote_changes(self):
+        first = get_cohort_stats(self.user, self.lotes, granularidad="trimestre")
+        self.assertEqual([row["nombre"] for row in first["cohortes"]], ["T1 2024"])
+        with CaptureQueriesContext(connection) as queries:
+            again = get_cohort_stats(self.user, self.lotes, granularidad="trimestre")
+        self.assertEqual(again, first)
+        self.assertEqual(data_queries(queries), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Animal.objects.create(
+                batch=self.batch, codigo="A-1", especie="Vaca", sexo="F",
+                fecha_de_nacimiento=date(2024, 4, 1),
+            )
+
+        stats = get_cohort_stats(self.user, self.lotes, granularidad="trimestre")
+        self.assertEqual([row["nombre"] for row in stats["cohortes"]], ["T1 2024", "T2 2024"])
+
+    def test_view_renders_heatmap_for_own_lotes_only(self):
+        intruder = User.objects.create_user(username="intruder", password="testpass")
+        self.client.force_login(intruder)
+        response = self.client.get(reverse("dashboard:cohortes"), {"lote": self.batch.pk})
+        self.assertEqual(response.context["filas"], [])
+
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("dashboard:cohortes"), {"metrica": "costo", "granularidad": "x"}
+        )
+        self.assertEqual(response.context["filters"]["granularidad"], "mes")
+        self.assertEqual(len(response.context["filas"]), 2)
@@ -9,4 +9,6 @@ urlpatterns = [
     path("lotes/", views.DashboardLotesView.as_view(), name="lotes"),
     path("tracking/", views.DashboardTrackingView.as_view(), name="tracking"),
     path("costos/", views.DashboardCostosView.as_view(), name="costos"),
+    path("rentabilidad/", views.DashboardRentabilidadView.as_view(), name="rentabilidad"),
+    path("cohortes/", views.DashboardCohortesView.as_view(), name="cohortes"),
 ]
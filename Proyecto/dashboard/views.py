@@ -7,7 +7,14 @@ from typing import Any
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView
 
-from .services import DashboardStatsService
+from batches.models import Batch
+
+from .analytics import get_margin_stats
+from .cohorts import GRANULARIDADES as COHORT_GRANULARIDADES
+from .cohorts import METRICAS, get_cohort_stats, heat_rows
+from .services import GRANULARIDAD_DEFAULT, GRANULARIDADES, DashboardStatsService
+
+GRANULARIDAD_CHOICES = [(key, label) for key, (_, _, label) in GRANULARIDADES.items()]
 
 
 class DashboardBaseView(LoginRequiredMixin, TemplateView):
@@ -27,6 +34,10 @@ class DashboardBaseView(LoginRequiredMixin, TemplateView):
         except ValueError:
             return None
 
+    def get_granularidad(self) -> str:
+        granularidad = self.request.GET.get("granularidad", "")
+        return granularidad if granularidad in GRANULARIDADES else GRANULARIDAD_DEFAULT
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context["active_tab"] = self.active_tab
@@ -37,6 +48,7 @@ class DashboardLotesView(DashboardBaseView):
     """Vista para la pestaña de Lotes y Animales."""
 
     active_tab = "lotes"
+    query_budget = 8
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -67,6 +79,7 @@ class DashboardTrackingView(DashboardBaseView):
     """Vista para la pestaña de Tracking."""
 
     active_tab = "tracking"
+    query_budget = 9
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -78,6 +91,7 @@ class DashboardTrackingView(DashboardBaseView):
             "tipo_produccion": self.request.GET.get("tipo", ""),
             "fecha_inicio": self.request.GET.get("start", ""),
             "fecha_fin": self.request.GET.get("end", ""),
+            "granularidad": self.get_granularidad(),
         }
 
         stats = service.get_tracking_stats(
@@ -86,12 +100,16 @@ class DashboardTrackingView(DashboardBaseView):
             tipo_produccion=filters["tipo_produccion"] or None,
             fecha_inicio=self.parse_date(filters["fecha_inicio"]),
             fecha_fin=self.parse_date(filters["fecha_fin"]),
+            granularidad=filters["granularidad"],
+            puntos=self.request.GET.get("puntos"),
         )
 
         context.update({
             "filters": filters,
+            "granularidades": GRANULARIDAD_CHOICES,
             "kpis": stats["kpis"],
             "charts_json": json.dumps(stats["charts"]),
+            "gdp_ranking": stats["gdp_ranking"],
             "lotes_disponibles": stats["lotes_disponibles"],
             "animales_disponibles": stats["animales_disponibles"],
         })
@@ -102,6 +120,7 @@ class DashboardCostosView(DashboardBaseView):
     """Vista para la pestaña de Costos."""
 
     active_tab = "costos"
+    query_budget = 7
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -112,6 +131,7 @@ class DashboardCostosView(DashboardBaseView):
             "tipo_costo": self.request.GET.get("tipo", ""),
             "fecha_inicio": self.request.GET.get("start", ""),
             "fecha_fin": self.request.GET.get("end", ""),
+            "granularidad": self.get_granularidad(),
         }
 
         stats = service.get_costos_stats(
@@ -119,13 +139,89 @@ class DashboardCostosView(DashboardBaseView):
             tipo_costo=filters["tipo_costo"] or None,
             fecha_inicio=self.parse_date(filters["fecha_inicio"]),
             fecha_fin=self.parse_date(filters["fecha_fin"]),
+            granularidad=filters["granularidad"],
+            puntos=self.request.GET.get("puntos"),
         )
 
         context.update({
             "filters": filters,
+            "granularidades": GRANULARIDAD_CHOICES,
             "kpis": stats["kpis"],
             "charts_json": json.dumps(stats["charts"]),
             "lotes_disponibles": stats["lotes_disponibles"],
             "tipos_disponibles": stats["tipos_disponibles"],
         })
         return context
+
+
+class DashboardRentabilidadView(DashboardBaseView):
+    """Vista para la pestaña de Rentabilidad: costo por kg, por litro y margen."""
+
+    active_tab = "rentabilidad"
+    query_budget = 10
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+
+        filters = {
+            "lote_id": self.request.GET.get("lote", ""),
+            "fecha_inicio": self.request.GET.get("start", ""),
+            "fecha_fin": self.request.GET.get("end", ""),
+        }
+
+        lotes_disponibles = list(Batch.objects.by_user(self.request.user).values("id", "nombre"))
+        stats = get_margin_stats(
+            self.request.user,
+            {lote["id"]: lote["nombre"] for lote in lotes_disponibles},
+            lote_id=int(filters["lote_id"]) if filters["lote_id"].isdigit() else None,
+            fecha_inicio=self.parse_date(filters["fecha_inicio"]),
+            fecha_fin=self.parse_date(filters["fecha_fin"]),
+        )
+
+        context.update({
+            "filters": filters,
+            "kpis": stats["kpis"],
+            "por_lote": stats["por_lote"],
+            "por_animal": stats["por_animal"],
+            "charts_json": json.dumps(stats["charts"]),
+            "lotes_disponibles": lotes_disponibles,
+        })
+        return context
+
+
+class DashboardCohortesView(DashboardBaseView):
+    """Vista para la pestaña de Cohortes: cohorte de nacimiento × edad en meses."""
+
+    active_tab = "cohortes"
+    query_budget = 7
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+
+        filters = {
+            "lote_id": self.request.GET.get("lote", ""),
+            "granularidad": self.request.GET.get("granularidad", ""),
+            "metrica": self.request.GET.get("metrica", ""),
+        }
+        if filters["granularidad"] not in COHORT_GRANULARIDADES:
+            filters["granularidad"] = "mes"
+        if filters["metrica"] not in METRICAS:
+            filters["metrica"] = "peso"
+
+        lotes_disponibles = list(Batch.objects.by_user(self.request.user).values("id", "nombre"))
+        stats = get_cohort_stats(
+            self.request.user,
+            {lote["id"]: lote["nombre"] for lote in lotes_disponibles},
+            lote_id=int(filters["lote_id"]) if filters["lote_id"].isdigit() else None,
+            granularidad=filters["granularidad"],
+        )
+
+        context.update({
+            "filters": filters,
+            "metricas": METRICAS,
+            "edades": stats["edades"],
+            "filas": heat_rows(stats, filters["metrica"]),
+            "charts_json": json.dumps({}),
+            "lotes_disponibles": lotes_disponibles,
+        })
+        return context
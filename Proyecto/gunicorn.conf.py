@@ -0,0 +1,28 @@
+"""Configuración de gunicorn para Heroku.
+
+La app se carga una sola vez en el maestro (`preload_app`) y los workers la
+heredan ya importada y precalentada; cada worker abre su propia conexión a la BD
+antes de aceptar tráfico, así el primer request tras escalar desde 0 no paga
+el arranque completo.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+preload_app = True
+
+
+def when_ready(server):
+    from core.warmup import warm_process
+
+    warm_process()
+
+
+def post_worker_init(worker):
+    from core.warmup import prime_database
+
+    try:
+        prime_database()
+    except Exception as e:
+        worker.log.warning(f"Database warmup failed: {e}")
@@ -0,0 +1,96 @@
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.admin.sites import AlreadyRegistered
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from unfold.admin import ModelAdmin
+
+from .models import Job, ScheduledRun
+from .queue import queue_stats
+from .scheduler import Scheduler
+
+
+class AutoModelAdmin(ModelAdmin):
+    pass
+
+
+@admin.register(Job)
+class JobAdmin(ModelAdmin):
+    list_display = (
+        "__str__",
+        "queue",
+        "priority",
+        "status",
+        "attempts",
+        "run_at",
+        "duration",
+        "progress",
+        "locked_by",
+    )
+    list_filter = ("status", "queue", "task")
+    search_fields = ("task", "last_error")
+    readonly_fields = [field.name for field in Job._meta.fields] + ["duration"]
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                "stats/",
+                self.admin_site.admin_view(self.stats_view),
+                name="jobs_job_stats",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}), "stats_url": reverse("admin:jobs_job_stats")}
+        return super().changelist_view(request, extra_context)
+
+    @admin.display(description=_("Duración"))
+    def duration(self, obj):
+        return obj.duration
+
+    @admin.action(description=_("Reintentar ahora"))
+    def retry(self, request, queryset):
+        # Sin llave de unicidad: puede coexistir con otra pendiente de la misma tarea
+        updated = queryset.exclude(status=Job.Estado.EN_CURSO).update(
+            status=Job.Estado.PENDIENTE,
+            run_at=timezone.now(),
+            attempts=0,
+            finished_at=None,
+            unique_key="",
+        )
+        self.message_user(request, _("%(count)s tareas encoladas de nuevo.") % {"count": updated})
+
+    def stats_view(self, request):
+        context = {
+            **self.admin_site.each_context(request),
+            "title": _("Estado de la cola"),
+            "opts": self.model._meta,
+            "stats": queue_stats(),
+            "schedule": Scheduler().upcoming(),
+        }
+        return TemplateResponse(request, "admin/jobs/job/stats.html", context)
+
+
+@admin.register(ScheduledRun)
+class ScheduledRunAdmin(ModelAdmin):
+    list_display = ("name", "scheduled_for", "status", "missed", "duration", "job")
+    list_filter = ("name", "status")
+    readonly_fields = [field.name for field in ScheduledRun._meta.fields]
+    date_hierarchy = "scheduled_for"
+
+    def has_add_permission(self, request):
+        return False
+
+
+for model in apps.get_app_config("jobs").get_models():
+    try:
+        admin.site.register(model, AutoModelAdmin)
+    except AlreadyRegistered:
+        continue
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Registra las tareas declaradas en el módulo ``tasks`` de cada app.
+        autodiscover_modules("tasks")
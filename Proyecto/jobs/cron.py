@@ -0,0 +1,102 @@
+"""Expresiones cron de cinco campos evaluadas en la zona horaria del proyecto.
+
+Soporta ``*``, listas, rangos, pasos (``*/15``, ``8-18/2``), nombres de meses
+y días (``jan``, ``mon``) y los alias ``@hourly``, ``@daily``, ``@weekly``,
+``@monthly`` y ``@yearly``. Como en cron, si se restringen el día del mes y el
+día de la semana basta con que coincida uno de los dos.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from django.utils import timezone
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+WEEKDAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+# (mínimo, máximo, nombres) de minuto, hora, día del mes, mes y día de la semana
+FIELDS = (
+    (0, 59, {}),
+    (0, 23, {}),
+    (1, 31, {}),
+    (1, 12, {name: index + 1 for index, name in enumerate(MONTHS)}),
+    (0, 7, {name: index for index, name in enumerate(WEEKDAYS)}),
+)
+SEARCH_YEARS = 5
+
+
+def _value(token: str, names: dict[str, int]) -> int:
+    token = token.lower()
+    return names[token] if token in names else int(token)
+
+
+def parse_field(text: str, low: int, high: int, names: dict[str, int]) -> frozenset[int]:
+    values = set()
+    for part in text.split(","):
+        spec, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (_value(bound, names) for bound in spec.split("-", 1))
+        else:
+            start = _value(spec, names)
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(part)
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Expresión cron inválida: {expression!r} (se esperan 5 campos)")
+        try:
+            parsed = [parse_field(text, *spec) for text, spec in zip(fields, FIELDS, strict=True)]
+        except (ValueError, KeyError) as exc:
+            raise ValueError(f"Expresión cron inválida: {expression!r} ({exc})") from exc
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)  # 7 también es domingo
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def day_matches(self, day: date) -> bool:
+        in_month = day.day in self.days
+        in_week = day.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Primer minuto estrictamente posterior a ``moment`` que cumple la expresión."""
+        tz = timezone.get_default_timezone()
+        current = timezone.localtime(moment, tz).replace(tzinfo=None, second=0, microsecond=0)
+        current += timedelta(minutes=1)
+        limit = current + timedelta(days=366 * SEARCH_YEARS)
+        while current < limit:
+            if current.month not in self.months:
+                year, month = divmod(current.month, 12)
+                current = datetime(current.year + year, month + 1, 1)
+            elif not self.day_matches(current.date()):
+                current = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return timezone.make_aware(current, tz)
+        raise ValueError(f"{self.expression!r} no ocurre en {SEARCH_YEARS} años")
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.queue import Worker
+from jobs.scheduler import Scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta las tareas en segundo plano de la cola en la base de datos "
+        "y dispara las periódicas de JOBS_SCHEDULE hasta recibir SIGTERM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queues",
+            default="",
+            help="Colas separadas por coma; por defecto todas.",
+        )
+        parser.add_argument("--interval", type=float, default=None)
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Termina cuando no quedan tareas listas.",
+        )
+        parser.add_argument(
+            "--no-scheduler",
+            action="store_true",
+            help="No dispara las tareas periódicas en este proceso.",
+        )
+
+    def handle(self, *args, **options):
+        queues = [queue.strip() for queue in options["queues"].split(",") if queue.strip()]
+        scheduler = None
+        if getattr(settings, "JOBS_SCHEDULER_ENABLED", True) and not options["no_scheduler"]:
+            scheduler = Scheduler()
+        Worker(queues, interval=options["interval"], scheduler=scheduler).run(
+            burst=options["burst"]
+        )
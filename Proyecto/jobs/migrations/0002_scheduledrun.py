@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Programación')),
+                ('task', models.CharField(max_length=200, verbose_name='Tarea')),
+                ('scheduled_for', models.DateTimeField(verbose_name='Programada para')),
+                ('status', models.CharField(choices=[('enqueued', 'Encolada'), ('skipped', 'Omitida'), ('done', 'Terminada'), ('failed', 'Fallida')], max_length=10, verbose_name='Estado')),
+                ('missed', models.PositiveIntegerField(default=0, help_text='Disparos anteriores sin ejecutar que este registro agrupa.', verbose_name='Disparos perdidos')),
+                ('duration', models.DurationField(blank=True, null=True, verbose_name='Duración')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ejecuciones_programadas', to='jobs.job', verbose_name='Tarea encolada')),
+            ],
+            options={
+                'verbose_name': 'Ejecución programada',
+                'verbose_name_plural': 'Ejecuciones programadas',
+                'ordering': ['-scheduled_for'],
+                'constraints': [models.UniqueConstraint(fields=('name', 'scheduled_for'), name='unique_scheduled_run')],
+            },
+        ),
+    ]
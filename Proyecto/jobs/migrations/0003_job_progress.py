@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:54
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_scheduledrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='progress',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Lo que reporta la tarea con `jobs.queue.set_progress`.', null=True, verbose_name='Progreso'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='unique_key',
+            field=models.CharField(blank=True, help_text='Huella de tarea y argumentos de las encoladas con unique=True.', max_length=64, verbose_name='Llave de unicidad'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending'), models.Q(('unique_key', ''), _negated=True)), fields=('unique_key',), name='jobs_job_unique_pending'),
+        ),
+    ]
@@ -0,0 +1,193 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    """Tarea encolada para el proceso ``worker``; ver `jobs.queue`."""
+
+    class Estado(models.TextChoices):
+        PENDIENTE = ("pending", _("Pendiente"))
+        EN_CURSO = ("running", _("En curso"))
+        TERMINADA = ("done", _("Terminada"))
+        FALLIDA = ("failed", _("Fallida"))
+
+    task = models.CharField(
+        max_length=200,
+        verbose_name=_("Tarea")
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name=_("Argumentos")
+    )
+    queue = models.CharField(
+        max_length=50,
+        default="default",
+        verbose_name=_("Cola")
+    )
+    priority = models.SmallIntegerField(
+        default=0,
+        verbose_name=_("Prioridad"),
+        help_text=_("Las de mayor prioridad se toman primero.")
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Estado.choices,
+        default=Estado.PENDIENTE,
+        verbose_name=_("Estado")
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_("Ejecutar desde")
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_("Intentos")
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+        verbose_name=_("Intentos máximos")
+    )
+    timeout = models.PositiveIntegerField(
+        verbose_name=_("Tiempo límite (s)")
+    )
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name=_("Worker")
+    )
+    unique_key = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name=_("Llave de unicidad"),
+        help_text=_("Huella de tarea y argumentos de las encoladas con unique=True.")
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name=_("Resultado")
+    )
+    progress = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name=_("Progreso"),
+        help_text=_("Lo que reporta la tarea con `jobs.queue.set_progress`.")
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_("Último error")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Fecha de creación")
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Inicio")
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name=_("Fin")
+    )
+
+    class Meta:
+        verbose_name = _("Tarea en segundo plano")
+        verbose_name_plural = _("Tareas en segundo plano")
+        ordering = ["-created_at"]
+        indexes = [
+            # Solo las pendientes: el índice que recorre el worker no crece con el historial.
+            models.Index(
+                fields=["queue", "-priority", "run_at"],
+                condition=Q(status="pending"),
+                name="jobs_job_ready_idx",
+            ),
+            models.Index(fields=["status", "started_at"]),
+        ]
+        constraints = [
+            # Una sola pendiente por llave: enqueue(unique=True) concurrentes no se duplican
+            models.UniqueConstraint(
+                fields=["unique_key"],
+                condition=Q(status="pending") & ~Q(unique_key=""),
+                name="jobs_job_unique_pending",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.task} #{self.pk}"
+
+    @property
+    def duration(self):
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+
+class ScheduledRun(models.Model):
+    """Disparo de una entrada de ``JOBS_SCHEDULE`` para un minuto programado."""
+
+    class Estado(models.TextChoices):
+        ENCOLADA = ("enqueued", _("Encolada"))
+        OMITIDA = ("skipped", _("Omitida"))
+        TERMINADA = ("done", _("Terminada"))
+        FALLIDA = ("failed", _("Fallida"))
+
+    name = models.CharField(
+        max_length=100,
+        verbose_name=_("Programación")
+    )
+    task = models.CharField(
+        max_length=200,
+        verbose_name=_("Tarea")
+    )
+    scheduled_for = models.DateTimeField(
+        verbose_name=_("Programada para")
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Estado.choices,
+        verbose_name=_("Estado")
+    )
+    missed = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Disparos perdidos"),
+        help_text=_("Disparos anteriores sin ejecutar que este registro agrupa.")
+    )
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Tarea encolada"),
+        related_name="ejecuciones_programadas"
+    )
+    duration = models.DurationField(
+        null=True,
+        blank=True,
+        verbose_name=_("Duración")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Fecha de creación")
+    )
+
+    class Meta:
+        verbose_name = _("Ejecución programada")
+        verbose_name_plural = _("Ejecuciones programadas")
+        ordering = ["-scheduled_for"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "scheduled_for"], name="unique_scheduled_run"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} @ {timezone.localtime(self.scheduled_for):%Y-%m-%d %H:%M}"
@@ -0,0 +1,377 @@
+"""Cola de tareas en la base de datos, sin broker.
+
+Las tareas se declaran en el módulo ``tasks`` de cada app (se descubren al
+iniciar) y se encolan desde cualquier parte; la fila queda visible para el
+worker solo cuando la transacción que la creó confirma::
+
+    from jobs.queue import task
+
+    @task(queue="exports", timeout=600)
+    def exportar_lote(lote_id: int) -> dict: ...
+
+    exportar_lote.enqueue(lote_id=3, priority=5)
+
+El worker toma la siguiente tarea lista con ``SELECT ... FOR UPDATE SKIP
+LOCKED``: varios workers nunca esperan por la misma fila ni la toman dos
+veces. En SQLite, sin ``FOR UPDATE``, el ``UPDATE`` condicional sobre el
+estado cumple el mismo papel. Una tarea que falla vuelve a la cola con espera
+exponencial hasta ``max_attempts``; una que excede su ``timeout`` se
+interrumpe con `JobTimeout`, y las que quedaron en curso de un worker caído se
+recuperan en `reap_stale`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from .models import Job
+from .signals import job_finished
+
+logger = logging.getLogger(__name__)
+
+TASKS: dict[str, Task] = {}
+_current_job: ContextVar[Job | None] = ContextVar("current_job", default=None)
+STALE_GRACE_SECONDS = 60
+MAINTENANCE_INTERVAL_SECONDS = 60
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def get_default_timeout() -> int:
+    return int(getattr(settings, "JOBS_DEFAULT_TIMEOUT", 300))
+
+
+def get_max_attempts() -> int:
+    return int(getattr(settings, "JOBS_MAX_ATTEMPTS", 3))
+
+
+def get_poll_interval() -> float:
+    return float(getattr(settings, "JOBS_POLL_INTERVAL", 1.0))
+
+
+def get_retention_days() -> int:
+    return int(getattr(settings, "JOBS_RETENTION_DAYS", 7))
+
+
+def backoff(attempt: int) -> timedelta:
+    """Espera antes del reintento ``attempt``: exponencial, acotada y con algo de jitter."""
+    base = float(getattr(settings, "JOBS_RETRY_BACKOFF", 10))
+    cap = float(getattr(settings, "JOBS_MAX_BACKOFF", 3600))
+    delay = min(base * 2 ** (attempt - 1), cap)
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable[..., Any]
+    queue: str = "default"
+    priority: int = 0
+    max_attempts: int | None = None
+    timeout: int | None = None
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, **kwargs) -> Job:
+        return enqueue(self, **kwargs)
+
+
+def task(
+    func: Callable | None = None,
+    *,
+    name: str | None = None,
+    queue: str = "default",
+    priority: int = 0,
+    max_attempts: int | None = None,
+    timeout: int | None = None,
+):
+    """Registra ``func`` como tarea; se usa con o sin argumentos."""
+
+    def register(func: Callable) -> Task:
+        registered = Task(
+            name or f"{func.__module__}.{func.__name__}",
+            func,
+            queue=queue,
+            priority=priority,
+            max_attempts=max_attempts,
+            timeout=timeout,
+        )
+        TASKS[registered.name] = registered
+        return registered
+
+    return register(func) if func is not None else register
+
+
+def get_unique_key(task_name: str, kwargs: dict[str, Any]) -> str:
+    payload = json.dumps([task_name, kwargs], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def enqueue(
+    task: Task | str,
+    *,
+    queue: str | None = None,
+    priority: int | None = None,
+    run_at: datetime | None = None,
+    delay: float = 0,
+    unique: bool = False,
+    **kwargs,
+) -> Job:
+    """Encola ``task`` con ``kwargs`` serializables en JSON.
+
+    Con ``unique`` no se crea otra fila si ya hay una pendiente con la misma
+    tarea y argumentos; sirve para tareas idempotentes que drenan una cola. La
+    restricción ``jobs_job_unique_pending`` lo garantiza también entre
+    procesos: el que pierde la carrera recibe la fila del otro.
+    """
+    if isinstance(task, str):
+        try:
+            task = TASKS[task]
+        except KeyError as exc:
+            raise LookupError(f"Tarea no registrada: {task}") from exc
+    unique_key = get_unique_key(task.name, kwargs) if unique else ""
+    if unique:
+        pending = Job.objects.filter(unique_key=unique_key, status=Job.Estado.PENDIENTE).first()
+        if pending is not None:
+            return pending
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                task=task.name,
+                kwargs=kwargs,
+                queue=queue or task.queue,
+                priority=task.priority if priority is None else priority,
+                run_at=run_at or timezone.now() + timedelta(seconds=delay),
+                max_attempts=task.max_attempts or get_max_attempts(),
+                timeout=task.timeout or get_default_timeout(),
+                unique_key=unique_key,
+            )
+    except IntegrityError:
+        if not unique:
+            raise
+        return Job.objects.get(unique_key=unique_key, status=Job.Estado.PENDIENTE)
+
+
+def claim(worker: str, queues: list[str] | None = None) -> Job | None:
+    """Marca como en curso la siguiente tarea lista de ``queues`` y la retorna."""
+    now = timezone.now()
+    with transaction.atomic():
+        ready = Job.objects.filter(status=Job.Estado.PENDIENTE, run_at__lte=now)
+        if queues:
+            ready = ready.filter(queue__in=queues)
+        job = (
+            ready.select_for_update(skip_locked=True)
+            .order_by("-priority", "run_at", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status=Job.Estado.PENDIENTE).update(
+            status=Job.Estado.EN_CURSO,
+            locked_by=worker,
+            started_at=now,
+            finished_at=None,
+            attempts=F("attempts") + 1,
+        )
+    if not claimed:
+        return None
+    job.status, job.locked_by, job.started_at = Job.Estado.EN_CURSO, worker, now
+    job.attempts += 1
+    return job
+
+
+@contextmanager
+def time_limit(seconds: int):
+    """Lanza `JobTimeout` si el bloque tarda más de ``seconds``; solo en el hilo principal."""
+    if not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise JobTimeout(f"La tarea excedió {seconds} s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def fail(job: Job, error: str) -> None:
+    """Reprograma ``job`` con espera exponencial o lo marca fallido si agotó sus intentos."""
+    job.last_error = error
+    job.locked_by = ""
+    if job.attempts < job.max_attempts:
+        job.status = Job.Estado.PENDIENTE
+        job.run_at = timezone.now() + backoff(job.attempts)
+        if job.unique_key and Job.objects.filter(
+            unique_key=job.unique_key, status=Job.Estado.PENDIENTE
+        ).exclude(pk=job.pk).exists():
+            job.unique_key = ""  # ya hay otra pendiente; el reintento no la bloquea
+    else:
+        job.status = Job.Estado.FALLIDA
+        job.finished_at = timezone.now()
+    job.save(
+        update_fields=["status", "run_at", "finished_at", "locked_by", "last_error", "unique_key"]
+    )
+    if job.status == Job.Estado.FALLIDA:
+        job_finished.send(sender=Job, job=job)
+
+
+def set_progress(**progress) -> None:
+    """Guarda el avance de la tarea en curso para el admin; fuera del worker no hace nada."""
+    job = _current_job.get()
+    if job is not None:
+        job.progress = progress
+        Job.objects.filter(pk=job.pk).update(progress=progress)
+
+
+def run_job(job: Job) -> bool:
+    """Ejecuta una tarea ya reclamada; retorna si terminó bien."""
+    registered = TASKS.get(job.task)
+    start = time.perf_counter()
+    token = _current_job.set(job)
+    try:
+        if registered is None:
+            raise LookupError(f"Tarea no registrada: {job.task}")
+        with time_limit(job.timeout):
+            result = registered.func(**job.kwargs)
+        json.dumps(result, cls=DjangoJSONEncoder)  # un resultado no serializable es un fallo
+    except Exception:
+        logger.exception("Tarea %s falló (intento %s/%s)", job, job.attempts, job.max_attempts)
+        fail(job, traceback.format_exc())
+        return False
+    finally:
+        _current_job.reset(token)
+
+    job.status = Job.Estado.TERMINADA
+    job.result = result
+    job.finished_at = timezone.now()
+    job.last_error = ""
+    job.save(update_fields=["status", "result", "finished_at", "last_error"])
+    job_finished.send(sender=Job, job=job)
+    logger.info("Tarea %s terminada en %.2f s", job, time.perf_counter() - start)
+    return True
+
+
+def reap_stale() -> int:
+    """Devuelve a la cola (o da por fallidas) las tareas de workers que murieron a medias."""
+    now = timezone.now()
+    reaped = 0
+    with transaction.atomic():
+        running = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.Estado.EN_CURSO,
+            started_at__lt=now - timedelta(seconds=STALE_GRACE_SECONDS),
+        )
+        for job in running:
+            if job.started_at + timedelta(seconds=job.timeout + STALE_GRACE_SECONDS) < now:
+                fail(job, f"El worker {job.locked_by} no terminó la tarea.")
+                reaped += 1
+    return reaped
+
+
+def prune() -> int:
+    """Borra las terminadas hace más de ``JOBS_RETENTION_DAYS``; las fallidas se conservan."""
+    cutoff = timezone.now() - timedelta(days=get_retention_days())
+    deleted, _ = Job.objects.filter(status=Job.Estado.TERMINADA, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def queue_stats() -> list[dict[str, Any]]:
+    """Profundidad y rendimiento por cola en una sola consulta agrupada."""
+    now = timezone.now()
+    hour_ago, day_ago = now - timedelta(hours=1), now - timedelta(days=1)
+    estado = Job.Estado
+    finished_today = Q(finished_at__gte=day_ago)
+    duration = ExpressionWrapper(F("finished_at") - F("started_at"), output_field=DurationField())
+    return list(
+        Job.objects.order_by("queue")
+        .values("queue")
+        .annotate(
+            listas=Count("pk", filter=Q(status=estado.PENDIENTE, run_at__lte=now)),
+            programadas=Count("pk", filter=Q(status=estado.PENDIENTE, run_at__gt=now)),
+            en_curso=Count("pk", filter=Q(status=estado.EN_CURSO)),
+            ultima_hora=Count("pk", filter=Q(status=estado.TERMINADA, finished_at__gte=hour_ago)),
+            ultimo_dia=Count("pk", filter=Q(status=estado.TERMINADA) & finished_today),
+            fallidas_dia=Count("pk", filter=Q(status=estado.FALLIDA) & finished_today),
+            duracion=Avg(duration, filter=Q(status=estado.TERMINADA) & finished_today),
+        )
+    )
+
+
+class Worker:
+    """Bucle del proceso ``worker``: toma tareas hasta recibir SIGTERM/SIGINT."""
+
+    def __init__(
+        self,
+        queues: list[str] | None = None,
+        name: str | None = None,
+        interval: float | None = None,
+        scheduler=None,
+    ) -> None:
+        self.queues = queues or None
+        self.scheduler = scheduler  # `jobs.scheduler.Scheduler` que se evalúa en cada vuelta
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.interval = get_poll_interval() if interval is None else interval
+        self.stopping = False
+        self._last_maintenance = float("-inf")
+
+    def stop(self, *args) -> None:
+        self.stopping = True
+
+    def maintenance(self) -> None:
+        if time.monotonic() - self._last_maintenance < MAINTENANCE_INTERVAL_SECONDS:
+            return
+        self._last_maintenance = time.monotonic()
+        reap_stale()
+        prune()
+
+    def run_once(self) -> bool:
+        """Ejecuta una tarea si hay alguna lista; retorna si encontró una."""
+        close_old_connections()
+        self.maintenance()
+        if self.scheduler is not None:
+            self.scheduler.maybe_tick()
+        job = claim(self.name, self.queues)
+        if job is None:
+            return False
+        run_job(job)
+        return True
+
+    def run(self, burst: bool = False) -> None:
+        """Con ``burst`` termina cuando la cola queda vacía en vez de esperar más tareas."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info("Worker %s escuchando %s", self.name, ", ".join(self.queues or ["todas"]))
+        while not self.stopping:
+            if self.run_once():
+                continue
+            if burst:
+                break
+            time.sleep(self.interval)
+        logger.info("Worker %s detenido", self.name)
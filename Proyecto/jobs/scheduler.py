@@ -0,0 +1,167 @@
+"""Tareas periódicas declaradas en ``JOBS_SCHEDULE`` y disparadas desde el worker.
+
+Cada entrada indica la tarea registrada, su expresión cron (en ``TIME_ZONE``),
+los argumentos y qué hacer con los disparos perdidos mientras no había worker::
+
+    JOBS_SCHEDULE = {
+        "costos-recurrentes": {
+            "task": "costs.tasks.materialize_recurring",
+            "cron": "15 0 * * *",
+            "misfire": "once",
+        },
+    }
+
+El worker llama a `Scheduler.tick` cada ``JOBS_SCHEDULER_INTERVAL`` segundos.
+En PostgreSQL el tick toma ``pg_try_advisory_xact_lock``: con varios workers
+solo uno evalúa el horario y los demás siguen atendiendo la cola. La
+restricción única ``(name, scheduled_for)`` de `ScheduledRun` impide además
+disparar dos veces el mismo minuto, también en SQLite.
+
+Un disparo se encola si su minuto cae dentro de ``JOBS_SCHEDULE_GRACE``
+segundos. Si es más viejo (el worker estuvo caído), la política ``misfire``
+decide: ``skip`` lo registra como omitido y ``once`` lo ejecuta una sola vez
+por todos los perdidos. En ambos casos el historial guarda cuántos se agruparon.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .cron import CronExpression
+from .models import ScheduledRun
+from .queue import TASKS, enqueue
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_KEY = 7_412_093_551  # constante arbitraria del scheduler
+MISFIRE_POLICIES = ("skip", "once")
+MAX_MISSED_SCAN = 10_000
+
+
+def get_grace() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "JOBS_SCHEDULE_GRACE", 300)))
+
+
+def get_tick_interval() -> float:
+    return float(getattr(settings, "JOBS_SCHEDULER_INTERVAL", 30))
+
+
+@dataclass(frozen=True)
+class Entry:
+    name: str
+    task: str
+    cron: CronExpression
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    misfire: str = "skip"
+
+    def due(self, since: datetime, now: datetime) -> tuple[datetime | None, int]:
+        """Último minuto programado en ``(since, now]`` y cuántos quedaron antes de él."""
+        latest, missed = None, 0
+        tick = self.cron.next_after(since)
+        while tick <= now and missed < MAX_MISSED_SCAN:
+            if latest is not None:
+                missed += 1
+            latest = tick
+            tick = self.cron.next_after(tick)
+        return latest, missed
+
+
+def load_schedule(schedule: dict[str, dict] | None = None) -> list[Entry]:
+    """Entradas de ``JOBS_SCHEDULE`` validadas contra las tareas registradas."""
+    if schedule is None:
+        schedule = getattr(settings, "JOBS_SCHEDULE", {})
+    entries = []
+    for name, spec in schedule.items():
+        if spec["task"] not in TASKS:
+            raise ImproperlyConfigured(
+                f"JOBS_SCHEDULE[{name!r}]: tarea no registrada {spec['task']}"
+            )
+        misfire = spec.get("misfire", "skip")
+        if misfire not in MISFIRE_POLICIES:
+            raise ImproperlyConfigured(f"JOBS_SCHEDULE[{name!r}]: misfire debe ser skip u once")
+        try:
+            cron = CronExpression(spec["cron"])
+        except ValueError as exc:
+            raise ImproperlyConfigured(f"JOBS_SCHEDULE[{name!r}]: {exc}") from exc
+        entries.append(Entry(name, spec["task"], cron, spec.get("kwargs", {}), misfire))
+    return entries
+
+
+def try_advisory_lock() -> bool:
+    """Candado de la transacción actual; fuera de PostgreSQL basta la restricción única."""
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [ADVISORY_LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+class Scheduler:
+    def __init__(self, entries: list[Entry] | None = None) -> None:
+        self.entries = load_schedule() if entries is None else entries
+        self._last_tick = float("-inf")
+
+    def maybe_tick(self) -> list[ScheduledRun]:
+        if not self.entries or time.monotonic() - self._last_tick < get_tick_interval():
+            return []
+        self._last_tick = time.monotonic()
+        return self.tick()
+
+    def tick(self, now: datetime | None = None) -> list[ScheduledRun]:
+        """Registra (y encola) los disparos vencidos de cada entrada."""
+        now = now or timezone.now()
+        grace = get_grace()
+        runs = []
+        with transaction.atomic():
+            if not try_advisory_lock():
+                return []
+            last = dict(
+                ScheduledRun.objects.filter(name__in=[entry.name for entry in self.entries])
+                .values("name")
+                .annotate(last=Max("scheduled_for"))
+                .values_list("name", "last")
+            )
+            for entry in self.entries:
+                # Sin historial se parte del margen de gracia: no hay disparos que recuperar.
+                latest, missed = entry.due(last.get(entry.name) or now - grace, now)
+                if latest is None:
+                    continue
+                on_time = latest >= now - grace
+                run = ScheduledRun(
+                    name=entry.name, task=entry.task, scheduled_for=latest, missed=missed
+                )
+                try:
+                    with transaction.atomic():
+                        if on_time or entry.misfire == "once":
+                            run.status = ScheduledRun.Estado.ENCOLADA
+                            run.job = enqueue(entry.task, **entry.kwargs)
+                        else:
+                            run.status = ScheduledRun.Estado.OMITIDA
+                        run.save()
+                except IntegrityError:  # otro worker ya registró este minuto
+                    continue
+                logger.info("%s: %s (%s perdidos)", run, run.get_status_display(), missed)
+                runs.append(run)
+        return runs
+
+    def upcoming(self, now: datetime | None = None) -> list[dict[str, Any]]:
+        now = now or timezone.now()
+        return [
+            {
+                "name": entry.name,
+                "task": entry.task,
+                "cron": entry.cron.expression,
+                "misfire": entry.misfire,
+                "next": entry.cron.next_after(now),
+            }
+            for entry in self.entries
+        ]
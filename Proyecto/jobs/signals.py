@@ -0,0 +1,17 @@
+from django.dispatch import Signal, receiver
+
+from .models import Job, ScheduledRun
+
+# Se envía cuando una tarea termina o agota sus intentos, con ``job``.
+job_finished = Signal()
+
+
+@receiver(job_finished, sender=Job)
+def record_scheduled_run(sender, job: Job, **kwargs):
+    """Copia el resultado y la duración a la ejecución programada que encoló la tarea."""
+    status = (
+        ScheduledRun.Estado.TERMINADA
+        if job.status == Job.Estado.TERMINADA
+        else ScheduledRun.Estado.FALLIDA
+    )
+    ScheduledRun.objects.filter(job=job).update(status=status, duration=job.duration)
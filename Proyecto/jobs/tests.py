@@ -0,0 +1,227 @@
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .cron import CronExpression
+from .models import Job, ScheduledRun
+from .queue import TASKS, Worker, claim, enqueue, reap_stale, run_job, task
+from .scheduler import Scheduler, load_schedule
+
+CALLS = []
+
+
+@task(queue="tests")
+def add(a: int, b: int) -> int:
+    CALLS.append((a, b))
+    return a + b
+
+
+@task(queue="tests", max_attempts=2)
+def explode() -> None:
+    raise RuntimeError("boom")
+
+
+@task(queue="tests", max_attempts=1)
+def opaque() -> object:
+    return object()
+
+
+@task(queue="tests", timeout=1)
+def sleepy() -> None:
+    time.sleep(5)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+        self.worker = Worker(["tests"], name="test-worker", interval=0)
+
+    def test_enqueue_and_run(self):
+        job = add.enqueue(a=2, b=3)
+
+        self.assertTrue(self.worker.run_once())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Estado.TERMINADA)
+        self.assertEqual(job.result, 5)
+        self.assertEqual(job.attempts, 1)
+        self.assertFalse(self.worker.run_once())
+
+    def test_enqueue_by_name_and_unknown_task(self):
+        job = enqueue("jobs.tests.add", a=1, b=1, unique=True)
+        self.assertEqual(enqueue("jobs.tests.add", a=1, b=1, unique=True), job)
+        with self.assertRaises(LookupError):
+            enqueue("jobs.tests.nada")
+        self.assertIn("jobs.tests.add", TASKS)
+
+    def test_unique_enqueue_is_enforced_by_the_database(self):
+        job = add.enqueue(a=1, b=1, unique=True)
+        # Otro proceso ya insertó la pendiente entre la consulta y el INSERT
+        with mock.patch.object(Job.objects, "filter", return_value=Job.objects.none()):
+            self.assertEqual(add.enqueue(a=1, b=1, unique=True), job)
+        self.assertEqual(Job.objects.count(), 1)
+
+        add.enqueue(a=1, b=1)  # sin unique se permiten repetidas
+        claim("w", ["tests"])
+        self.assertNotEqual(add.enqueue(a=1, b=1, unique=True), job)
+
+    def test_retry_does_not_collide_with_a_newer_unique_job(self):
+        first = explode.enqueue(unique=True)
+        claimed = claim("w", ["tests"])
+        newer = explode.enqueue(unique=True)
+
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claimed)
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.unique_key), (Job.Estado.PENDIENTE, ""))
+        self.assertEqual(explode.enqueue(unique=True), newer)
+
+    def test_unserializable_result_fails_the_job(self):
+        job = opaque.enqueue()
+
+        with self.assertLogs("jobs.queue", "ERROR"):
+            self.assertFalse(run_job(claim("w", ["tests"])))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Estado.FALLIDA)
+        self.assertIn("not JSON serializable", job.last_error)
+
+    def test_priority_and_run_at_order_claims(self):
+        add.enqueue(a=1, b=0)
+        add.enqueue(a=2, b=0, priority=5)
+        add.enqueue(a=3, b=0, priority=9, delay=3600)
+
+        Worker(["tests"], interval=0).run(burst=True)
+
+        self.assertEqual(CALLS, [(2, 0), (1, 0)])
+        self.assertEqual(Job.objects.filter(status=Job.Estado.PENDIENTE).count(), 1)
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = explode.enqueue()
+
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claim("w", ["tests"]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Estado.PENDIENTE)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claim("w", ["tests"]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Estado.FALLIDA)
+        self.assertEqual(job.attempts, 2)
+
+    def test_timeout_interrupts_the_task(self):
+        job = sleepy.enqueue()
+
+        start = time.monotonic()
+        with self.assertLogs("jobs.queue", "ERROR"):
+            self.assertFalse(run_job(claim("w", ["tests"])))
+
+        self.assertLess(time.monotonic() - start, 3)
+        job.refresh_from_db()
+        self.assertIn("JobTimeout", job.last_error)
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = add.enqueue(a=1, b=2)
+        claim("muerto", ["tests"])
+        Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(reap_stale(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Estado.PENDIENTE)
+        self.assertIn("muerto", job.last_error)
+
+    def test_admin_stats_show_queue_depth(self):
+        add.enqueue(a=1, b=2)
+        add.enqueue(a=1, b=3, delay=60)
+        admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin:jobs_job_stats"))
+
+        self.assertEqual(response.status_code, 200)
+        row = response.context["stats"][0]
+        self.assertEqual((row["queue"], row["listas"], row["programadas"]), ("tests", 1, 1))
+
+
+def local(*args) -> datetime:
+    return timezone.make_aware(datetime(*args))
+
+
+class CronExpressionTests(TestCase):
+    def test_next_after_in_project_timezone(self):
+        cron = CronExpression("15 0 * * *")
+
+        self.assertEqual(cron.next_after(local(2026, 3, 1, 0, 15)), local(2026, 3, 2, 0, 15))
+        self.assertEqual(cron.next_after(local(2026, 12, 31, 23, 0)), local(2027, 1, 1, 0, 15))
+
+    def test_steps_ranges_names_and_aliases(self):
+        self.assertEqual(
+            CronExpression("*/20 8-10/2 * * mon-fri").next_after(local(2026, 10, 16, 10, 45)),
+            local(2026, 10, 19, 8, 0),  # viernes 10:45 -> lunes 8:00
+        )
+        self.assertEqual(
+            CronExpression("@monthly").next_after(local(2026, 1, 31, 12, 0)), local(2026, 2, 1)
+        )
+        # Día del mes y día de la semana restringidos: basta con uno
+        self.assertEqual(
+            CronExpression("0 0 13 * fri").next_after(local(2026, 10, 1)), local(2026, 10, 2)
+        )
+
+    def test_invalid_expressions(self):
+        for expression in ("* * *", "61 * * * *", "*/0 * * * *", "0 0 * foo *"):
+            with self.assertRaises(ValueError):
+                CronExpression(expression)
+
+
+@override_settings(JOBS_SCHEDULE_GRACE=300)
+class SchedulerTests(TestCase):
+    def scheduler(self, misfire="skip"):
+        entry = {"task": "jobs.tests.add", "cron": "0 * * * *", "kwargs": {"a": 1, "b": 1}}
+        return Scheduler(load_schedule({"sumar": {**entry, "misfire": misfire}}))
+
+    def test_tick_enqueues_each_minute_once(self):
+        scheduler = self.scheduler()
+        now = local(2026, 10, 19, 8, 1)
+
+        runs = scheduler.tick(now)
+        self.assertEqual(scheduler.tick(now), [])
+        self.assertEqual(scheduler.tick(now + timedelta(minutes=30)), [])
+
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(runs[0].scheduled_for, local(2026, 10, 19, 8, 0))
+        self.assertEqual(runs[0].job.kwargs, {"a": 1, "b": 1})
+        Worker(["tests"], interval=0).run(burst=True)
+        run = ScheduledRun.objects.get()
+        self.assertEqual(run.status, ScheduledRun.Estado.TERMINADA)
+        self.assertIsNotNone(run.duration)
+
+    def test_missed_runs_follow_the_misfire_policy(self):
+        for misfire, status in (("skip", "skipped"), ("once", "enqueued")):
+            ScheduledRun.objects.all().delete()
+            scheduler = self.scheduler(misfire)
+            scheduler.tick(local(2026, 10, 19, 8, 0))
+
+            (run,) = scheduler.tick(local(2026, 10, 19, 12, 30))  # worker caído de 9 a 12
+
+            self.assertEqual(run.scheduled_for, local(2026, 10, 19, 12, 0))
+            self.assertEqual((run.status, run.missed), (status, 3))
+            self.assertEqual(run.job is not None, misfire == "once")
+
+    def test_schedule_is_validated(self):
+        with self.assertRaises(ImproperlyConfigured):
+            load_schedule({"x": {"task": "jobs.tests.nada", "cron": "* * * * *"}})
+        with self.assertRaises(ImproperlyConfigured):
+            load_schedule({"x": {"task": "jobs.tests.add", "cron": "cada hora"}})
+        self.assertEqual(len(load_schedule()), 3)  # las del proyecto están registradas
@@ -0,0 +1,200 @@
+"""Detección de pesajes anómalos frente a la historia reciente de cada animal.
+
+Para cada pesaje se toman los ``window`` pesajes anteriores del mismo animal
+y se proyectan a la fecha actual con la GDP mediana de esa ventana. La mediana
+de las proyecciones es el peso esperado y su MAD la dispersión; el puntaje es
+la desviación robusta::
+
+    score = |peso - esperado| / max(1.4826·MAD, MIN_SCALE_RATIO·esperado, MIN_SCALE_KG)
+
+Al usar medianas, un error de digitación dentro de la ventana (4500 en vez de
+450) no contamina la referencia de los pesajes siguientes. Con menos de
+``MIN_HISTORY`` pesajes previos solo se revisa la GDP contra el pesaje
+anterior, y cualquier peso fuera de ``(0, MAX_WEIGHT_KG]`` se marca siempre.
+
+`score_series` trabaja sobre la serie empaquetada de `tracking.timeseries`
+con una matriz pesaje × ventana, sin recorrer animales en Python. La señal de
+`Peso` evalúa cada pesaje nuevo con la misma función y, con `rescore_following`,
+los pesajes siguientes cuya ventana cambió al insertar, editar o borrar uno;
+`detect_anomalies` recorre la historia por bloques de animales.
+"""
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .models import Peso, PesoAnomaly
+from .timeseries import SECONDS_PER_DAY, WeightSeries
+
+MIN_HISTORY = 3
+MIN_SCALE_KG = 2.0
+MIN_SCALE_RATIO = 0.02
+MAX_WEIGHT_KG = 2000.0
+MAX_DAILY_CHANGE_KG = 5.0
+MAD_TO_SIGMA = 1.4826
+DETECT_CHUNK = 2000  # animales por bloque: la ventana usa matrices pesaje × window
+
+Motivo = PesoAnomaly.Motivo
+
+
+def get_threshold() -> float:
+    return float(getattr(settings, "WEIGHT_ANOMALY_THRESHOLD", 3.5))
+
+
+def get_window() -> int:
+    return int(getattr(settings, "WEIGHT_ANOMALY_WINDOW", 8))
+
+
+@dataclass
+class AnomalyScores:
+    score: np.ndarray  # (pesajes,) desviación robusta; NaN sin historia suficiente
+    expected: np.ndarray  # (pesajes,) peso esperado; NaN sin pesajes previos
+    motivo: np.ndarray  # (pesajes,) Motivo.*; "" si el pesaje es normal
+
+
+def _nanmedian(values: np.ndarray) -> np.ndarray:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # filas sin historia
+        return np.nanmedian(values, axis=1)
+
+
+def score_series(
+    series: WeightSeries, window: int | None = None, threshold: float | None = None
+) -> AnomalyScores:
+    window = window or get_window()
+    threshold = threshold or get_threshold()
+    count = len(series)
+    current = np.arange(count)
+    weights, days = series.weights, series.days
+
+    # Índices de los ``window`` pesajes previos del mismo animal (del más antiguo al último)
+    previous = current[:, None] - np.arange(window, 0, -1)[None, :]
+    valid = previous >= series.starts[series.group][:, None]
+    previous = np.where(valid, previous, 0)
+    window_weights = np.where(valid, weights[previous], np.nan)
+    window_days = np.where(valid, days[previous], np.nan)
+    history = valid.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.diff(window_weights, axis=1) / np.diff(window_days, axis=1)
+    rates[~np.isfinite(rates)] = np.nan
+    rate = np.nan_to_num(_nanmedian(rates)) if window > 1 else np.zeros(count)
+    projected = window_weights + rate[:, None] * (days[:, None] - window_days)
+    expected = _nanmedian(projected)
+    mad = _nanmedian(np.abs(projected - expected[:, None]))
+    scale = np.maximum.reduce([
+        MAD_TO_SIGMA * np.nan_to_num(mad),
+        MIN_SCALE_RATIO * np.nan_to_num(expected),
+        np.full(count, MIN_SCALE_KG),
+    ])
+    score = np.where(history >= MIN_HISTORY, np.abs(weights - expected) / scale, np.nan)
+
+    # Historia corta: GDP contra el pesaje anterior
+    last = previous[:, -1]
+    has_last = valid[:, -1]
+    elapsed = np.maximum(days - days[last], 1.0)
+    fast = np.abs(weights - weights[last]) / elapsed > MAX_DAILY_CHANGE_KG
+    jump = has_last & (history < MIN_HISTORY) & fast
+
+    out_of_range = (weights <= 0) | (weights > MAX_WEIGHT_KG)
+    flagged = (np.nan_to_num(score) > threshold) | jump
+    reference = np.where(history >= MIN_HISTORY, expected, weights[last])
+    motivo = np.where(
+        out_of_range,
+        Motivo.FUERA_DE_RANGO,
+        np.where(flagged, np.where(weights > reference, Motivo.SUBIDA, Motivo.CAIDA), ""),
+    )
+    return AnomalyScores(score, np.where(history > 0, expected, np.nan), motivo)
+
+
+def _anomaly(peso_id: int, scores: AnomalyScores, index: int) -> PesoAnomaly:
+    score, expected = scores.score[index], scores.expected[index]
+    return PesoAnomaly(
+        peso_id=peso_id,
+        motivo=str(scores.motivo[index]),
+        score=0.0 if np.isnan(score) else round(float(score), 2),
+        esperado=None if np.isnan(expected) else round(float(expected), 2),
+    )
+
+
+def score_reading(peso: Peso) -> PesoAnomaly | None:
+    """Evalúa un pesaje contra los anteriores de su animal y guarda o borra su marca."""
+    history = list(
+        Peso.objects.filter(animal_id=peso.animal_id, fecha__lt=peso.fecha)
+        .exclude(pk=peso.pk)
+        .order_by("-fecha")
+        .values_list("fecha", "peso")[:get_window()]
+    )
+    history.append((peso.fecha, peso.peso))
+    series = WeightSeries.from_arrays(
+        np.zeros(len(history)),
+        [fecha.timestamp() / SECONDS_PER_DAY for fecha, _ in history],
+        [float(value) for _, value in history],
+    )
+    scores = score_series(series)
+    index = len(series) - 1  # el pesaje evaluado es el más reciente de la serie
+    if not scores.motivo[index]:
+        PesoAnomaly.objects.filter(peso_id=peso.pk).delete()
+        return None
+    anomaly = _anomaly(peso.pk, scores, index)
+    PesoAnomaly.objects.update_or_create(
+        peso_id=peso.pk,
+        defaults={"motivo": anomaly.motivo, "score": anomaly.score, "esperado": anomaly.esperado},
+    )
+    return anomaly
+
+
+def rescore_following(animal_id: int, fecha) -> int:
+    """Recalcula las marcas de los ``window`` pesajes posteriores a ``fecha``.
+
+    Su ventana incluía el pesaje insertado, editado o borrado en ``fecha``; se
+    leen con los ``window`` anteriores, que bastan para la ventana de todos.
+    Retorna cuántos quedaron marcados.
+    """
+    window = get_window()
+    readings = Peso.objects.filter(animal_id=animal_id).values_list("pk", "fecha", "peso")
+    following = list(readings.filter(fecha__gt=fecha).order_by("fecha", "pk")[:window])
+    if not following:
+        return 0
+    rows = list(readings.filter(fecha__lte=fecha).order_by("-fecha", "-pk")[:window]) + following
+    series = WeightSeries.from_arrays(
+        np.zeros(len(rows)),
+        [moment.timestamp() / SECONDS_PER_DAY for _, moment, _ in rows],
+        [float(value) for _, _, value in rows],
+        ids=[pk for pk, _, _ in rows],
+    )
+    scores = score_series(series, window)
+    targets = {pk for pk, _, _ in following}
+    anomalies = [
+        _anomaly(int(series.ids[index]), scores, index)
+        for index in np.flatnonzero(scores.motivo != "")
+        if int(series.ids[index]) in targets
+    ]
+    with transaction.atomic():
+        PesoAnomaly.objects.filter(peso_id__in=targets).delete()
+        PesoAnomaly.objects.bulk_create(anomalies)
+    return len(anomalies)
+
+
+def detect_anomalies(pesos: QuerySet[Peso]) -> int:
+    """Recalcula las marcas de los animales con pesajes en ``pesos``; retorna cuántas quedaron."""
+    animal_ids = list(pesos.order_by("animal_id").values_list("animal_id", flat=True).distinct())
+    flagged = 0
+    for start in range(0, len(animal_ids), DETECT_CHUNK):
+        chunk = animal_ids[start:start + DETECT_CHUNK]
+        series = WeightSeries.from_queryset(Peso.objects.filter(animal_id__in=chunk), with_ids=True)
+        scores = score_series(series)
+        anomalies = [
+            _anomaly(int(series.ids[index]), scores, index)
+            for index in np.flatnonzero(scores.motivo != "")
+        ]
+        with transaction.atomic():
+            PesoAnomaly.objects.filter(peso__animal_id__in=chunk).delete()
+            PesoAnomaly.objects.bulk_create(anomalies)
+        flagged += len(anomalies)
+    return flagged
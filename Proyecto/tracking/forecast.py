@@ -0,0 +1,262 @@
+"""Ajuste de curvas de crecimiento y fecha proyectada al peso de venta.
+
+Cada animal con al menos ``MIN_POINTS_CURVE`` pesajes repartidos en
+``MIN_SPAN_DAYS`` días se ajusta a von Bertalanffy::
+
+    peso(edad) = (a - b·e^(-k·edad))³
+
+Con ``k`` fijo, la raíz cúbica del peso es lineal en ``e^(-k·edad)``, así que el
+ajuste recorre una grilla de ``k`` y resuelve por mínimos cuadrados cerrados
+todas las combinaciones animal × k a la vez, con sumas por segmento sobre la
+serie empaquetada de `tracking.timeseries`. Los animales con pocos datos, o
+cuya curva no tiene sentido (asíntota por debajo del último peso), quedan con
+una recta ``a + b·edad``.
+
+Los parámetros se guardan en :class:`tracking.models.GrowthFit`, también para
+los animales con menos de dos pesajes (``modelo`` vacío) para no reintentarlos.
+Las señales borran el ajuste de un animal cuando cambian sus pesajes o su
+nacimiento, y `refresh_fits` solo ajusta los animales sin ajuste vigente; lo
+corre el worker (`tracking.tasks.refresh_growth_fits`), nunca el request. La
+proyección lee los parámetros y resuelve la curva inversa en NumPy, sin tocar
+los pesajes.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+import numpy as np
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from animals.models import Animal
+
+from .models import GrowthFit, Peso
+from .timeseries import WeightSeries
+
+MIN_POINTS_CURVE = 4
+MIN_SPAN_DAYS = 60
+K_GRID = np.geomspace(2e-4, 2e-2, 64)
+FIT_CHUNK = 500  # animales por bloque: el ajuste usa matrices pesaje × k
+
+EPOCH = date(1970, 1, 1)
+Modelo = GrowthFit.Modelo
+
+
+def get_target_weight() -> float:
+    return float(getattr(settings, "SALE_WEIGHT_KG", 450))
+
+
+def _segment_sums(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Suma por animal de un arreglo (pesajes,) o (pesajes, k)."""
+    return np.add.reduceat(values, starts[:-1], axis=0)
+
+
+def _least_squares(x: np.ndarray, y: np.ndarray, starts: np.ndarray):
+    """Recta ``y = a + beta·x`` por animal (y por columna de ``x``); retorna a, beta y SSE."""
+    if x.ndim == 2:
+        y = y[:, None]
+    n = np.diff(starts).astype(float)
+    if x.ndim == 2:
+        n = n[:, None]
+    sx, sy = _segment_sums(x, starts), _segment_sums(np.broadcast_to(y, x.shape), starts)
+    sxx, sxy = _segment_sums(x * x, starts), _segment_sums(x * y, starts)
+    syy = _segment_sums(np.broadcast_to(y * y, x.shape), starts)
+    denominator = n * sxx - sx * sx
+    beta = np.divide(
+        n * sxy - sx * sy, denominator, out=np.zeros_like(sx), where=np.abs(denominator) > 1e-12
+    )
+    a = (sy - beta * sx) / n
+    sse = syy - a * sy - beta * sxy
+    return a, beta, sse
+
+
+@dataclass
+class FitResult:
+    animal_ids: np.ndarray
+    modelo: np.ndarray  # Modelo.* por animal; "" sin ajuste
+    a: np.ndarray
+    b: np.ndarray
+    k: np.ndarray
+    rmse: np.ndarray
+    puntos: np.ndarray
+    last_day: np.ndarray
+    last_weight: np.ndarray
+
+
+def predict(modelo: np.ndarray, a, b, k, age: np.ndarray) -> np.ndarray:
+    curve = np.maximum(a - b * np.exp(-k * age), 0) ** 3
+    return np.where(modelo == Modelo.BERTALANFFY, curve, a + b * age)
+
+
+def fit_series(series: WeightSeries, birth_days: np.ndarray) -> FitResult:
+    """Ajusta todos los animales de ``series``; ``birth_days`` en días desde la época."""
+    animals = len(series.animal_ids)
+    counts = np.diff(series.starts)
+    group = series.group
+    age = series.days - birth_days[group]
+    first, last = series.starts[:-1], series.last_index()
+    span = age[last] - age[first]
+
+    # Recta sobre el peso: respaldo para todos
+    line_a, line_b, _ = _least_squares(age, series.weights, series.starts)
+
+    # Bertalanffy: recta sobre la raíz cúbica para cada k de la grilla
+    cube = np.cbrt(series.weights)
+    curve_a, beta, sse = _least_squares(np.exp(-np.outer(age, K_GRID)), cube, series.starts)
+    best = np.argmin(np.where(np.isfinite(sse), sse, np.inf), axis=1)
+    rows = np.arange(animals)
+    curve_a, curve_b, curve_k = curve_a[rows, best], -beta[rows, best], K_GRID[best]
+
+    curve_ok = (
+        (counts >= MIN_POINTS_CURVE)
+        & (span >= MIN_SPAN_DAYS)
+        & (curve_b > 0)
+        & (curve_a**3 > series.weights[last])
+    )
+    modelo = np.where(curve_ok, Modelo.BERTALANFFY, np.where(counts >= 2, Modelo.LINEAR, ""))
+    a = np.where(curve_ok, curve_a, line_a)
+    b = np.where(curve_ok, curve_b, line_b)
+    k = np.where(curve_ok, curve_k, 0.0)
+
+    residuals = series.weights - predict(modelo[group], a[group], b[group], k[group], age)
+    rmse = np.sqrt(_segment_sums(residuals**2, series.starts) / counts)
+    return FitResult(
+        series.animal_ids, modelo, a, b, k, rmse, counts, series.days[last], series.weights[last]
+    )
+
+
+def _epoch_days(value: date) -> int:
+    return (value - EPOCH).days
+
+
+def _fit_row(result: FitResult, index: int) -> GrowthFit:
+    fitted = bool(result.modelo[index])
+    return GrowthFit(
+        animal_id=int(result.animal_ids[index]),
+        modelo=str(result.modelo[index]),
+        a=float(result.a[index]) if fitted else 0.0,
+        b=float(result.b[index]) if fitted else 0.0,
+        k=float(result.k[index]),
+        rmse=float(result.rmse[index]) if fitted else 0.0,
+        puntos=int(result.puntos[index]),
+        ultimo_pesaje=datetime.fromtimestamp(result.last_day[index] * 86400, tz=UTC),
+        ultimo_peso=float(result.last_weight[index]),
+    )
+
+
+def refresh_fits(animals: QuerySet[Animal], force: bool = False) -> int:
+    """Ajusta los animales sin ajuste vigente (o todos con ``force``); retorna cuántos ajustó.
+
+    Los que no tienen pesajes suficientes quedan con un ajuste sin modelo.
+    """
+    if not force:
+        animals = animals.filter(ajuste_crecimiento__isnull=True)
+    pending = list(animals.order_by("pk").values_list("pk", "fecha_de_nacimiento"))
+    saved = 0
+    for start in range(0, len(pending), FIT_CHUNK):
+        chunk = dict(pending[start:start + FIT_CHUNK])
+        series = WeightSeries.from_queryset(Peso.objects.filter(animal_id__in=list(chunk)))
+        birth = np.array([_epoch_days(chunk[int(pk)]) for pk in series.animal_ids], dtype=float)
+        result = fit_series(series, birth) if len(series) else None
+        fits = [_fit_row(result, index) for index in range(len(series.animal_ids))]
+        weighed = set(series.animal_ids.tolist())
+        fits += [
+            GrowthFit(animal_id=pk, modelo=Modelo.SIN_DATOS, a=0, b=0, rmse=0, puntos=0)
+            for pk in chunk
+            if pk not in weighed
+        ]
+        GrowthFit.objects.bulk_create(
+            fits,
+            update_conflicts=True,
+            unique_fields=["animal"],
+            update_fields=[
+                "modelo", "a", "b", "k", "rmse", "puntos", "ultimo_pesaje", "ultimo_peso"
+            ],
+        )
+        saved += sum(bool(fit.modelo) for fit in fits)
+    return saved
+
+
+def target_ages(modelo: np.ndarray, a, b, k, target: float) -> np.ndarray:
+    """Edad en días a la que la curva llega a ``target`` (inf si nunca llega)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (a - np.cbrt(target)) / b
+        curve = np.where((ratio > 0) & (k > 0), -np.log(ratio) / k, np.inf)
+        line = np.where(b > 0, (target - a) / b, np.inf)
+    return np.where(modelo == Modelo.BERTALANFFY, curve, line)
+
+
+@dataclass
+class LoteForecast:
+    objetivo: float
+    animales: list[dict[str, Any]]
+    alcanzados: int
+    sin_proyeccion: int
+    fecha_mediana: date | None
+    fecha_ultimo: date | None
+    pendientes: int = 0  # animales sin ajuste vigente, a la espera del worker
+
+
+def forecast_animals(
+    animals: QuerySet[Animal], target: float | None = None, today: date | None = None
+):
+    """Fecha proyectada a ``target`` kg por animal y resumen del grupo según los ajustes."""
+    target = target or get_target_weight()
+    today = today or timezone.localdate()
+    rows = list(
+        GrowthFit.objects.filter(animal__in=animals)
+        .exclude(modelo=Modelo.SIN_DATOS)
+        .order_by("animal__codigo", "animal_id")
+        .values_list(
+            "animal_id", "animal__codigo", "animal__fecha_de_nacimiento", "modelo",
+            "a", "b", "k", "rmse", "ultimo_peso", "ultimo_pesaje",
+        )
+    )
+    if not rows:
+        return LoteForecast(target, [], 0, 0, None, None)
+
+    columns = list(zip(*rows, strict=True))
+    birth = np.array([_epoch_days(born) for born in columns[2]], dtype=float)
+    modelo = np.array(columns[3])
+    a, b, k, rmse, last_weight = (np.array(values, dtype=float) for values in columns[4:9])
+    days = birth + target_ages(modelo, a, b, k, target)
+    reached = last_weight >= target
+    # Lo ya alcanzado o lo que la curva da por pasado sin haberse pesado cuenta desde hoy
+    days = np.where(reached, _epoch_days(today), np.maximum(days, _epoch_days(today)))
+
+    animales = []
+    for index, (animal_id, codigo, *_rest, ultimo_pesaje) in enumerate(rows):
+        finite = np.isfinite(days[index])
+        animales.append({
+            "animal_id": animal_id,
+            "codigo": codigo or f"#{animal_id}",
+            "modelo": str(modelo[index]),
+            "ultimo_peso": round(float(last_weight[index]), 1),
+            "ultimo_pesaje": ultimo_pesaje,
+            "rmse": round(float(rmse[index]), 1),
+            "alcanzado": bool(reached[index]),
+            "fecha": EPOCH + timedelta(days=int(days[index])) if finite else None,
+        })
+    finite = np.isfinite(days)
+    median = np.median(days)
+    return LoteForecast(
+        objetivo=target,
+        animales=animales,
+        alcanzados=int(reached.sum()),
+        sin_proyeccion=int((~finite).sum()),
+        fecha_mediana=EPOCH + timedelta(days=int(median)) if np.isfinite(median) else None,
+        fecha_ultimo=EPOCH + timedelta(days=int(days.max())) if finite.all() else None,
+    )
+
+
+def forecast_lote(
+    batch_id: int, target: float | None = None, today: date | None = None
+) -> LoteForecast:
+    """Proyección del lote con los ajustes guardados; los que faltan los ajusta el worker."""
+    animals = Animal.objects.filter(batch_id=batch_id)
+    forecast = forecast_animals(animals, target, today)
+    forecast.pendientes = animals.filter(ajuste_crecimiento__isnull=True).count()
+    return forecast
@@ -28,7 +28,7 @@ class BaseTrackingForm(forms.ModelForm):
         if not self.user:
             return Animal.objects.none()
         return (
-            Animal.objects.filter(batch__usuario=self.user)
+            Animal.objects.filter(batch__usuario=self.user, batch__is_active=True)
             .select_related("batch")
             .order_by("codigo", "especie")
         )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracking.anomalies import detect_anomalies
+from tracking.models import Peso
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las marcas de pesajes anómalos sobre toda la historia "
+        "(o solo de los lotes indicados con --batch)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, action="append", dest="batches")
+
+    def handle(self, *args, **options):
+        pesos = Peso.objects.all()
+        if options["batches"]:
+            pesos = pesos.filter(animal__batch_id__in=options["batches"])
+        start = time.perf_counter()
+        flagged = detect_anomalies(pesos)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{flagged} pesajes marcados en {elapsed:.1f} s."))
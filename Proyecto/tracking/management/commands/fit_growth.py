@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from animals.models import Animal
+from tracking.forecast import refresh_fits
+
+
+class Command(BaseCommand):
+    help = (
+        "Ajusta las curvas de crecimiento de los animales sin ajuste vigente (o de todos "
+        "con --force) para que la proyección responda solo con los parámetros guardados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, action="append", dest="batches")
+        parser.add_argument("--force", action="store_true", help="Reajusta también los vigentes.")
+
+    def handle(self, *args, **options):
+        animals = Animal.objects.all()
+        if options["batches"]:
+            animals = animals.filter(batch_id__in=options["batches"])
+        start = time.perf_counter()
+        saved = refresh_fits(animals, force=options["force"])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{saved} curvas ajustadas en {elapsed:.1f} s."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('animals', '0003_animal_codigo'),
+        ('tracking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrowthFit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('bertalanffy', 'von Bertalanffy'), ('linear', 'Lineal')], max_length=12)),
+                ('a', models.FloatField()),
+                ('b', models.FloatField()),
+                ('k', models.FloatField(default=0)),
+                ('rmse', models.FloatField(help_text='Error cuadrático medio en kg')),
+                ('puntos', models.PositiveIntegerField()),
+                ('ultimo_pesaje', models.DateTimeField()),
+                ('ultimo_peso', models.FloatField()),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('animal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ajuste_crecimiento', to='animals.animal')),
+            ],
+            options={
+                'verbose_name': 'Ajuste de crecimiento',
+                'verbose_name_plural': 'Ajustes de crecimiento',
+            },
+        ),
+    ]
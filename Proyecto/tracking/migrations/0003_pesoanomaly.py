@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0002_growthfit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PesoAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('motivo', models.CharField(choices=[('subida', 'Subida brusca'), ('caida', 'Caída brusca'), ('fuera_de_rango', 'Fuera de rango')], max_length=15)),
+                ('score', models.FloatField(help_text='Desviación robusta (MAD) frente al peso esperado')),
+                ('esperado', models.FloatField(blank=True, help_text='Peso esperado en kg', null=True)),
+                ('detectado', models.DateTimeField(auto_now=True)),
+                ('peso', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='anomalia', to='tracking.peso')),
+            ],
+            options={
+                'verbose_name': 'Pesaje anómalo',
+                'verbose_name_plural': 'Pesajes anómalos',
+                'ordering': ['-detectado'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0003_pesoanomaly'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='growthfit',
+            name='modelo',
+            field=models.CharField(blank=True, choices=[('bertalanffy', 'von Bertalanffy'), ('linear', 'Lineal'), ('', 'Datos insuficientes')], max_length=12),
+        ),
+        migrations.AlterField(
+            model_name='growthfit',
+            name='ultimo_pesaje',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='growthfit',
+            name='ultimo_peso',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
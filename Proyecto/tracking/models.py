@@ -17,6 +17,13 @@ class Peso(models.Model):
     def __str__(self) -> str:
         return f"{self.animal} - {self.peso} kg ({self.fecha:%Y-%m-%d})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Fecha original: al moverla, las marcas de los pesajes siguientes cambian
+        instance._loaded_values = {"fecha": instance.__dict__.get("fecha")}
+        return instance
+
 
 class Produccion(models.Model):
     animal = models.ForeignKey(Animal, on_delete=models.CASCADE, related_name="registros_produccion")
@@ -31,3 +38,65 @@ class Produccion(models.Model):
 
     def __str__(self) -> str:
         return f"{self.animal} - {self.tipo}: {self.cantidad}"
+
+
+class GrowthFit(models.Model):
+    """Curva de crecimiento ajustada a los pesajes de un animal (ver tracking.forecast).
+
+    Bertalanffy: ``peso = (a - b·e^(-k·edad))³``; lineal: ``peso = a + b·edad``,
+    con la edad en días. Se borra cuando cambian los pesajes o el nacimiento del
+    animal y el worker lo vuelve a ajustar (`tracking.tasks.refresh_growth_fits`).
+    Un animal con menos de dos pesajes queda con ``modelo`` vacío para no
+    reintentar el ajuste hasta que llegue un pesaje nuevo.
+    """
+
+    class Modelo(models.TextChoices):
+        BERTALANFFY = ("bertalanffy", "von Bertalanffy")
+        LINEAR = ("linear", "Lineal")
+        SIN_DATOS = ("", "Datos insuficientes")
+
+    animal = models.OneToOneField(
+        Animal, on_delete=models.CASCADE, related_name="ajuste_crecimiento"
+    )
+    modelo = models.CharField(max_length=12, choices=Modelo.choices, blank=True)
+    a = models.FloatField()
+    b = models.FloatField()
+    k = models.FloatField(default=0)
+    rmse = models.FloatField(help_text="Error cuadrático medio en kg")
+    puntos = models.PositiveIntegerField()
+    ultimo_pesaje = models.DateTimeField(null=True, blank=True)
+    ultimo_peso = models.FloatField(null=True, blank=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Ajuste de crecimiento"
+        verbose_name_plural = "Ajustes de crecimiento"
+
+    def __str__(self) -> str:
+        return f"{self.animal} - {self.get_modelo_display()} (RMSE {self.rmse:.1f} kg)"
+
+
+class PesoAnomaly(models.Model):
+    """Pesaje marcado como anómalo frente a la historia reciente del animal.
+
+    Ver tracking.anomalies.
+    """
+
+    class Motivo(models.TextChoices):
+        SUBIDA = ("subida", "Subida brusca")
+        CAIDA = ("caida", "Caída brusca")
+        FUERA_DE_RANGO = ("fuera_de_rango", "Fuera de rango")
+
+    peso = models.OneToOneField(Peso, on_delete=models.CASCADE, related_name="anomalia")
+    motivo = models.CharField(max_length=15, choices=Motivo.choices)
+    score = models.FloatField(help_text="Desviación robusta (MAD) frente al peso esperado")
+    esperado = models.FloatField(null=True, blank=True, help_text="Peso esperado en kg")
+    detectado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Pesaje anómalo"
+        verbose_name_plural = "Pesajes anómalos"
+        ordering = ["-detectado"]
+
+    def __str__(self) -> str:
+        return f"{self.peso} - {self.get_motivo_display()} ({self.score:.1f})"
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from animals.models import Animal
+
+from .anomalies import rescore_following, score_reading
+from .models import GrowthFit, Peso
+
+
+@receiver(post_save, sender=Peso)
+@receiver(post_delete, sender=Peso)
+def expire_growth_fit(sender, instance: Peso, raw=False, origin=None, **kwargs):
+    """Un pesaje nuevo, editado o borrado obliga a reajustar la curva del animal."""
+    if raw or (origin is not None and origin is not instance):
+        return
+    GrowthFit.objects.filter(animal_id=instance.animal_id).delete()
+
+
+@receiver(pre_save, sender=Animal)
+def expire_growth_fit_on_birth_change(sender, instance: Animal, raw=False, **kwargs):
+    previous = getattr(instance, "_loaded_values", None)
+    if not raw and previous and previous["fecha_de_nacimiento"] != instance.fecha_de_nacimiento:
+        GrowthFit.objects.filter(animal_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Peso)
+def score_weight_anomaly(sender, instance: Peso, created=False, raw=False, **kwargs):
+    """Marca el pesaje si se sale de la historia reciente del animal (ver tracking.anomalies).
+
+    Los pesajes siguientes lo tienen en su ventana: se reevalúan en la fecha
+    nueva y, si el pesaje se movió, también en la anterior.
+    """
+    if raw:
+        return
+    score_reading(instance)
+    rescore_following(instance.animal_id, instance.fecha)
+    previous = getattr(instance, "_loaded_values", {}).get("fecha")
+    if previous is not None and previous != instance.fecha:
+        rescore_following(instance.animal_id, previous)
+    instance._loaded_values = {"fecha": instance.fecha}
+
+
+@receiver(post_delete, sender=Peso)
+def rescore_after_deletion(sender, instance: Peso, origin=None, **kwargs):
+    # En un borrado en cascada (animal o lote) desaparecen también los pesajes siguientes
+    if origin is not None and origin is not instance and getattr(origin, "model", None) is not Peso:
+        return
+    rescore_following(instance.animal_id, instance.fecha)
@@ -0,0 +1,10 @@
+from animals.models import Animal
+from jobs.queue import task
+
+from .forecast import refresh_fits
+
+
+@task(timeout=1800)
+def refresh_growth_fits() -> int:
+    """Ajusta las curvas de crecimiento de los animales sin ajuste vigente."""
+    return refresh_fits(Animal.objects.all())
@@ -1,6 +1,7 @@
 from datetime import date
 from decimal import Decimal
 
+import numpy as np
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
@@ -8,9 +9,22 @@ from django.utils import timezone
 
 from animals.models import Animal
 from batches.models import Batch
+from jobs.models import Job
+from jobs.queue import claim, run_job
 
+from .anomalies import detect_anomalies, score_series
+from .forecast import forecast_animals, refresh_fits
 from .forms import PesoForm, ProduccionForm
-from .models import Peso, Produccion
+from .models import GrowthFit, Peso, PesoAnomaly, Produccion
+from .timeseries import (
+    WeightSeries,
+    herd_adg,
+    interval_adg,
+    percentile_rank,
+    rolling_adg,
+    summarize,
+    synthetic_series,
+)
 
 User = get_user_model()
 
@@ -599,6 +613,24 @@ class PesoViewTests(TestCase):
         self.assertContains(response, "450.00")
         self.assertNotContains(response, "300.00")
 
+    def test_peso_list_stats_share_one_count_with_paginator(self):
+        for day in range(1, 14):
+            Peso.objects.create(
+                animal=self.animal,
+                fecha=timezone.make_aware(timezone.datetime(2024, 2, day, 8, 0)),
+                peso=Decimal("460.00")
+            )
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("tracking:peso-list"), {"page": 2})
+
+        stats = response.context["stats"]
+        self.assertEqual(stats["total"], 14)
+        self.assertEqual(response.context["paginator"].count, 14)
+        self.assertEqual(stats["latest"].fecha.day, 13)
+        self.assertEqual(stats["last_date"], stats["latest"].fecha)
+        self.assertAlmostEqual(float(stats["avg"]), 459.29, places=2)
+
     def test_peso_create_requires_login(self):
         response = self.client.get(reverse("tracking:peso-create"))
 
@@ -896,3 +928,283 @@ class ProduccionViewTests(TestCase):
         self.assertTrue(
             Produccion.objects.filter(pk=self.produccion.pk).exists()
         )
+
+
+class WeightTimeSeriesTests(TestCase):
+    def series(self):
+        # Animal 7: 100 → 110 en 10 días → 140 en 20 días; animal 3: un solo pesaje
+        return WeightSeries.from_arrays(
+            [7, 3, 7, 7], [110.0, 50.0, 100.0, 130.0], [110, 300, 100, 140]
+        )
+
+    def test_from_arrays_groups_by_animal_and_date(self):
+        series = self.series()
+
+        self.assertEqual(series.animal_ids.tolist(), [3, 7])
+        self.assertEqual(series.starts.tolist(), [0, 1, 4])
+        self.assertEqual(series.weights.tolist(), [300, 100, 110, 140])
+
+    def test_interval_and_rolling_adg_stay_within_each_animal(self):
+        series = self.series()
+
+        np.testing.assert_allclose(interval_adg(series), [np.nan, np.nan, 1.0, 1.5])
+        # A 25 días el último pesaje se compara con el del día 110, no con el del día 100
+        np.testing.assert_allclose(rolling_adg(series, 25), [np.nan, np.nan, 1.0, 1.5])
+        np.testing.assert_allclose(rolling_adg(series, 30), [np.nan, np.nan, 1.0, 40 / 30])
+
+    def test_percentile_rank_ignores_missing_values(self):
+        ranks = percentile_rank(np.array([0.5, np.nan, 0.9, 0.5]))
+
+        np.testing.assert_allclose(ranks, [100 / 3, np.nan, 500 / 6, 100 / 3])
+
+    def test_summary_matches_a_per_animal_loop(self):
+        from tracking.management.commands.benchmark_adg import naive_summary
+
+        series = synthetic_series(40, 1, every_days=10, seed=3)
+        summary = summarize(series)
+        expected = naive_summary(series, (30, 90))
+
+        for index, animal_id in enumerate(series.animal_ids):
+            gains, rolling = expected[int(animal_id)]
+            start, end = series.starts[index], series.starts[index + 1]
+            np.testing.assert_allclose(interval_adg(series)[start + 1:end], gains)
+            self.assertAlmostEqual(summary.rolling[30][index], rolling[30])
+            self.assertAlmostEqual(summary.rolling[90][index], rolling[90])
+
+    def test_herd_adg_reads_weights_in_one_query(self):
+        user = User.objects.create_user(username="adg", password="testpass123")
+        batch = Batch.objects.create(nombre="Ceba", usuario=user)
+        animal = Animal.objects.create(
+            batch=batch, codigo="ADG-1", especie="Vaca", sexo="M",
+            fecha_de_nacimiento=date(2023, 1, 1),
+        )
+        start = timezone.make_aware(timezone.datetime(2024, 1, 1, 8, 0))
+        for days, peso in [(0, 200), (30, 221), (60, 245)]:
+            Peso.objects.create(
+                animal=animal, fecha=start + timezone.timedelta(days=days), peso=Decimal(peso)
+            )
+
+        with self.assertNumQueries(1):
+            rows = herd_adg(Peso.objects.filter(animal__batch=batch)).to_rows()
+
+        self.assertEqual(
+            rows,
+            [{
+                "animal_id": animal.pk, "peso": 245.0, "gdp": 0.75, "gdp_30": 0.8,
+                "gdp_90": 0.75, "percentil": 50.0,
+            }],
+        )
+        self.assertEqual(herd_adg(Peso.objects.none()).to_rows(), [])
+
+
+class GrowthForecastTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="ceba", password="testpass123")
+        self.batch = Batch.objects.create(nombre="Ceba", usuario=self.user)
+        self.birth = date(2023, 1, 1)
+
+    def add_animal(self, codigo, weighings):
+        animal = Animal.objects.create(
+            batch=self.batch, codigo=codigo, especie="Vaca", sexo="M",
+            fecha_de_nacimiento=self.birth,
+        )
+        start = timezone.make_aware(timezone.datetime(2023, 1, 1, 12, 0))
+        for age, peso in weighings:
+            fecha = start + timezone.timedelta(days=age)
+            Peso.objects.create(animal=animal, fecha=fecha, peso=Decimal(str(round(peso, 2))))
+        return animal
+
+    @staticmethod
+    def bertalanffy(age, asymptote=600.0, b=0.6, k=0.004):
+        return (asymptote ** (1 / 3) * (1 - b * np.exp(-k * age))) ** 3
+
+    def test_fits_bertalanffy_and_projects_target_date(self):
+        ages = range(60, 420, 30)
+        animal = self.add_animal("C-1", [(age, self.bertalanffy(age)) for age in ages])
+
+        self.assertEqual(refresh_fits(Animal.objects.filter(batch=self.batch)), 1)
+        fit = GrowthFit.objects.get(animal=animal)
+        self.assertEqual(fit.modelo, GrowthFit.Modelo.BERTALANFFY)
+        self.assertAlmostEqual(fit.a**3, 600, delta=15)
+        self.assertLess(fit.rmse, 1)
+
+        animals = Animal.objects.filter(batch=self.batch)
+        forecast = forecast_animals(animals, target=450, today=date(2024, 3, 1))
+        expected_age = -np.log((1 - (450 / 600) ** (1 / 3)) / 0.6) / 0.004
+        projected = forecast.animales[0]["fecha"]
+        self.assertAlmostEqual((projected - self.birth).days, expected_age, delta=10)
+        self.assertEqual(forecast.fecha_mediana, projected)
+
+    def test_few_weighings_fall_back_to_a_line(self):
+        self.add_animal("C-2", [(100, 150), (130, 180)])
+        self.add_animal("C-3", [(100, 150)])
+
+        refresh_fits(Animal.objects.filter(batch=self.batch))
+        animals = Animal.objects.filter(batch=self.batch)
+        forecast = forecast_animals(animals, target=200, today=date(2023, 1, 1))
+
+        self.assertEqual(
+            dict(GrowthFit.objects.values_list("animal__codigo", "modelo")),
+            {"C-2": GrowthFit.Modelo.LINEAR, "C-3": GrowthFit.Modelo.SIN_DATOS},
+        )
+        self.assertEqual(len(forecast.animales), 1)
+        self.assertEqual(forecast.animales[0]["fecha"], self.birth + timezone.timedelta(days=150))
+
+    def test_animals_without_enough_weighings_are_not_refitted(self):
+        self.add_animal("C-8", [(100, 150)])
+        self.add_animal("C-9", [])
+
+        self.assertEqual(refresh_fits(Animal.objects.filter(batch=self.batch)), 0)
+        self.assertEqual(GrowthFit.objects.filter(modelo="").count(), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(refresh_fits(Animal.objects.filter(batch=self.batch)), 0)
+
+    def test_new_weighing_expires_only_that_fit(self):
+        first = self.add_animal("C-4", [(100, 150), (130, 180)])
+        second = self.add_animal("C-5", [(100, 150), (130, 170)])
+        refresh_fits(Animal.objects.filter(batch=self.batch))
+
+        Peso.objects.create(animal=first, fecha=timezone.now(), peso=Decimal("300"))
+
+        self.assertEqual(list(GrowthFit.objects.values_list("animal", flat=True)), [second.pk])
+        with self.assertNumQueries(1):
+            self.assertEqual(refresh_fits(Animal.objects.filter(pk=second.pk)), 0)
+
+    def test_forecast_view_reads_cached_fits(self):
+        self.add_animal("C-6", [(age, self.bertalanffy(age)) for age in range(60, 420, 30)])
+        refresh_fits(Animal.objects.filter(batch=self.batch))
+        self.client.force_login(self.user)
+        url = reverse("tracking:forecast")
+
+        response = self.client.get(url, {"batch": self.batch.pk, "target": "450"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["forecast"].animales[0]["codigo"], "C-6")
+        with self.assertNumQueries(5):
+            self.client.get(url, {"batch": self.batch.pk})
+        self.assertFalse(Job.objects.exists())
+
+    def test_forecast_view_leaves_missing_fits_to_the_worker(self):
+        self.add_animal("C-10", [(100, 150), (130, 180)])
+        self.client.force_login(self.user)
+        url = reverse("tracking:forecast")
+
+        for _ in range(2):
+            response = self.client.get(url, {"batch": self.batch.pk})
+            self.assertEqual(response.context["forecast"].pendientes, 1)
+            self.assertEqual(response.context["forecast"].animales, [])
+        self.assertFalse(GrowthFit.objects.exists())
+        job = Job.objects.get()
+        self.assertEqual(job.task, "tracking.tasks.refresh_growth_fits")
+
+        self.assertTrue(run_job(claim("test")))
+        response = self.client.get(url, {"batch": self.batch.pk})
+        self.assertEqual(response.context["forecast"].pendientes, 0)
+        self.assertEqual(response.context["forecast"].animales[0]["codigo"], "C-10")
+
+    def test_forecast_view_ignores_unusable_targets(self):
+        self.client.force_login(self.user)
+        url = reverse("tracking:forecast")
+
+        for target in ("nan", "inf", "-inf", "0", "-50", "abc"):
+            with self.subTest(target=target):
+                response = self.client.get(url, {"batch": self.batch.pk, "target": target})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context["filters"]["target"], "450")
+
+    def test_every_birth_date_change_expires_the_fit(self):
+        animal = self.add_animal("C-7", [(100, 150), (130, 180)])
+        animal = Animal.objects.get(pk=animal.pk)
+
+        for birth in (date(2022, 12, 1), date(2022, 11, 1)):
+            refresh_fits(Animal.objects.filter(pk=animal.pk))
+            animal.fecha_de_nacimiento = birth
+            animal.save()
+            self.assertFalse(GrowthFit.objects.filter(animal=animal).exists())
+
+
+class WeightAnomalyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bascula", password="testpass123")
+        self.batch = Batch.objects.create(nombre="Ceba", usuario=self.user)
+        self.animal = Animal.objects.create(
+            batch=self.batch, codigo="A-1", especie="Vaca", sexo="M",
+            fecha_de_nacimiento=date(2023, 1, 1),
+        )
+        self.start = timezone.make_aware(timezone.datetime(2024, 1, 1, 8, 0))
+
+    def weigh(self, day, peso):
+        fecha = self.start + timezone.timedelta(days=day)
+        return Peso.objects.create(animal=self.animal, fecha=fecha, peso=Decimal(str(peso)))
+
+    def test_typo_is_flagged_on_insert_without_skewing_the_next_reading(self):
+        for month in range(6):
+            self.weigh(30 * month, 300 + 20 * month)
+
+        typo = self.weigh(180, 4200)
+        jump = self.weigh(210, 900)
+        normal = self.weigh(240, 441)
+
+        self.assertEqual(typo.anomalia.motivo, PesoAnomaly.Motivo.FUERA_DE_RANGO)
+        self.assertEqual(jump.anomalia.motivo, PesoAnomaly.Motivo.SUBIDA)
+        self.assertAlmostEqual(jump.anomalia.esperado, 440, delta=5)
+        self.assertFalse(PesoAnomaly.objects.filter(peso=normal).exists())
+
+    def test_sudden_drop_and_short_history(self):
+        self.weigh(0, 300)
+        early = self.weigh(10, 380)  # 8 kg/día con un solo pesaje previo
+        for month in range(1, 5):
+            self.weigh(30 * month, 300 + 20 * month)
+
+        drop = self.weigh(150, 330)
+
+        self.assertEqual(early.anomalia.motivo, PesoAnomaly.Motivo.SUBIDA)
+        self.assertEqual(drop.anomalia.motivo, PesoAnomaly.Motivo.CAIDA)
+        drop.peso = Decimal("398")
+        drop.save()
+        self.assertFalse(PesoAnomaly.objects.filter(peso=drop).exists())
+
+    def test_following_readings_are_rescored_when_one_changes(self):
+        self.weigh(0, 300)
+        later = self.weigh(30, 400)
+        self.assertFalse(PesoAnomaly.objects.filter(peso=later).exists())
+
+        backfill = self.weigh(29, 300)  # 100 kg en un día frente al pesaje siguiente
+        self.assertEqual(PesoAnomaly.objects.get(peso=later).motivo, PesoAnomaly.Motivo.SUBIDA)
+        Peso.objects.get(pk=backfill.pk).delete()
+        self.assertFalse(PesoAnomaly.objects.filter(peso=later).exists())
+
+        backfill = self.weigh(29, 300)
+        moved = Peso.objects.get(pk=backfill.pk)
+        moved.fecha = self.start + timezone.timedelta(days=31)
+        moved.save()
+        self.assertFalse(PesoAnomaly.objects.filter(peso=later).exists())
+        self.assertEqual(moved.anomalia.motivo, PesoAnomaly.Motivo.CAIDA)
+
+    def test_bulk_scan_matches_incremental_flags(self):
+        for month, peso in enumerate([300, 318, 342, 360, 120, 401, 420, 436]):
+            self.weigh(30 * month, peso)
+        incremental = set(PesoAnomaly.objects.values_list("peso_id", "motivo"))
+        PesoAnomaly.objects.all().delete()
+
+        self.assertEqual(detect_anomalies(Peso.objects.all()), 1)
+        self.assertEqual(set(PesoAnomaly.objects.values_list("peso_id", "motivo")), incremental)
+
+    def test_noisy_growth_has_few_false_positives(self):
+        series = synthetic_series(animals=500, years=2, seed=3)
+
+        scores = score_series(series)
+
+        self.assertLess((scores.motivo != "").mean(), 0.005)
+
+    def test_dashboard_excludes_flagged_readings(self):
+        from dashboard.services import DashboardStatsService
+
+        for month in range(4):
+            self.weigh(30 * month, 300 + 20 * month)
+        self.weigh(120, 3800)
+        service = DashboardStatsService(self.user)
+
+        self.assertEqual(service.get_tracking_stats()["kpis"]["peso_promedio"], 330)
+        with self.settings(DASHBOARD_EXCLUDE_ANOMALIES=False):
+            self.assertEqual(service.get_tracking_stats()["kpis"]["total_pesos"], 5)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 from datetime import datetime, date
 from typing import Any, Dict
 from urllib.parse import urlencode
@@ -8,13 +9,17 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Avg, QuerySet, Sum
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
+from django.views.generic import CreateView, DeleteView, ListView, TemplateView, UpdateView
 
 from animals.models import Animal
 from batches.models import Batch
+from core.exports import CsvExportMixin
+from core.lists import SummaryListMixin
 
+from .forecast import forecast_lote, get_target_weight
 from .forms import PesoForm, ProduccionForm
 from .models import Peso, Produccion
+from .tasks import refresh_growth_fits
 
 
 class AnimalOwnerQuerysetMixin(LoginRequiredMixin):
@@ -23,12 +28,12 @@ class AnimalOwnerQuerysetMixin(LoginRequiredMixin):
     def get_queryset(self) -> QuerySet:
         queryset = super().get_queryset()
         return queryset.filter(
-            animal__batch__usuario=self.request.user
+            animal__batch__usuario=self.request.user, animal__batch__is_active=True
         ).select_related(*self.select_related_fields)
 
     def get_user_animals(self) -> QuerySet[Animal]:
         return (
-            Animal.objects.filter(batch__usuario=self.request.user)
+            Animal.objects.filter(batch__usuario=self.request.user, batch__is_active=True)
             .select_related("batch")
             .order_by("codigo", "especie")
         )
@@ -40,7 +45,7 @@ class AnimalOwnerQuerysetMixin(LoginRequiredMixin):
         )
 
 
-class TrackingListView(AnimalOwnerQuerysetMixin, ListView):
+class TrackingListView(SummaryListMixin, AnimalOwnerQuerysetMixin, ListView):
     paginate_by = 12
 
     @staticmethod
@@ -137,6 +142,8 @@ class PesoListView(TrackingListView):
     template_name = "tracking/peso_list.html"
     context_object_name = "pesos"
     ordering = ("-fecha",)
+    query_budget = 7  # una más fuera de la página 1 para el registro más reciente
+    summary_aggregates = {"avg": Avg("peso")}
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -155,7 +162,6 @@ class PesoListView(TrackingListView):
         return queryset.order_by("-fecha")
 
     def get_context_data(self, **kwargs: Any):
-        full_queryset = self.object_list
         context = super().get_context_data(**kwargs)
         filters = {
             "batch": self.request.GET.get("batch", ""),
@@ -166,11 +172,7 @@ class PesoListView(TrackingListView):
         context.update(self.build_filter_context(filters))
         context["filters"] = filters
         context["filters_query"] = urlencode({k: v for k, v in filters.items() if v})
-        context["stats"] = {
-            "total": full_queryset.count(),
-            "avg": full_queryset.aggregate(avg=Avg("peso"))["avg"],
-            "latest": full_queryset.first(),
-        }
+        context["stats"] = {**self.get_summary(), "latest": self.get_latest(context)}
         return context
 
 
@@ -179,6 +181,8 @@ class ProduccionListView(TrackingListView):
     template_name = "tracking/produccion_list.html"
     context_object_name = "producciones"
     ordering = ("-fecha",)
+    query_budget = 7  # una más fuera de la página 1 para el registro más reciente
+    summary_aggregates = {"sum": Sum("cantidad")}
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -200,7 +204,6 @@ class ProduccionListView(TrackingListView):
         return queryset.order_by("-fecha")
 
     def get_context_data(self, **kwargs: Any):
-        full_queryset = self.object_list
         context = super().get_context_data(**kwargs)
         filters = {
             "batch": self.request.GET.get("batch", ""),
@@ -212,14 +215,34 @@ class ProduccionListView(TrackingListView):
         context.update(self.build_filter_context(filters))
         context["filters"] = filters
         context["filters_query"] = urlencode({k: v for k, v in filters.items() if v})
-        context["stats"] = {
-            "total": full_queryset.count(),
-            "sum": full_queryset.aggregate(total=Sum("cantidad"))["total"],
-            "latest": full_queryset.first(),
-        }
+        context["stats"] = {**self.get_summary(), "latest": self.get_latest(context)}
         return context
 
 
+class PesoExportView(CsvExportMixin, PesoListView):
+    export_filename = "pesos"
+    export_fields = [
+        ("Fecha", "fecha"),
+        ("Lote", "animal__batch__nombre"),
+        ("Animal", "animal__codigo"),
+        ("Especie", "animal__especie"),
+        ("Peso (kg)", "peso"),
+        ("Notas", "notas"),
+    ]
+
+
+class ProduccionExportView(CsvExportMixin, ProduccionListView):
+    export_filename = "producciones"
+    export_fields = [
+        ("Fecha", "fecha"),
+        ("Lote", "animal__batch__nombre"),
+        ("Animal", "animal__codigo"),
+        ("Especie", "animal__especie"),
+        ("Tipo", "tipo"),
+        ("Cantidad", "cantidad"),
+    ]
+
+
 class PesoCreateView(TrackingFormViewMixin, CreateView):
     model = Peso
     form_class = PesoForm
@@ -280,3 +303,40 @@ class ProduccionDeleteView(TrackingDeleteViewMixin, DeleteView):
     list_url_name = "tracking:produccion-list"
     success_message = "Registro de producción eliminado."
     entity_label = "registro de producción"
+
+
+class GrowthForecastView(AnimalOwnerQuerysetMixin, TemplateView):
+    """Fecha proyectada al peso de venta por animal y por lote."""
+
+    template_name = "tracking/forecast.html"
+    # 5 con los ajustes vigentes; el resto al encolar el reajuste de los que faltan
+    query_budget = 8
+
+    @staticmethod
+    def parse_target(value: str | None) -> float:
+        """Peso objetivo pedido; vacío, no numérico, nan, inf o no positivo usa el de la config."""
+        try:
+            target = float(value or "")
+        except ValueError:
+            return get_target_weight()
+        return target if math.isfinite(target) and target > 0 else get_target_weight()
+
+    def get_context_data(self, **kwargs: Any):
+        context = super().get_context_data(**kwargs)
+        batches = list(self.get_user_batches())
+        batch_id = self.request.GET.get("batch", "")
+        selected = next((batch for batch in batches if str(batch.pk) == batch_id), None)
+        target = self.parse_target(self.request.GET.get("target"))
+
+        forecast = forecast_lote(selected.pk, target) if selected else None
+        if forecast and forecast.pendientes:
+            # Ajustar en el request costaría segundos con lotes grandes: lo hace el worker
+            refresh_growth_fits.enqueue(unique=True)
+
+        context.update({
+            "batches": batches,
+            "selected_batch": selected,
+            "filters": {"batch": batch_id, "target": f"{target:g}"},
+            "forecast": forecast,
+        })
+        return context